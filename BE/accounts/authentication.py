@@ -0,0 +1,116 @@
+"""
+캐시를 쓰는 JWT 인증
+
+JWTAuthentication 은 인증된 요청마다 User 를 SELECT 한다. CachedJWTAuthentication 은
+- 사용자를 프로세스 내 캐시(user id 키, JWT_USER_CACHE_TIMEOUT 초, 최대 JWT_USER_CACHE_SIZE 명)에서 찾고
+- 토큰 폐기 여부를 Django 캐시에서 확인한다 (DB 조회 없음)
+
+폐기 정보 (Django 캐시, 여러 프로세스가 같이 보려면 공유 캐시 백엔드를 써야 한다 - accounts.checks)
+- jwt:revoked:{jti}: 로그아웃한 access 토큰 - 토큰 만료 시각까지 거부
+- jwt:user:{id}:revoked_before: 비활성화/삭제된 사용자 - 이 시각 전에 발급된 토큰 모두 거부
+- jwt:user:{id}:changed: 사용자 저장 시각 - 이보다 먼저 캐시한 사용자는 다시 읽는다
+refresh 토큰 폐기(로그아웃, 회전)는 token_blacklist 앱이 DB 에 기록한다.
+"""
+import copy
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+
+REVOKED_TOKEN_KEY = 'jwt:revoked:{jti}'
+REVOKED_BEFORE_KEY = 'jwt:user:{user_id}:revoked_before'
+USER_CHANGED_KEY = 'jwt:user:{user_id}:changed'
+
+
+class UserCache:
+    """크기 제한과 TTL 이 있는 user id -> User LRU 캐시 (스레드 안전)"""
+
+    def __init__(self):
+        self._entries = OrderedDict()  # user_id -> (user, 캐시한 시각)
+        self._lock = threading.Lock()
+
+    def get(self, user_id, changed_at=None):
+        """캐시한 사용자 - 만료됐거나 changed_at 이후에 캐시한 것이 아니면 None"""
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None:
+                return None
+            user, cached_at = entry
+            if time.time() - cached_at >= settings.JWT_USER_CACHE_TIMEOUT or (changed_at and changed_at >= cached_at):
+                del self._entries[user_id]
+                return None
+            self._entries.move_to_end(user_id)
+        # 요청마다 따로 바꿀 수 있도록 복사본을 돌려준다
+        return copy.copy(user)
+
+    def set(self, user_id, user):
+        if settings.JWT_USER_CACHE_TIMEOUT <= 0:
+            return
+        with self._lock:
+            self._entries[user_id] = (copy.copy(user), time.time())
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > settings.JWT_USER_CACHE_SIZE:
+                self._entries.popitem(last=False)
+
+    def discard(self, user_id):
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+user_cache = UserCache()
+
+
+def revoke_token(token):
+    """access 토큰을 만료 시각까지 거부"""
+    timeout = int(token['exp'] - time.time())
+    if timeout > 0:
+        cache.set(REVOKED_TOKEN_KEY.format(jti=token[api_settings.JTI_CLAIM]), True, timeout)
+
+
+def revoke_user_tokens(user_id):
+    """user 에게 지금까지 발급된 토큰을 모두 거부"""
+    lifetime = max(api_settings.ACCESS_TOKEN_LIFETIME, api_settings.REFRESH_TOKEN_LIFETIME)
+    cache.set(REVOKED_BEFORE_KEY.format(user_id=user_id), time.time(), int(lifetime.total_seconds()))
+
+
+def forget_user(user_id):
+    """캐시한 user 를 버린다 (다른 프로세스는 changed 시각을 보고 다시 읽는다)"""
+    user_cache.discard(user_id)
+    cache.set(USER_CHANGED_KEY.format(user_id=user_id), time.time(), settings.JWT_USER_CACHE_TIMEOUT + 1)
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """사용자 조회와 토큰 폐기 확인을 캐시로 처리하는 JWTAuthentication"""
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_('Token contained no recognizable user identification'))
+
+        keys = {
+            'revoked': REVOKED_TOKEN_KEY.format(jti=validated_token.get(api_settings.JTI_CLAIM)),
+            'revoked_before': REVOKED_BEFORE_KEY.format(user_id=user_id),
+            'changed': USER_CHANGED_KEY.format(user_id=user_id),
+        }
+        state = cache.get_many(keys.values())
+        revoked_before = state.get(keys['revoked_before'])
+        if state.get(keys['revoked']) or (revoked_before and validated_token.get('iat', 0) < revoked_before):
+            raise InvalidToken(_('Token is blacklisted'))
+
+        user = user_cache.get(user_id, changed_at=state.get(keys['changed']))
+        if user is None:
+            # DB 조회와 is_active 확인
+            user = super().get_user(validated_token)
+            user_cache.set(user_id, user)
+        return user
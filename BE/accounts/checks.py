@@ -0,0 +1,40 @@
+"""
+토큰 폐기 캐시 설정 확인 (manage.py check)
+
+폐기 정보(accounts.authentication)는 Django 캐시에만 기록한다.
+- DummyCache: 아무것도 저장하지 않으므로 로그아웃/비활성화한 access 토큰이 만료까지 유효 (E002)
+- LocMemCache: 프로세스마다 따로라서 다른 워커에서는 로그아웃한 토큰이 유효 (check --deploy 에서 E001)
+"""
+from django.conf import settings
+from django.core.checks import Error, Tags, register
+
+LOCAL_CACHE_BACKEND = 'django.core.cache.backends.locmem.LocMemCache'
+DUMMY_CACHE_BACKEND = 'django.core.cache.backends.dummy.DummyCache'
+
+SHARED_CACHE_HINT = 'CACHE_BACKEND 를 django.core.cache.backends.redis.RedisCache 같은 공유 캐시로 설정하세요.'
+
+
+def _cache_backend():
+    return settings.CACHES['default']['BACKEND']
+
+
+@register(Tags.security)
+def check_revocation_cache(app_configs, **kwargs):
+    if _cache_backend() != DUMMY_CACHE_BACKEND:
+        return []
+    return [Error(
+        'DummyCache 는 토큰 폐기 정보를 저장하지 않아 로그아웃/비활성화한 access 토큰이 만료까지 유효합니다.',
+        hint=SHARED_CACHE_HINT,
+        id='accounts.E002',
+    )]
+
+
+@register(Tags.security, deploy=True)
+def check_shared_revocation_cache(app_configs, **kwargs):
+    if _cache_backend() != LOCAL_CACHE_BACKEND:
+        return []
+    return [Error(
+        'LocMemCache 는 프로세스마다 따로라서 한 워커에서 로그아웃한 access 토큰이 다른 워커에서는 유효합니다.',
+        hint=SHARED_CACHE_HINT + ' 프로세스 하나로만 실행한다면 SILENCED_SYSTEM_CHECKS 에 accounts.E001 을 넣으세요.',
+        id='accounts.E001',
+    )]
@@ -0,0 +1,6 @@
+"""drf-spectacular 스키마 확장 - CachedJWTAuthentication 을 기존 JWT Bearer 인증으로 표시"""
+from drf_spectacular.contrib.rest_framework_simplejwt import SimpleJWTScheme
+
+
+class CachedJWTScheme(SimpleJWTScheme):
+    target_class = 'accounts.authentication.CachedJWTAuthentication'
@@ -0,0 +1,19 @@
+from django.contrib.auth.models import User
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .authentication import forget_user, revoke_user_tokens
+
+
+@receiver(post_save, sender=User)
+def invalidate_cached_user(sender, instance, **kwargs):
+    """사용자가 바뀌면 인증 캐시에서 버리고, 비활성화되면 발급된 토큰을 폐기"""
+    forget_user(instance.pk)
+    if not instance.is_active:
+        revoke_user_tokens(instance.pk)
+
+
+@receiver(post_delete, sender=User)
+def revoke_deleted_user(sender, instance, **kwargs):
+    forget_user(instance.pk)
+    revoke_user_tokens(instance.pk)
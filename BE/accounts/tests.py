@@ -1,3 +1,83 @@
-from django.test import TestCase
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
 
-# Create your tests here.
+from .authentication import user_cache
+from .checks import check_revocation_cache, check_shared_revocation_cache
+
+
+class CachedJWTAuthenticationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        user_cache.clear()
+        self.user = User.objects.create_user('owner', email='owner@example.com', password='password')
+        self.refresh = RefreshToken.for_user(self.user)
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.refresh.access_token}')
+
+    def user_queries(self, path='/api/auth/profile/'):
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(self.client.get(path).status_code, 200)
+        return [query['sql'] for query in queries if 'FROM "auth_user"' in query['sql']]
+
+    def test_user_cached_between_requests(self):
+        self.assertEqual(len(self.user_queries()), 1)
+        self.assertEqual(self.user_queries(), [])
+
+    def test_user_save_invalidates_cache(self):
+        self.user_queries()
+        response = self.client.patch('/api/auth/profile/', {'email': 'new@example.com'}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(self.user_queries()), 1)
+        self.assertEqual(self.client.get('/api/auth/profile/').json()['email'], 'new@example.com')
+
+    def test_deactivation_revokes_tokens(self):
+        self.user_queries()
+        self.user.is_active = False
+        self.user.save()
+        self.assertEqual(self.client.get('/api/auth/profile/').status_code, 401)
+
+        # 다시 활성화해도 이전에 발급된 토큰은 거부
+        self.user.is_active = True
+        self.user.save()
+        self.assertEqual(self.client.get('/api/auth/profile/').status_code, 401)
+
+    def test_logout_revokes_access_and_refresh_tokens(self):
+        response = self.client.post('/api/auth/logout/', {'refresh': str(self.refresh)}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.client.get('/api/auth/profile/').status_code, 401)
+
+        response = APIClient().post('/api/auth/token/refresh/', {'refresh': str(self.refresh)}, format='json')
+        self.assertEqual(response.status_code, 401)
+
+        other = APIClient()
+        other.credentials(HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(self.user).access_token}')
+        self.assertEqual(other.get('/api/auth/profile/').status_code, 200)
+
+
+class RevocationCacheCheckTests(SimpleTestCase):
+    """폐기 정보를 프로세스 밖에서 볼 수 없는 캐시 설정이면 check 가 실패하는지"""
+
+    def caches(self, backend):
+        return override_settings(CACHES={'default': {'BACKEND': backend}})
+
+    def ids(self, check):
+        return [error.id for error in check(None)]
+
+    def test_dummy_cache_fails_check(self):
+        with self.caches('django.core.cache.backends.dummy.DummyCache'):
+            self.assertEqual(self.ids(check_revocation_cache), ['accounts.E002'])
+
+    def test_local_memory_cache_fails_deploy_check(self):
+        with self.caches('django.core.cache.backends.locmem.LocMemCache'):
+            self.assertEqual(self.ids(check_revocation_cache), [])
+            self.assertEqual(self.ids(check_shared_revocation_cache), ['accounts.E001'])
+
+    def test_shared_cache_passes(self):
+        with self.caches('django.core.cache.backends.redis.RedisCache'):
+            self.assertEqual(self.ids(check_revocation_cache), [])
+            self.assertEqual(self.ids(check_shared_revocation_cache), [])
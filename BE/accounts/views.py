@@ -1,6 +1,8 @@
 from rest_framework import generics
 from rest_framework.permissions import AllowAny, IsAuthenticated
+from rest_framework_simplejwt.views import TokenBlacklistView
 from django.contrib.auth.models import User
+from .authentication import CachedJWTAuthentication, revoke_token
 from .serializers import RegisterSerializer, UserSerializer
 
 
@@ -18,3 +20,14 @@ class ProfileView(generics.RetrieveUpdateAPIView):
 
     def get_object(self):
         return self.request.user
+
+
+class LogoutView(TokenBlacklistView):
+    """로그아웃 - refresh 토큰을 blacklist 에 넣고 요청한 access 토큰도 만료 시까지 거부"""
+    authentication_classes = [CachedJWTAuthentication]
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request, *args, **kwargs):
+        response = super().post(request, *args, **kwargs)
+        revoke_token(request.auth)
+        return response
@@ -0,0 +1,7 @@
+from django.urls import path
+from .async_views import AsyncAnalyticsView, AsyncTrendingPromptsView
+
+urlpatterns = [
+    path('overview/', AsyncAnalyticsView.as_view(), name='async-analytics-overview'),
+    path('trending/', AsyncTrendingPromptsView.as_view(), name='async-trending-prompts'),
+]
@@ -0,0 +1,37 @@
+"""
+통계 비동기(ASGI) 조회 뷰
+
+대시보드의 독립적인 통계 쿼리 5개를 gather_queries 로 동시에 실행하고,
+인기 프롬프트는 캐시 적중 시 ORM 없이 응답한다. 응답 형식은 동기 뷰와 같다.
+"""
+from functools import partial
+
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+
+from config.async_views import AsyncAPIView, gather_queries
+from config.db_router import ReplicaReadMixin
+from . import trending
+from .views import overview_data, overview_queries, trending_data, trending_period
+
+
+class AsyncAnalyticsView(ReplicaReadMixin, AsyncAPIView):
+    """사용 통계 대시보드 (GET /api/async/analytics/overview/)"""
+    permission_classes = [IsAuthenticated]
+
+    async def get(self, request):
+        results = await gather_queries(*overview_queries(request.user))
+        return Response(overview_data(*results))
+
+
+class AsyncTrendingPromptsView(ReplicaReadMixin, AsyncAPIView):
+    """인기 프롬프트 (GET /api/async/analytics/trending/?period=7d)"""
+    permission_classes = [IsAuthenticated]
+
+    async def get(self, request):
+        period = trending_period(request)
+        data = await trending.aget_cached(period)
+        if data is None:
+            data, = await gather_queries(partial(trending_data, period))
+            await trending.aset_cached(period, data)
+        return Response(data)
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+from analytics.trending import rebuild_scores
+
+
+class Command(BaseCommand):
+    help = '최근 PromptUsage 로 기간별 인기 점수를 다시 계산한다'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        total = rebuild_scores(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'{total}개 인기 점수 행을 만들었습니다.'))
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+from analytics.rollups import rebuild_rollups
+
+
+class Command(BaseCommand):
+    help = 'PromptUsage 이력에서 일간/누적 사용 롤업을 다시 계산한다 (백필)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        user_days, prompt_days, summaries = rebuild_rollups(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f'사용자 일간 {user_days}행, 프롬프트 일간 {prompt_days}행, 누적 {summaries}행을 만들었습니다.'
+        ))
@@ -0,0 +1,33 @@
+# Generated by Django 5.0.1 on 2026-10-18 10:59
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analytics', '0001_initial'),
+        ('prompts', '0004_prompt_user_use_count_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TrendingScore',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('period', models.CharField(choices=[('24h', '24 hours'), ('7d', '7 days'), ('30d', '30 days')], max_length=3)),
+                ('score', models.FloatField()),
+                ('last_used', models.DateTimeField()),
+                ('prompt', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='trending_scores', to='prompts.prompt')),
+            ],
+            options={
+                'ordering': ['period', '-score'],
+                'indexes': [models.Index(fields=['period', '-score'], name='analytics_t_period_a9c1c1_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='trendingscore',
+            constraint=models.UniqueConstraint(fields=('prompt', 'period'), name='unique_prompt_trending_period'),
+        ),
+    ]
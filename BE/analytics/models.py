@@ -1,3 +1,79 @@
 from django.db import models
+from django.contrib.auth.models import User
+from prompts.models import Prompt
 
-# Create your models here.
+
+class UserDailyUsage(models.Model):
+    """사용자별 일간 사용 횟수 롤업"""
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='daily_usages')
+    date = models.DateField()
+    use_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        ordering = ['-date']
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'date'], name='unique_user_daily_usage'),
+        ]
+
+    def __str__(self):
+        return f"{self.user} - {self.date}: {self.use_count}"
+
+
+class PromptDailyUsage(models.Model):
+    """프롬프트별 일간 사용 횟수 롤업"""
+    prompt = models.ForeignKey(Prompt, on_delete=models.CASCADE, related_name='daily_usages')
+    date = models.DateField()
+    use_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        ordering = ['-date']
+        constraints = [
+            models.UniqueConstraint(fields=['prompt', 'date'], name='unique_prompt_daily_usage'),
+        ]
+
+    def __str__(self):
+        return f"{self.prompt} - {self.date}: {self.use_count}"
+
+
+class UserUsageSummary(models.Model):
+    """사용자별 누적 사용 횟수"""
+    user = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='usage_summary'
+    )
+    total_uses = models.PositiveBigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name_plural = 'User usage summaries'
+
+    def __str__(self):
+        return f"{self.user}: {self.total_uses}"
+
+
+class TrendingScore(models.Model):
+    """기간별 지수 감쇠 인기 점수 (score 는 prompts.decay 의 로그 점수)"""
+    PERIOD_CHOICES = [
+        ('24h', '24 hours'),
+        ('7d', '7 days'),
+        ('30d', '30 days'),
+    ]
+
+    prompt = models.ForeignKey(Prompt, on_delete=models.CASCADE, related_name='trending_scores')
+    period = models.CharField(max_length=3, choices=PERIOD_CHOICES)
+    score = models.FloatField()
+    last_used = models.DateTimeField()
+
+    class Meta:
+        ordering = ['period', '-score']
+        indexes = [
+            models.Index(fields=['period', '-score']),
+        ]
+        constraints = [
+            models.UniqueConstraint(fields=['prompt', 'period'], name='unique_prompt_trending_period'),
+        ]
+
+    def __str__(self):
+        return f"{self.prompt} ({self.period}): {self.score:.3f}"
@@ -0,0 +1,135 @@
+"""
+사용 통계 롤업 갱신
+
+PromptUsage 가 기록될 때(usage_recorded) 사용자/프롬프트별 일간 사용 횟수와
+사용자별 누적 사용 횟수를 증가분으로 갱신한다. 날짜는 TIME_ZONE 기준이다.
+보관 기간이 지나 아카이브로 옮긴 이력(prompts.usage_archive)도 롤업에는 남는다.
+
+프롬프트나 사용자를 지우면 함께 지워지는 PromptUsage 만큼 롤업에서 뺀다 (remove_usages).
+아카이브한 이력과 PromptUsage 를 직접 지운 경우는 빼지 않으므로 rebuild_usage_rollups 로 맞춘다.
+"""
+from collections import Counter
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F
+from django.db.models.functions import Greatest, TruncDate
+from django.utils import timezone
+
+from prompts.usage_archive import get_archive, hot_usages, iter_archived
+from .models import UserDailyUsage, PromptDailyUsage, UserUsageSummary
+
+
+def _increment(model, key_fields, field, counts):
+    """키별 증가분 반영 - 행이 없으면 만들고, 동시에 만들어졌으면 다시 증가"""
+    for key, count in sorted(counts.items()):
+        lookup = dict(zip(key_fields, key))
+        if model.objects.filter(**lookup).update(**{field: F(field) + count}):
+            continue
+        try:
+            with transaction.atomic():
+                model.objects.create(**lookup, **{field: count})
+        except IntegrityError:
+            model.objects.filter(**lookup).update(**{field: F(field) + count})
+
+
+def _decrement(model, key_fields, field, counts):
+    """키별 감소분 반영 (0 아래로는 내리지 않는다)"""
+    for key, count in sorted(counts.items()):
+        lookup = dict(zip(key_fields, key))
+        model.objects.filter(**lookup).update(**{field: Greatest(F(field) - count, 0)})
+
+
+def apply_usages(usages):
+    """기록된 PromptUsage 목록을 롤업에 반영"""
+    user_days = Counter()
+    prompt_days = Counter()
+    user_totals = Counter()
+    for usage in usages:
+        date = timezone.localdate(usage.used_at)
+        user_days[(usage.user_id, date)] += 1
+        prompt_days[(usage.prompt_id, date)] += 1
+        user_totals[(usage.user_id,)] += 1
+
+    _increment(UserDailyUsage, ('user_id', 'date'), 'use_count', user_days)
+    _increment(PromptDailyUsage, ('prompt_id', 'date'), 'use_count', prompt_days)
+    _increment(UserUsageSummary, ('user_id',), 'total_uses', user_totals)
+
+
+def remove_usages(usages):
+    """지워질 PromptUsage queryset 을 롤업에서 뺀다 (테이블에 남은 이력만)"""
+    archived_before = get_archive().archived_before()
+    if archived_before is not None:
+        usages = usages.filter(used_at__gte=archived_before)
+    usages = usages.order_by()
+    daily = usages.annotate(date=TruncDate('used_at'))
+    user_days = Counter({
+        (row['user_id'], row['date']): row['n']
+        for row in daily.values('user_id', 'date').annotate(n=Count('id'))
+    })
+    prompt_days = Counter({
+        (row['prompt_id'], row['date']): row['n']
+        for row in daily.values('prompt_id', 'date').annotate(n=Count('id'))
+    })
+    user_totals = Counter({
+        (row['user_id'],): row['n']
+        for row in usages.values('user_id').annotate(n=Count('id'))
+    })
+
+    _decrement(UserDailyUsage, ('user_id', 'date'), 'use_count', user_days)
+    _decrement(PromptDailyUsage, ('prompt_id', 'date'), 'use_count', prompt_days)
+    _decrement(UserUsageSummary, ('user_id',), 'total_uses', user_totals)
+
+
+def rebuild_rollups(batch_size=1000):
+    """
+    사용 이력 전체(아카이브 포함)에서 롤업을 다시 계산 - 만든 (사용자 일간, 프롬프트 일간, 누적) 행 수 반환
+
+    테이블에 남은 이력은 DB 에서 집계하고, 아카이브한 이력은 읽으면서 센다.
+    """
+    user_days = Counter()
+    prompt_days = Counter()
+    user_totals = Counter()
+    for user_id, prompt_id, used_at in iter_archived(('user_id', 'prompt_id', 'used_at')):
+        date = timezone.localdate(used_at)
+        user_days[(user_id, date)] += 1
+        prompt_days[(prompt_id, date)] += 1
+        user_totals[user_id] += 1
+
+    usages = hot_usages()
+    daily = usages.annotate(date=TruncDate('used_at'))
+
+    with transaction.atomic():
+        for row in daily.values('user_id', 'date').annotate(n=Count('id')).iterator():
+            user_days[(row['user_id'], row['date'])] += row['n']
+        for row in daily.values('prompt_id', 'date').annotate(n=Count('id')).iterator():
+            prompt_days[(row['prompt_id'], row['date'])] += row['n']
+        for row in usages.values('user_id').annotate(n=Count('id')).iterator():
+            user_totals[row['user_id']] += row['n']
+
+        UserDailyUsage.objects.all().delete()
+        PromptDailyUsage.objects.all().delete()
+        UserUsageSummary.objects.all().delete()
+
+        user_rollups = UserDailyUsage.objects.bulk_create(
+            [
+                UserDailyUsage(user_id=user_id, date=date, use_count=count)
+                for (user_id, date), count in user_days.items()
+            ],
+            batch_size=batch_size,
+        )
+        prompt_rollups = PromptDailyUsage.objects.bulk_create(
+            [
+                PromptDailyUsage(prompt_id=prompt_id, date=date, use_count=count)
+                for (prompt_id, date), count in prompt_days.items()
+            ],
+            batch_size=batch_size,
+        )
+        summaries = UserUsageSummary.objects.bulk_create(
+            [
+                UserUsageSummary(user_id=user_id, total_uses=count)
+                for user_id, count in user_totals.items()
+            ],
+            batch_size=batch_size,
+        )
+
+    return len(user_rollups), len(prompt_rollups), len(summaries)
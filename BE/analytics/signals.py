@@ -0,0 +1,30 @@
+from django.contrib.auth.models import User
+from django.db.models.signals import pre_delete
+from django.dispatch import receiver
+from prompts.models import Prompt, PromptUsage
+from prompts.signals import usage_recorded
+from . import rollups, trending
+
+
+@receiver(usage_recorded)
+def update_usage_rollups(sender, usages, **kwargs):
+    """사용 이력이 기록되면 일간/누적 롤업 갱신"""
+    rollups.apply_usages(usages)
+
+
+@receiver(usage_recorded)
+def update_trending_scores(sender, usages, **kwargs):
+    """사용 이력이 기록되면 기간별 인기 점수 갱신"""
+    trending.apply_events((usage.prompt_id, usage.used_at) for usage in usages)
+
+
+@receiver(pre_delete, sender=Prompt)
+def remove_prompt_usage_rollups(sender, instance, **kwargs):
+    """프롬프트와 함께 지워지는 사용 이력을 롤업에서 뺀다"""
+    rollups.remove_usages(PromptUsage.objects.filter(prompt=instance))
+
+
+@receiver(pre_delete, sender=User)
+def remove_user_usage_rollups(sender, instance, **kwargs):
+    """사용자와 함께 지워지는 사용 이력을 롤업에서 뺀다"""
+    rollups.remove_usages(PromptUsage.objects.filter(user=instance))
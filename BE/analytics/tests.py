@@ -1,3 +1,186 @@
-from django.test import TestCase
+from datetime import timedelta
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db.models import Count
+from django.db.models.functions import TruncDate
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from config.testing import QueryCountTestMixin
+from prompts.tests import SYNC_USAGE_QUEUE, make_prompts
+from prompts.models import PromptUsage
+from prompts.usage import flush_usage_counters, record_usage
+from prompts.usage_queue import UsageEvent, write_usage_events
+from . import rollups, trending
+from .models import PromptDailyUsage, UserDailyUsage, UserUsageSummary
+
+
+@override_settings(PROMPT_USAGE_QUEUE=SYNC_USAGE_QUEUE, TRENDING_CACHE_TIMEOUT=0)
+class AnalyticsQueryCountTests(QueryCountTestMixin, TestCase):
+    """통계 엔드포인트 쿼리 수가 프롬프트/사용 이력 수와 무관한지"""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user('owner', password='password')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def grow(self, n):
+        for prompt in make_prompts(self.user, n):
+            record_usage(prompt, self.user, variables_used={'language': 'Python'})
+            record_usage(prompt, self.user)
+        flush_usage_counters()
+
+    def test_overview(self):
+        self.assertConstantQueries(lambda: self.client.get('/api/analytics/overview/'), self.grow)
+
+    def test_trending(self):
+        self.assertConstantQueries(lambda: self.client.get('/api/analytics/trending/?period=24h'), self.grow)
+
+
+@override_settings(PROMPT_USAGE_QUEUE=SYNC_USAGE_QUEUE, TRENDING_CACHE_TIMEOUT=0, ASYNC_PARALLEL_QUERIES=False)
+class AsyncAnalyticsViewTests(TestCase):
+    """/api/async/analytics/ 응답이 동기 엔드포인트와 같은지"""
+
+    def setUp(self):
+        self.user = User.objects.create_user('owner', password='password')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        for prompt in make_prompts(self.user, 7):
+            record_usage(prompt, self.user)
+        flush_usage_counters()
+
+    def test_matches_sync_endpoints(self):
+        for path in ['overview/', 'trending/?period=24h']:
+            sync = self.client.get(f'/api/analytics/{path}')
+            response = self.client.get(f'/api/async/analytics/{path}')
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.json(), sync.json(), path)
+
+    def test_requires_authentication(self):
+        self.assertEqual(APIClient().get('/api/async/analytics/overview/').status_code, 401)
+
+
+@override_settings(PROMPT_USAGE_QUEUE=SYNC_USAGE_QUEUE)
+class UsageRollupTests(TestCase):
+    """롤업에서 읽은 통계가 PromptUsage 를 직접 센 값과 같은지 (삭제 후 포함)"""
+
+    def setUp(self):
+        self.owner = User.objects.create_user('owner', password='password')
+        self.other = User.objects.create_user('other', password='password')
+        self.client = APIClient()
+        self.client.force_authenticate(self.owner)
+        self.own = make_prompts(self.owner, 2)
+        self.others = make_prompts(self.other, 2)
+        now = timezone.now()
+        events = [
+            UsageEvent(prompt.pk, user.pk, now - timedelta(days=days), None)
+            for prompt in self.own + self.others
+            for user in (self.owner, self.other)
+            for days in (0, 1, 3, 10)
+        ]
+        write_usage_events(events)
+
+    def rollup_tables(self):
+        return (
+            sorted(UserDailyUsage.objects.values_list('user_id', 'date', 'use_count')),
+            sorted(PromptDailyUsage.objects.values_list('prompt_id', 'date', 'use_count')),
+            sorted(UserUsageSummary.objects.values_list('user_id', 'total_uses')),
+        )
+
+    def counted_tables(self):
+        daily = PromptUsage.objects.annotate(date=TruncDate('used_at')).order_by()
+        return (
+            sorted(daily.values_list('user_id', 'date').annotate(n=Count('id'))),
+            sorted(daily.values_list('prompt_id', 'date').annotate(n=Count('id'))),
+            sorted(PromptUsage.objects.order_by().values_list('user_id').annotate(n=Count('id'))),
+        )
+
+    def assertMatchesCount(self):
+        # 0 으로 줄어든 행은 직접 센 결과에 없다
+        user_days, prompt_days, totals = self.rollup_tables()
+        self.assertEqual(
+            ([row for row in user_days if row[-1]], [row for row in prompt_days if row[-1]],
+             [row for row in totals if row[-1]]),
+            self.counted_tables(),
+        )
+        week_start = timezone.localdate() - timedelta(days=6)
+        overview = self.client.get('/api/analytics/overview/').json()['overview']
+        self.assertEqual(overview['total_uses'], PromptUsage.objects.filter(user=self.owner).count())
+        self.assertEqual(overview['recent_uses_7days'], sum(
+            1 for used_at in PromptUsage.objects.filter(user=self.owner).values_list('used_at', flat=True)
+            if timezone.localdate(used_at) >= week_start
+        ))
+
+    def test_rollups_match_count_queries(self):
+        self.assertMatchesCount()
+        self.assertEqual(self.client.get('/api/analytics/overview/').json()['overview']['total_uses'], 16)
+
+    def test_rollups_follow_prompt_and_user_deletes(self):
+        self.others[0].delete()
+        self.assertMatchesCount()
+        self.assertEqual(self.client.get('/api/analytics/overview/').json()['overview']['total_uses'], 12)
+
+        self.other.delete()
+        self.assertMatchesCount()
+        self.assertEqual(sum(PromptDailyUsage.objects.filter(prompt=self.own[0]).values_list('use_count', flat=True)), 4)
+
+    def test_rebuild_matches_incremental_rollups(self):
+        self.others[0].delete()
+        incremental = self.rollup_tables()
+        rollups.rebuild_rollups()
+        rebuilt = self.rollup_tables()
+        self.assertEqual(
+            tuple([row for row in table if row[-1]] for table in incremental),
+            rebuilt,
+        )
+
+
+@override_settings(PROMPT_USAGE_QUEUE=SYNC_USAGE_QUEUE, TRENDING_CACHE_TIMEOUT=0)
+class TrendingDecayTests(TestCase):
+    """기간별 인기 순서가 지수 감쇠 점수 순인지"""
+
+    def setUp(self):
+        self.user = User.objects.create_user('owner', password='password')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.many_old, self.few_recent, self.stale = make_prompts(self.user, 3)
+        now = timezone.now()
+        self.ages = {
+            self.many_old.pk: [timedelta(days=6)] * 5,
+            self.few_recent.pk: [timedelta(hours=1)] * 2,
+            self.stale.pk: [timedelta(days=10)],
+        }
+        write_usage_events([
+            UsageEvent(prompt_id, self.user.pk, now - age, None)
+            for prompt_id, ages in self.ages.items()
+            for age in ages
+        ])
+
+    def expected(self, period):
+        """반감기 = 기간 / 4 로 직접 계산한 순서 (기간 안에 쓰인 프롬프트만)"""
+        window = trending.PERIODS[period]
+        scores = {
+            prompt_id: sum(0.5 ** (age / (window / 4)) for age in ages)
+            for prompt_id, ages in self.ages.items()
+            if min(ages) <= window
+        }
+        return sorted(scores, key=scores.get, reverse=True)
+
+    def trending_ids(self, period):
+        return [row['id'] for row in self.client.get(f'/api/analytics/trending/?period={period}').json()]
+
+    def test_order_follows_decayed_score(self):
+        # 7일: 최근 2회가 6일 전 5회보다 앞선다, 30일: 5회가 앞선다
+        self.assertEqual(self.trending_ids('24h'), [self.few_recent.pk])
+        self.assertEqual(self.trending_ids('7d'), [self.few_recent.pk, self.many_old.pk])
+        self.assertEqual(self.trending_ids('30d'), [self.many_old.pk, self.few_recent.pk, self.stale.pk])
+        for period in trending.PERIODS:
+            self.assertEqual(self.trending_ids(period), self.expected(period), period)
+
+    def test_rebuild_keeps_order(self):
+        before = {period: self.trending_ids(period) for period in trending.PERIODS}
+        trending.rebuild_scores()
+        self.assertEqual({period: self.trending_ids(period) for period in trending.PERIODS}, before)
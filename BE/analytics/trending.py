@@ -0,0 +1,125 @@
+"""
+인기 프롬프트 점수
+
+기간(24h/7d/30d)마다 반감기가 기간의 1/4 인 지수 감쇠 점수를 TrendingScore 에
+유지한다. 사용 이력이 기록될 때 증가분만 반영하고, 조회는 (period, -score)
+인덱스에서 상위 N 개만 읽는다. 기간 안에 한 번도 쓰이지 않은 프롬프트는 제외한다.
+"""
+from collections import defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from prompts.decay import decay_rate, log_add, log_sum, log_weight
+from prompts.usage_archive import iter_usages
+from .models import TrendingScore
+
+PERIODS = {
+    '24h': timedelta(hours=24),
+    '7d': timedelta(days=7),
+    '30d': timedelta(days=30),
+}
+DEFAULT_PERIOD = '30d'
+
+RATES = {period: decay_rate(window / 4) for period, window in PERIODS.items()}
+
+CACHE_KEY = 'analytics:trending:{period}'
+
+
+def _prompt_events(events):
+    """(prompt_id, used_at) 목록을 프롬프트별 [used_at, ...] 으로 묶는다"""
+    grouped = defaultdict(list)
+    for prompt_id, used_at in events:
+        grouped[prompt_id].append(used_at)
+    return grouped
+
+
+def apply_events(events):
+    """(prompt_id, used_at) 이벤트를 기간별 점수에 반영"""
+    grouped = _prompt_events(events)
+    if not grouped:
+        return
+
+    try:
+        with transaction.atomic():
+            _apply_grouped(grouped)
+    except IntegrityError:
+        # 다른 워커가 같은 (prompt, period) 행을 먼저 만든 경우 - 한 번 더 시도하면 갱신 경로로 간다
+        with transaction.atomic():
+            _apply_grouped(grouped)
+
+
+def _apply_grouped(grouped):
+    existing = {
+        (row.prompt_id, row.period): row
+        for row in TrendingScore.objects.select_for_update().filter(prompt_id__in=grouped)
+    }
+
+    to_update = []
+    to_create = []
+    for prompt_id, times in grouped.items():
+        last_used = max(times)
+        for period, rate in RATES.items():
+            increment = log_sum(log_weight(when, rate) for when in times)
+            row = existing.get((prompt_id, period))
+            if row is None:
+                to_create.append(TrendingScore(
+                    prompt_id=prompt_id, period=period, score=increment, last_used=last_used
+                ))
+            else:
+                row.score = log_add(row.score, increment)
+                row.last_used = max(row.last_used, last_used)
+                to_update.append(row)
+
+    TrendingScore.objects.bulk_update(to_update, ['score', 'last_used'], batch_size=500)
+    TrendingScore.objects.bulk_create(to_create, batch_size=500)
+
+
+def rebuild_scores(batch_size=2000):
+    """가장 긴 기간 안의 사용 이력(아카이브 포함)으로 점수를 다시 계산 - 만든 행 수 반환"""
+    since = timezone.now() - max(PERIODS.values())
+
+    scores = {}
+    last_used = {}
+    for prompt_id, used_at in iter_usages(('prompt_id', 'used_at'), since=since, chunk_size=batch_size):
+        for period, rate in RATES.items():
+            key = (prompt_id, period)
+            scores[key] = log_add(scores.get(key), log_weight(used_at, rate))
+        last_used[prompt_id] = max(last_used.get(prompt_id, used_at), used_at)
+
+    with transaction.atomic():
+        TrendingScore.objects.all().delete()
+        TrendingScore.objects.bulk_create(
+            [
+                TrendingScore(prompt_id=prompt_id, period=period, score=score, last_used=last_used[prompt_id])
+                for (prompt_id, period), score in scores.items()
+            ],
+            batch_size=batch_size,
+        )
+
+    for period in PERIODS:
+        cache.delete(CACHE_KEY.format(period=period))
+    return len(scores)
+
+
+def get_cached(period):
+    return cache.get(CACHE_KEY.format(period=period))
+
+
+def set_cached(period, data):
+    timeout = settings.TRENDING_CACHE_TIMEOUT
+    if timeout:
+        cache.set(CACHE_KEY.format(period=period), data, timeout)
+
+
+async def aget_cached(period):
+    return await cache.aget(CACHE_KEY.format(period=period))
+
+
+async def aset_cached(period, data):
+    timeout = settings.TRENDING_CACHE_TIMEOUT
+    if timeout:
+        await cache.aset(CACHE_KEY.format(period=period), data, timeout)
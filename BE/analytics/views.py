@@ -1,85 +1,126 @@
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
-from django.db.models import Count
+from django.db.models import Count, Q, Sum
 from django.utils import timezone
 from datetime import timedelta
-from prompts.models import Prompt, Category, PromptUsage
+from config.db_router import ReplicaReadMixin
+from prompts.models import Prompt, PromptUsage
 from prompts.serializers import PromptListSerializer
+from .models import UserDailyUsage, UserUsageSummary
+from . import trending
 
 
-class AnalyticsView(APIView):
-    """사용 통계 대시보드"""
-    permission_classes = [IsAuthenticated]
+def overview_queries(user):
+    """
+    대시보드 통계 쿼리 목록 - 서로 독립적이라 비동기 뷰에서는 동시에 실행한다
 
-    def get(self, request):
-        """전체 통계"""
-        user = request.user
+    사용 횟수는 PromptUsage 를 세지 않고 롤업 테이블에서 읽으므로
+    이력 크기와 관계없이 고정된 수의 쿼리로 응답한다.
+    최근 7일은 오늘을 포함한 7일(TIME_ZONE 기준 날짜)이다.
+    """
+    week_start = timezone.localdate() - timedelta(days=6)
 
-        # 기본 통계
-        total_prompts = Prompt.objects.filter(user=user).count()
-        total_categories = Category.objects.filter(prompts__user=user).distinct().count()
-        total_uses = PromptUsage.objects.filter(user=user).count()
-        favorites_count = Prompt.objects.filter(user=user, is_favorite=True).count()
+    def prompt_stats():
+        # 기본 통계 - 프롬프트/즐겨찾기/카테고리 수를 한 번에 집계
+        return Prompt.objects.filter(user=user).aggregate(
+            total_prompts=Count('id'),
+            favorites_count=Count('id', filter=Q(is_favorite=True)),
+            total_categories=Count('category', distinct=True),
+        )
 
+    def total_uses():
+        return UserUsageSummary.objects.filter(user=user).values_list(
+            'total_uses', flat=True
+        ).first() or 0
+
+    def recent_uses():
         # 최근 7일 사용 통계
-        week_ago = timezone.now() - timedelta(days=7)
-        recent_uses = PromptUsage.objects.filter(
+        return UserDailyUsage.objects.filter(
             user=user,
-            used_at__gte=week_ago
-        ).count()
+            date__gte=week_start
+        ).aggregate(total=Sum('use_count'))['total'] or 0
 
+    def most_used():
         # 가장 많이 사용한 프롬프트 Top 5
-        most_used = Prompt.objects.filter(user=user).order_by('-use_count')[:5]
+        prompts = Prompt.objects.filter(user=user).select_related(
+            'user', 'category'
+        ).prefetch_related('tags').order_by('-use_count')[:5]
+        return PromptListSerializer(prompts, many=True).data
 
+    def recent_usages():
         # 최근 사용한 프롬프트
-        recent_usages = PromptUsage.objects.filter(user=user).select_related('prompt')[:10]
-
-        return Response({
-            'overview': {
-                'total_prompts': total_prompts,
-                'total_categories': total_categories,
-                'total_uses': total_uses,
-                'favorites_count': favorites_count,
-                'recent_uses_7days': recent_uses,
-            },
-            'most_used': PromptListSerializer(most_used, many=True).data,
-            'recent_usages': [{
-                'id': usage.id,
-                'prompt_id': usage.prompt.id,
-                'prompt_title': usage.prompt.title,
-                'used_at': usage.used_at,
-                'variables_used': usage.variables_used,
-            } for usage in recent_usages]
-        })
-
-
-class TrendingPromptsView(APIView):
+        usages = PromptUsage.objects.filter(user=user).select_related('prompt')[:10]
+        return [{
+            'id': usage.id,
+            'prompt_id': usage.prompt.id,
+            'prompt_title': usage.prompt.title,
+            'used_at': usage.used_at,
+            'variables_used': usage.variables_used,
+        } for usage in usages]
+
+    return [prompt_stats, total_uses, recent_uses, most_used, recent_usages]
+
+
+def overview_data(prompt_stats, total_uses, recent_uses, most_used, recent_usages):
+    """overview_queries 결과 -> 응답 본문"""
+    return {
+        'overview': {
+            'total_prompts': prompt_stats['total_prompts'],
+            'total_categories': prompt_stats['total_categories'],
+            'total_uses': total_uses,
+            'favorites_count': prompt_stats['favorites_count'],
+            'recent_uses_7days': recent_uses,
+        },
+        'most_used': most_used,
+        'recent_usages': recent_usages,
+    }
+
+
+def trending_data(period):
+    """감쇠 점수 상위 10개 직렬화 결과 (기간 안에 사용된 프롬프트만)"""
+    date_from = timezone.now() - trending.PERIODS[period]
+    trending_prompts = Prompt.objects.filter(
+        trending_scores__period=period,
+        trending_scores__last_used__gte=date_from
+    ).select_related('user', 'category').prefetch_related('tags').order_by(
+        '-trending_scores__score'
+    )[:10]
+    return PromptListSerializer(trending_prompts, many=True).data
+
+
+def trending_period(request):
+    period = request.query_params.get('period', '7d')
+    if period not in trending.PERIODS:
+        period = trending.DEFAULT_PERIOD
+    return period
+
+
+class AnalyticsView(ReplicaReadMixin, APIView):
+    """사용 통계 대시보드"""
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        """전체 통계 (overview_queries 참고)"""
+        results = [query() for query in overview_queries(request.user)]
+        return Response(overview_data(*results))
+
+
+class TrendingPromptsView(ReplicaReadMixin, APIView):
     """인기 프롬프트"""
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
         """
-        기간별 인기 프롬프트
+        기간별 인기 프롬프트 (지수 감쇠 점수 순, 결과는 TRENDING_CACHE_TIMEOUT 초 캐시)
 
         GET /api/analytics/trending/?period=7d
         period: 24h, 7d, 30d
         """
-        period = request.query_params.get('period', '7d')
-
-        if period == '24h':
-            date_from = timezone.now() - timedelta(hours=24)
-        elif period == '7d':
-            date_from = timezone.now() - timedelta(days=7)
-        else:  # 30d
-            date_from = timezone.now() - timedelta(days=30)
-
-        # 기간 내 사용된 프롬프트
-        trending = Prompt.objects.filter(
-            usages__used_at__gte=date_from
-        ).annotate(
-            recent_use_count=Count('usages')
-        ).order_by('-recent_use_count')[:10]
-
-        serializer = PromptListSerializer(trending, many=True)
-        return Response(serializer.data)
+        period = trending_period(request)
+        data = trending.get_cached(period)
+        if data is None:
+            data = trending_data(period)
+            trending.set_cached(period, data)
+
+        return Response(data)
@@ -0,0 +1,9 @@
+"""
+성능 벤치마크 스크립트 모음
+
+BE 디렉터리에서 모듈로 실행한다.
+
+    python -m benchmarks.template_render
+    python -m benchmarks.list_serialization
+    python -m benchmarks.api --output bench.json
+"""
@@ -0,0 +1,521 @@
+"""
+API 부하/지연 벤치마크
+
+임시 테스트 DB 에 합성 데이터(사용자, 프롬프트, 태그, 카테고리, PromptUsage)를 시드로
+재현 가능하게 만든 뒤 주요 엔드포인트를 호출해 p50/p95/p99 지연, 처리량, SQL 쿼리 수를
+JSON 으로 저장한다. 저장해 둔 기준 결과와 비교할 수 있다.
+
+- inprocess: django.test.Client 로 순차 호출 (요청당 쿼리 수 포함)
+- server: 로컬 WSGI 서버를 띄우고 HTTP 로 동시 호출 (쿼리 수는 측정하지 않음)
+
+    python -m benchmarks.api --users 20 --prompts 50 --requests 200 --output bench.json
+    python -m benchmarks.api --baseline bench.json --output new.json --fail-on-regression
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import timedelta
+
+ENDPOINTS = [
+    'list', 'search', 'retrieve', 'apply_variables', 'mark_used',
+    'analytics_overview', 'analytics_trending', 'export', 'import',
+]
+
+WORDS = [
+    'python', 'django', 'react', 'sql', 'api', 'test', 'refactor', 'review',
+    'summary', 'email', 'blog', 'marketing', 'design', 'docker', 'deploy',
+    'bug', 'feature', 'data', 'report', 'translate', '코드', '번역', '요약', '문서',
+]
+
+
+def setup_django():
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+    import django
+    django.setup()
+
+
+# ---------------------------------------------------------------------------
+# 데이터 시드
+# ---------------------------------------------------------------------------
+
+def seed(users, prompts_per_user, tags, categories, usages, random_seed=0):
+    """합성 데이터 생성 - 같은 인자와 시드면 같은 데이터"""
+    from django.contrib.auth.hashers import make_password
+    from django.contrib.auth.models import User
+    from django.contrib.contenttypes.models import ContentType
+    from django.core.management import call_command
+    from django.utils import timezone
+    from taggit.models import Tag, TaggedItem
+
+    from analytics.rollups import rebuild_rollups
+    from analytics.trending import rebuild_scores
+    from prompts.models import Category, Prompt, PromptUsage
+    from prompts.search import rebuild_index
+    from prompts.similarity import rebuild_index as rebuild_similarity_index
+
+    rng = random.Random(random_seed)
+    now = timezone.now()
+
+    password = make_password('bench-password')
+    user_objs = User.objects.bulk_create([
+        User(username=f'bench{i}', password=password) for i in range(users)
+    ])
+    category_objs = Category.objects.bulk_create([
+        Category(name=f'Category {i}') for i in range(categories)
+    ])
+    tag_objs = Tag.objects.bulk_create([
+        Tag(name=f'{rng.choice(WORDS)}-{i}', slug=f'tag-{i}') for i in range(tags)
+    ])
+
+    prompt_objs = []
+    for user in user_objs:
+        for i in range(prompts_per_user):
+            words = ' '.join(rng.choices(WORDS, k=rng.randint(20, 80)))
+            is_template = rng.random() < 0.5
+            content = f'{words} {{{{language}}}} {{{{feature}}}}' if is_template else words
+            prompt_objs.append(Prompt(
+                user=user,
+                title=f'{rng.choice(WORDS)} {rng.choice(WORDS)} prompt {user.pk}-{i}',
+                content=content,
+                category=rng.choice(category_objs + [None]) if category_objs else None,
+                is_template=is_template,
+                variables=['language', 'feature'] if is_template else [],
+                is_public=rng.random() < 0.3,
+                is_favorite=rng.random() < 0.1,
+            ))
+    prompt_objs = Prompt.objects.bulk_create(prompt_objs, batch_size=1000)
+
+    content_type = ContentType.objects.get_for_model(Prompt)
+    TaggedItem.objects.bulk_create([
+        TaggedItem(content_type=content_type, object_id=prompt.pk, tag=tag)
+        for prompt in prompt_objs
+        for tag in rng.sample(tag_objs, min(len(tag_objs), rng.randint(0, 4)))
+    ], batch_size=1000)
+
+    usage_objs = []
+    for _ in range(usages if prompt_objs else 0):
+        prompt = rng.choice(prompt_objs)
+        usage_objs.append(PromptUsage(
+            prompt=prompt,
+            user_id=prompt.user_id,
+            used_at=now - timedelta(seconds=rng.randint(0, 30 * 24 * 3600)),
+            variables_used={'language': 'Python'} if prompt.is_template else {},
+        ))
+    PromptUsage.objects.bulk_create(usage_objs, batch_size=1000)
+
+    # 비정규화된 값은 실제 서비스처럼 재계산
+    counts = {}
+    for usage in usage_objs:
+        count, last_used = counts.get(usage.prompt_id, (0, usage.used_at))
+        counts[usage.prompt_id] = (count + 1, max(last_used, usage.used_at))
+    for prompt in prompt_objs:
+        prompt.use_count, prompt.last_used = counts.get(prompt.pk, (0, None))
+    Prompt.objects.bulk_update(prompt_objs, ['use_count', 'last_used'], batch_size=1000)
+
+    call_command('reconcile_category_counts', stdout=open(os.devnull, 'w'))
+    rebuild_index()
+    rebuild_similarity_index()
+    rebuild_rollups()
+    rebuild_scores()
+
+    return {
+        'users': [user.pk for user in user_objs],
+        'prompts': {
+            user.pk: [prompt.pk for prompt in prompt_objs if prompt.user_id == user.pk]
+            for user in user_objs
+        },
+        'templates': {
+            user.pk: [prompt.pk for prompt in prompt_objs if prompt.user_id == user.pk and prompt.is_template]
+            for user in user_objs
+        },
+    }
+
+
+# ---------------------------------------------------------------------------
+# 요청 생성
+# ---------------------------------------------------------------------------
+
+class RequestFactory:
+    """엔드포인트별 요청 (method, path, body) 을 시드 기반으로 만든다"""
+
+    def __init__(self, dataset, tokens, random_seed=0):
+        self.dataset = dataset
+        self.tokens = tokens
+        self.rng = random.Random(random_seed)
+        self.lock = threading.Lock()
+        self.import_counter = 0
+
+    def _user(self, with_templates=False):
+        users = self.dataset['users']
+        if with_templates:
+            users = [user for user in users if self.dataset['templates'][user]] or users
+        return self.rng.choice(users)
+
+    def build(self, endpoint):
+        with self.lock:
+            return self._build(endpoint)
+
+    def _build(self, endpoint):
+        rng = self.rng
+        if endpoint == 'apply_variables':
+            user = self._user(with_templates=True)
+            prompt_id = rng.choice(self.dataset['templates'][user] or self.dataset['prompts'][user])
+        else:
+            user = self._user()
+            prompt_id = rng.choice(self.dataset['prompts'][user]) if self.dataset['prompts'][user] else 1
+
+        if endpoint == 'list':
+            request = ('GET', '/api/prompts/', None)
+        elif endpoint == 'search':
+            request = ('GET', f'/api/prompts/search/?q={urllib.request.quote(rng.choice(WORDS))}', None)
+        elif endpoint == 'retrieve':
+            request = ('GET', f'/api/prompts/{prompt_id}/', None)
+        elif endpoint == 'apply_variables':
+            body = {'variable_values': {'language': rng.choice(['Python', 'Go', 'Rust']), 'feature': 'login'}}
+            request = ('POST', f'/api/prompts/{prompt_id}/apply_variables/', body)
+        elif endpoint == 'mark_used':
+            request = ('POST', f'/api/prompts/{prompt_id}/mark_used/', {})
+        elif endpoint == 'analytics_overview':
+            request = ('GET', '/api/analytics/overview/', None)
+        elif endpoint == 'analytics_trending':
+            request = ('GET', f'/api/analytics/trending/?period={rng.choice(["24h", "7d", "30d"])}', None)
+        elif endpoint == 'export':
+            request = ('GET', '/api/prompts/export/', None)
+        elif endpoint == 'import':
+            self.import_counter += 1
+            body = {'prompts': [
+                {
+                    'title': f'imported {self.import_counter}-{i}',
+                    'content': ' '.join(rng.choices(WORDS, k=30)),
+                    'category': 'Imported',
+                    'tags': rng.sample(WORDS, 3),
+                }
+                for i in range(20)
+            ]}
+            request = ('POST', '/api/prompts/import_prompts/', body)
+        else:
+            raise ValueError(f'unknown endpoint: {endpoint}')
+        return (*request, self.tokens[user])
+
+
+def issue_tokens(user_ids):
+    from django.contrib.auth.models import User
+    from rest_framework_simplejwt.tokens import RefreshToken
+
+    return {
+        user.pk: str(RefreshToken.for_user(user).access_token)
+        for user in User.objects.filter(pk__in=user_ids)
+    }
+
+
+# ---------------------------------------------------------------------------
+# 실행
+# ---------------------------------------------------------------------------
+
+def percentile(sorted_values, pct):
+    """nearest-rank 백분위수"""
+    if not sorted_values:
+        return None
+    index = max(0, min(len(sorted_values) - 1, int(round(pct / 100 * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[index]
+
+
+def summarize(latencies, errors, wall, queries=None):
+    latencies = sorted(latencies)
+    result = {
+        'requests': len(latencies) + errors,
+        'errors': errors,
+        'p50_ms': _ms(percentile(latencies, 50)),
+        'p95_ms': _ms(percentile(latencies, 95)),
+        'p99_ms': _ms(percentile(latencies, 99)),
+        'mean_ms': _ms(statistics.fmean(latencies)) if latencies else None,
+        'throughput_rps': round(len(latencies) / wall, 2) if wall else None,
+    }
+    if queries is not None:
+        result['queries_mean'] = round(statistics.fmean(queries), 2) if queries else None
+        result['queries_max'] = max(queries) if queries else None
+    return result
+
+
+def _ms(seconds):
+    return None if seconds is None else round(seconds * 1000, 3)
+
+
+def run_inprocess(factory, endpoint, requests, warmup):
+    from django.db import connection
+    from django.test import Client
+    from django.test.utils import CaptureQueriesContext
+
+    client = Client()
+
+    def call(method, path, body, token):
+        headers = {'HTTP_AUTHORIZATION': f'Bearer {token}'}
+        if method == 'GET':
+            response = client.get(path, **headers)
+        else:
+            response = client.post(path, json.dumps(body), content_type='application/json', **headers)
+        if response.streaming:
+            b''.join(response.streaming_content)
+        return response.status_code
+
+    for _ in range(warmup):
+        call(*factory.build(endpoint))
+
+    latencies, queries, errors = [], [], 0
+    started = time.perf_counter()
+    for _ in range(requests):
+        request = factory.build(endpoint)
+        with CaptureQueriesContext(connection) as captured:
+            begin = time.perf_counter()
+            status = call(*request)
+            elapsed = time.perf_counter() - begin
+        if status >= 400:
+            errors += 1
+            continue
+        latencies.append(elapsed)
+        queries.append(len(captured))
+    return summarize(latencies, errors, time.perf_counter() - started, queries)
+
+
+def run_server(factory, endpoint, requests, warmup, base_url, concurrency):
+    def call(method, path, body, token):
+        data = None if body is None else json.dumps(body).encode('utf-8')
+        request = urllib.request.Request(base_url + path, data=data, method=method)
+        request.add_header('Authorization', f'Bearer {token}')
+        if data is not None:
+            request.add_header('Content-Type', 'application/json')
+        begin = time.perf_counter()
+        try:
+            with urllib.request.urlopen(request, timeout=60) as response:
+                response.read()
+                status = response.status
+        except urllib.error.HTTPError as exc:
+            status = exc.code
+        except OSError:
+            status = 599
+        return status, time.perf_counter() - begin
+
+    for _ in range(warmup):
+        call(*factory.build(endpoint))
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(lambda _: call(*factory.build(endpoint)), range(requests)))
+    wall = time.perf_counter() - started
+
+    latencies = [elapsed for status, elapsed in results if status < 400]
+    return summarize(latencies, len(results) - len(latencies), wall)
+
+
+class LocalServer:
+    """테스트 DB 를 쓰는 로컬 WSGI 서버 (LiveServerTestCase 와 같은 스레드 서버)"""
+
+    def __init__(self):
+        from django.test.testcases import LiveServerThread
+
+        self.thread = LiveServerThread('localhost', static_handler=lambda handler: handler, port=0)
+        self.thread.daemon = True
+
+    def __enter__(self):
+        self.thread.start()
+        self.thread.is_ready.wait()
+        if self.thread.error:
+            raise self.thread.error
+        return f'http://localhost:{self.thread.port}'
+
+    def __exit__(self, *exc_info):
+        self.thread.terminate()
+
+
+def _git_revision():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+@contextmanager
+def bench_database():
+    """벤치마크용 임시 테스트 DB (끝나면 삭제)"""
+    from django.db import connection
+    from django.test.utils import setup_test_environment, teardown_test_environment
+
+    from prompts.usage import flush_usage_counters
+    from prompts.usage_queue import flush_usage_queue, get_usage_queue
+
+    # 서버 스레드와 DB 를 공유하도록 SQLite 테스트 DB 는 파일로 만든다
+    tmpdir = tempfile.TemporaryDirectory()
+    if connection.vendor == 'sqlite':
+        connection.settings_dict['TEST']['NAME'] = os.path.join(tmpdir.name, 'bench.sqlite3')
+
+    setup_test_environment()
+    # create_test_db 는 테스트 DB 이름을 돌려주므로 원래 이름은 먼저 읽어 둔다
+    old_name = connection.settings_dict['NAME']
+    connection.creation.create_test_db(verbosity=0)
+    try:
+        yield
+    finally:
+        # config.testing.TestRunner 처럼 DB 를 지우기 전에 남은 사용 기록을 반영하고,
+        # 종료 시 반영(atexit)이 지운 DB 나 원래 DB 에 쓰지 않도록 큐를 버린다
+        flush_usage_counters()
+        if get_usage_queue.cache_info().currsize:
+            flush_usage_queue()
+            get_usage_queue.cache_clear()
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        teardown_test_environment()
+        tmpdir.cleanup()
+
+
+def run(args):
+    import django
+    from django.conf import settings
+    from django.db import connection
+    from django.test.utils import override_settings
+
+    overrides = {}
+    if args.no_response_cache:
+        overrides['PROMPT_RESPONSE_CACHE_TIMEOUT'] = 0
+
+    with bench_database(), override_settings(**overrides):
+        started = time.perf_counter()
+        dataset = seed(
+            args.users, args.prompts, args.tags, args.categories, args.usages, args.seed,
+        )
+        seed_seconds = time.perf_counter() - started
+        tokens = issue_tokens(dataset['users'])
+
+        endpoints = args.endpoints or ENDPOINTS
+        results = {}
+        if args.mode in ('inprocess', 'both'):
+            factory = RequestFactory(dataset, tokens, args.seed)
+            results['inprocess'] = {}
+            for endpoint in endpoints:
+                results['inprocess'][endpoint] = run_inprocess(factory, endpoint, args.requests, args.warmup)
+                _print_row('inprocess', endpoint, results['inprocess'][endpoint])
+        if args.mode in ('server', 'both'):
+            factory = RequestFactory(dataset, tokens, args.seed)
+            results['server'] = {}
+            with LocalServer() as base_url:
+                for endpoint in endpoints:
+                    results['server'][endpoint] = run_server(
+                        factory, endpoint, args.requests, args.warmup, base_url, args.concurrency,
+                    )
+                    _print_row('server', endpoint, results['server'][endpoint])
+
+    return {
+        'meta': {
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+            'git_revision': _git_revision(),
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'database': connection.vendor,
+            'usage_queue': settings.PROMPT_USAGE_QUEUE['BACKEND'],
+            'response_cache': not args.no_response_cache,
+            'seed_seconds': round(seed_seconds, 2),
+            'config': {
+                'users': args.users,
+                'prompts_per_user': args.prompts,
+                'tags': args.tags,
+                'categories': args.categories,
+                'usages': args.usages,
+                'seed': args.seed,
+                'requests': args.requests,
+                'warmup': args.warmup,
+                'concurrency': args.concurrency,
+            },
+        },
+        'results': results,
+    }
+
+
+def _print_row(mode, endpoint, result):
+    queries = result.get('queries_mean')
+    print(
+        f'{mode:<10} {endpoint:<20} '
+        f'p50 {result["p50_ms"] or 0:8.2f} ms  p95 {result["p95_ms"] or 0:8.2f} ms  '
+        f'p99 {result["p99_ms"] or 0:8.2f} ms  {result["throughput_rps"] or 0:9.1f} req/s'
+        + (f'  {queries:6.1f} queries' if queries is not None else '')
+        + (f'  {result["errors"]} errors' if result['errors'] else '')
+    )
+
+
+# ---------------------------------------------------------------------------
+# 기준 결과 비교
+# ---------------------------------------------------------------------------
+
+def compare(baseline, current, threshold):
+    """기준 대비 p95 가 threshold 이상 느려졌거나 평균 쿼리 수가 늘어난 항목 목록"""
+    regressions = []
+    print(f'\n{"":<10} {"endpoint":<20} {"p95 base":>10} {"p95 now":>10} {"change":>8} {"queries":>15}')
+    for mode, endpoints in current['results'].items():
+        for endpoint, now in endpoints.items():
+            base = baseline.get('results', {}).get(mode, {}).get(endpoint)
+            if not base or base.get('p95_ms') is None or now.get('p95_ms') is None:
+                continue
+            change = now['p95_ms'] / base['p95_ms'] - 1 if base['p95_ms'] else 0.0
+            queries = ''
+            query_regression = False
+            if base.get('queries_mean') is not None and now.get('queries_mean') is not None:
+                queries = f'{base["queries_mean"]:.1f} -> {now["queries_mean"]:.1f}'
+                query_regression = now['queries_mean'] > base['queries_mean']
+            flag = ''
+            if change > threshold or query_regression:
+                flag = '  REGRESSION'
+                regressions.append((mode, endpoint))
+            print(
+                f'{mode:<10} {endpoint:<20} {base["p95_ms"]:10.2f} {now["p95_ms"]:10.2f} '
+                f'{change:+8.1%} {queries:>15}{flag}'
+            )
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--users', type=int, default=20)
+    parser.add_argument('--prompts', type=int, default=50, help='사용자당 프롬프트 수')
+    parser.add_argument('--tags', type=int, default=100)
+    parser.add_argument('--categories', type=int, default=10)
+    parser.add_argument('--usages', type=int, default=20000, help='PromptUsage 행 수')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--requests', type=int, default=200, help='엔드포인트별 측정 요청 수')
+    parser.add_argument('--warmup', type=int, default=10)
+    parser.add_argument('--concurrency', type=int, default=8, help='server 모드 동시 요청 수')
+    parser.add_argument('--mode', choices=['inprocess', 'server', 'both'], default='both')
+    parser.add_argument('--endpoints', nargs='*', choices=ENDPOINTS)
+    parser.add_argument('--no-response-cache', action='store_true', help='응답 캐시를 끄고 측정')
+    parser.add_argument('--output', help='결과 JSON 경로')
+    parser.add_argument('--baseline', help='비교할 기준 결과 JSON 경로')
+    parser.add_argument('--threshold', type=float, default=0.2, help='p95 회귀 허용 비율 (기본 20%%)')
+    parser.add_argument('--fail-on-regression', action='store_true')
+    args = parser.parse_args()
+
+    setup_django()
+    report = run(args)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as fp:
+            json.dump(report, fp, indent=2, ensure_ascii=False)
+        print(f'\nresults written to {args.output}')
+
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as fp:
+            regressions = compare(json.load(fp), report, args.threshold)
+        if regressions and args.fail_on_regression:
+            raise SystemExit(1)
+
+
+if __name__ == '__main__':
+    main()
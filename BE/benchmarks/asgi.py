@@ -0,0 +1,247 @@
+"""
+WSGI / ASGI 동시 처리량 비교
+
+benchmarks.api 와 같은 시드 데이터에서 조회 엔드포인트를 동시에 호출해 처리량과
+p50/p95/p99 지연을 비교한다. HTTP 서버 없이 Django 핸들러를 직접 호출하므로
+서버 구현(gunicorn/uvicorn) 차이는 포함되지 않고, 같은 요청 목록을 모든 방식에 쓴다.
+
+- wsgi: WSGIHandler + 스레드 N 개, 동기 뷰 (/api/...)
+- asgi-sync: ASGIHandler + 이벤트 루프(동시 요청 N 개), 동기 뷰 (Django 가 스레드에서 실행)
+- asgi: ASGIHandler + 이벤트 루프(동시 요청 N 개), 비동기 뷰 (/api/async/...)
+
+    python -m benchmarks.asgi --concurrency 16 --requests 400 --output asgi.json
+    python -m benchmarks.asgi --no-cache --endpoints analytics_overview
+"""
+import argparse
+import asyncio
+import io
+import json
+import platform
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from .api import RequestFactory, bench_database, issue_tokens, seed, setup_django, summarize
+
+ENDPOINTS = ['list', 'search', 'analytics_overview', 'analytics_trending']
+MODES = ['wsgi', 'asgi-sync', 'asgi']
+
+
+def async_path(path):
+    """동기 엔드포인트 경로 -> /api/async/ 경로"""
+    return path.replace('/api/', '/api/async/', 1)
+
+
+def wsgi_call(handler, path, token, method='GET', body=None):
+    path, _, query = path.partition('?')
+    payload = json.dumps(body).encode('utf-8') if body is not None else b''
+    environ = {
+        'REQUEST_METHOD': method,
+        'SCRIPT_NAME': '',
+        'PATH_INFO': path,
+        'QUERY_STRING': query,
+        'SERVER_NAME': 'testserver',
+        'SERVER_PORT': '80',
+        'SERVER_PROTOCOL': 'HTTP/1.1',
+        'HTTP_HOST': 'testserver',
+        'HTTP_AUTHORIZATION': f'Bearer {token}',
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': 'http',
+        'CONTENT_TYPE': 'application/json',
+        'CONTENT_LENGTH': str(len(payload)),
+        'wsgi.input': io.BytesIO(payload),
+        'wsgi.errors': sys.stderr,
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': False,
+        'wsgi.run_once': False,
+    }
+    statuses = []
+
+    def start_response(status, headers, exc_info=None):
+        statuses.append(int(status.split(' ', 1)[0]))
+
+    begin = time.perf_counter()
+    response = handler(environ, start_response)
+    try:
+        for _ in response:
+            pass
+    finally:
+        response.close()
+    return statuses[0], time.perf_counter() - begin
+
+
+async def asgi_call(app, path, token):
+    path, _, query = path.partition('?')
+    scope = {
+        'type': 'http',
+        'asgi': {'version': '3.0'},
+        'http_version': '1.1',
+        'method': 'GET',
+        'scheme': 'http',
+        'path': path,
+        'raw_path': path.encode('utf-8'),
+        'query_string': query.encode('utf-8'),
+        'root_path': '',
+        'headers': [
+            (b'host', b'testserver'),
+            (b'authorization', f'Bearer {token}'.encode('ascii')),
+        ],
+        'client': ('127.0.0.1', 0),
+        'server': ('testserver', 80),
+    }
+    request_sent = False
+    statuses = []
+
+    async def receive():
+        nonlocal request_sent
+        if not request_sent:
+            request_sent = True
+            return {'type': 'http.request', 'body': b'', 'more_body': False}
+        # 연결 종료 감지용 대기 - 응답이 끝나면 Django 가 취소한다
+        await asyncio.Future()
+
+    async def send(message):
+        if message['type'] == 'http.response.start':
+            statuses.append(message['status'])
+
+    begin = time.perf_counter()
+    await app(scope, receive, send)
+    return statuses[0], time.perf_counter() - begin
+
+
+def run_wsgi(requests, warmup, concurrency):
+    from django.core.handlers.wsgi import WSGIHandler
+
+    handler = WSGIHandler()
+    for _, path, _, token in warmup:
+        wsgi_call(handler, path, token)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(lambda request: wsgi_call(handler, request[1], request[3]), requests))
+    return _summary(results, time.perf_counter() - started)
+
+
+def run_asgi(requests, warmup, concurrency, executor_threads, use_async_views):
+    from django.core.handlers.asgi import ASGIHandler
+
+    app = ASGIHandler()
+    to_path = async_path if use_async_views else (lambda path: path)
+
+    async def main():
+        # sync_to_async(thread_sensitive=False) 는 이벤트 루프 기본 executor 를 쓴다
+        asyncio.get_running_loop().set_default_executor(ThreadPoolExecutor(max_workers=executor_threads))
+        for _, path, _, token in warmup:
+            await asgi_call(app, to_path(path), token)
+
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def call(request):
+            async with semaphore:
+                return await asgi_call(app, to_path(request[1]), request[3])
+
+        started = time.perf_counter()
+        results = await asyncio.gather(*(call(request) for request in requests))
+        return _summary(results, time.perf_counter() - started)
+
+    return asyncio.run(main())
+
+
+def _summary(results, wall):
+    latencies = [elapsed for status, elapsed in results if status < 400]
+    return summarize(latencies, len(results) - len(latencies), wall)
+
+
+def run(args):
+    import django
+    from django.db import connection
+    from django.test.utils import override_settings
+
+    overrides = {}
+    if args.no_cache:
+        overrides.update(PROMPT_RESPONSE_CACHE_TIMEOUT=0, TRENDING_CACHE_TIMEOUT=0)
+
+    results = {mode: {} for mode in args.modes}
+    with bench_database(), override_settings(**overrides):
+        dataset = seed(args.users, args.prompts, args.tags, args.categories, args.usages, args.seed)
+        tokens = issue_tokens(dataset['users'])
+        # 스레드/코루틴이 각자 연결을 열도록 시드에 쓴 연결은 닫는다
+        connection.close()
+
+        for endpoint in args.endpoints or ENDPOINTS:
+            factory = RequestFactory(dataset, tokens, args.seed)
+            warmup = [factory.build(endpoint) for _ in range(args.warmup)]
+            requests = [factory.build(endpoint) for _ in range(args.requests)]
+            for mode in args.modes:
+                if mode == 'wsgi':
+                    result = run_wsgi(requests, warmup, args.concurrency)
+                else:
+                    result = run_asgi(
+                        requests, warmup, args.concurrency, args.executor_threads,
+                        use_async_views=(mode == 'asgi'),
+                    )
+                results[mode][endpoint] = result
+                _print_row(mode, endpoint, result)
+
+    return {
+        'meta': {
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'database': connection.vendor,
+            'cache': not args.no_cache,
+            'config': {
+                'users': args.users,
+                'prompts_per_user': args.prompts,
+                'tags': args.tags,
+                'categories': args.categories,
+                'usages': args.usages,
+                'seed': args.seed,
+                'requests': args.requests,
+                'warmup': args.warmup,
+                'concurrency': args.concurrency,
+                'executor_threads': args.executor_threads,
+            },
+        },
+        'results': results,
+    }
+
+
+def _print_row(mode, endpoint, result):
+    print(
+        f'{mode:<10} {endpoint:<20} '
+        f'p50 {result["p50_ms"] or 0:8.2f} ms  p95 {result["p95_ms"] or 0:8.2f} ms  '
+        f'p99 {result["p99_ms"] or 0:8.2f} ms  {result["throughput_rps"] or 0:9.1f} req/s'
+        + (f'  {result["errors"]} errors' if result['errors'] else '')
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--users', type=int, default=20)
+    parser.add_argument('--prompts', type=int, default=50, help='사용자당 프롬프트 수')
+    parser.add_argument('--tags', type=int, default=100)
+    parser.add_argument('--categories', type=int, default=10)
+    parser.add_argument('--usages', type=int, default=20000, help='PromptUsage 행 수')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--requests', type=int, default=400, help='엔드포인트/방식별 측정 요청 수')
+    parser.add_argument('--warmup', type=int, default=10)
+    parser.add_argument('--concurrency', type=int, default=16, help='동시 요청 수 (WSGI 스레드 수)')
+    parser.add_argument('--executor-threads', type=int, default=32, help='ASGI 이벤트 루프 기본 executor 스레드 수')
+    parser.add_argument('--modes', nargs='*', choices=MODES, default=MODES)
+    parser.add_argument('--endpoints', nargs='*', choices=ENDPOINTS)
+    parser.add_argument('--no-cache', action='store_true', help='응답 캐시와 인기 프롬프트 캐시를 끄고 측정')
+    parser.add_argument('--output', help='결과 JSON 경로')
+    args = parser.parse_args()
+
+    setup_django()
+    report = run(args)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as fp:
+            json.dump(report, fp, indent=2, ensure_ascii=False)
+        print(f'\nresults written to {args.output}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,186 @@
+"""
+SQLite 동시 읽기/쓰기 스트레스 테스트
+
+파일 SQLite DB 에 시드 데이터를 만든 뒤 읽기 스레드(list/search/retrieve)와
+쓰기 스레드(mark_used/apply_variables/import)를 정해진 시간 동안 동시에 돌려
+읽기/쓰기 처리량, p95 지연, 오류 수(database is locked 등)를 비교한다.
+
+설정은 시작할 때 읽히므로 모드마다 SQLITE_CONCURRENT_MODE 를 바꿔 하위 프로세스로 실행한다.
+- default: Django 기본 SQLite (rollback journal, 사용 횟수는 요청 스레드도 기록)
+- concurrent: SQLITE_CONCURRENT_MODE=True (WAL + PRAGMA, BEGIN IMMEDIATE, 단일 usage writer)
+
+    python -m benchmarks.sqlite_stress --readers 8 --writers 4 --duration 10 --output stress.json
+"""
+import argparse
+import json
+import logging
+import os
+import platform
+import subprocess
+import sys
+import threading
+import time
+
+from .api import RequestFactory, bench_database, issue_tokens, seed, setup_django, summarize
+from .asgi import wsgi_call
+
+MODES = {
+    'default': {'SQLITE_CONCURRENT_MODE': 'False'},
+    'concurrent': {'SQLITE_CONCURRENT_MODE': 'True'},
+}
+READ_ENDPOINTS = ['list', 'search', 'retrieve']
+WRITE_ENDPOINTS = ['mark_used', 'apply_variables', 'import']
+
+
+def _worker(handler, factory, endpoints, deadline, results, errors):
+    index = 0
+    while time.perf_counter() < deadline:
+        method, path, body, token = factory.build(endpoints[index % len(endpoints)])
+        index += 1
+        try:
+            status, elapsed = wsgi_call(handler, path, token, method=method, body=body)
+        except Exception as exc:
+            errors.append(type(exc).__name__)
+            continue
+        if status < 400:
+            results.append(elapsed)
+        else:
+            errors.append(str(status))
+
+
+def run_mode(args):
+    """현재 프로세스 설정으로 한 번 측정 (하위 프로세스에서 실행)"""
+    import django
+    from django.conf import settings
+    from django.core.handlers.wsgi import WSGIHandler
+    from django.core.signals import got_request_exception
+    from django.db import connection
+    from django.test.utils import override_settings
+
+    from prompts.usage import flush_usage_counters
+    from prompts.usage_queue import flush_usage_queue
+
+    if connection.vendor != 'sqlite':
+        raise SystemExit('sqlite_stress 는 SQLite 에서만 실행한다')
+
+    # 500 응답의 원인 예외 (database is locked 등)
+    exceptions = []
+
+    def on_exception(sender, request=None, **kwargs):
+        exceptions.append(str(sys.exc_info()[1]))
+
+    got_request_exception.connect(on_exception, weak=False)
+    # 실패 요청마다 traceback 을 찍지 않도록
+    logging.getLogger('django.request').setLevel(logging.CRITICAL)
+
+    with bench_database(), override_settings(PROMPT_RESPONSE_CACHE_TIMEOUT=0):
+        dataset = seed(args.users, args.prompts, args.tags, args.categories, args.usages, args.seed)
+        tokens = issue_tokens(dataset['users'])
+        connection.close()
+
+        handler = WSGIHandler()
+        reads, read_errors, writes, write_errors = [], [], [], []
+        deadline = time.perf_counter() + args.duration
+        threads = [
+            threading.Thread(
+                target=_worker,
+                args=(handler, RequestFactory(dataset, tokens, args.seed + i), READ_ENDPOINTS, deadline, reads, read_errors),
+            )
+            for i in range(args.readers)
+        ] + [
+            threading.Thread(
+                target=_worker,
+                args=(handler, RequestFactory(dataset, tokens, args.seed + 1000 + i), WRITE_ENDPOINTS, deadline, writes, write_errors),
+            )
+            for i in range(args.writers)
+        ]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        wall = time.perf_counter() - started
+
+        flush_usage_queue()
+        flush_usage_counters()
+        journal_mode = connection.cursor().execute('PRAGMA journal_mode').fetchone()[0]
+
+    locked = sum('locked' in message for message in exceptions)
+    return {
+        'django': django.get_version(),
+        'engine': settings.DATABASES['default']['ENGINE'],
+        'journal_mode': journal_mode,
+        'single_writer': settings.PROMPT_USAGE_QUEUE.get('SINGLE_WRITER', False),
+        'reads': summarize(reads, len(read_errors), wall),
+        'writes': summarize(writes, len(write_errors), wall),
+        'locked_errors': locked,
+    }
+
+
+def _print_row(mode, result):
+    for kind in ('reads', 'writes'):
+        row = result[kind]
+        print(
+            f'{mode:<11} {kind:<7} p50 {row["p50_ms"] or 0:8.2f} ms  p95 {row["p95_ms"] or 0:8.2f} ms  '
+            f'{row["throughput_rps"] or 0:8.1f} req/s  {row["errors"]} errors'
+        )
+    if result['locked_errors']:
+        print(f'{mode:<11} {result["locked_errors"]} "database is locked" errors')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--users', type=int, default=20)
+    parser.add_argument('--prompts', type=int, default=50, help='사용자당 프롬프트 수')
+    parser.add_argument('--tags', type=int, default=100)
+    parser.add_argument('--categories', type=int, default=10)
+    parser.add_argument('--usages', type=int, default=20000, help='PromptUsage 행 수')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--readers', type=int, default=8, help='읽기 스레드 수')
+    parser.add_argument('--writers', type=int, default=4, help='쓰기 스레드 수')
+    parser.add_argument('--duration', type=float, default=10, help='모드별 측정 시간(초)')
+    parser.add_argument('--modes', nargs='*', choices=list(MODES), default=list(MODES))
+    parser.add_argument('--output', help='결과 JSON 경로')
+    parser.add_argument('--child', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        setup_django()
+        json.dump(run_mode(args), sys.stdout)
+        return
+
+    child_args = sys.argv[1:]
+    results = {}
+    for mode in args.modes:
+        env = {**os.environ, **MODES[mode], 'DB_REPLICAS': ''}
+        completed = subprocess.run(
+            [sys.executable, '-m', 'benchmarks.sqlite_stress', *child_args, '--child'],
+            env=env, capture_output=True, text=True, check=True,
+        )
+        results[mode] = json.loads(completed.stdout.strip().splitlines()[-1])
+        _print_row(mode, results[mode])
+
+    report = {
+        'meta': {
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+            'python': platform.python_version(),
+            'config': {
+                'users': args.users,
+                'prompts_per_user': args.prompts,
+                'usages': args.usages,
+                'seed': args.seed,
+                'readers': args.readers,
+                'writers': args.writers,
+                'duration': args.duration,
+            },
+        },
+        'results': results,
+    }
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as fp:
+            json.dump(report, fp, indent=2, ensure_ascii=False)
+        print(f'\nresults written to {args.output}')
+
+
+if __name__ == '__main__':
+    main()
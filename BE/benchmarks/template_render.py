@@ -0,0 +1,84 @@
+"""
+Prompt.apply_variables 마이크로 벤치마크
+
+변수마다 re.sub 로 전체 내용을 훑던 기존 구현과
+한 번 파싱해 join 하는 컴파일 템플릿을 비교한다.
+
+    python -m benchmarks.template_render --variables 200 --repeat 20
+"""
+import argparse
+import random
+import re
+import string
+import timeit
+
+from prompts.templating import CompiledTemplate, TemplateCache
+
+
+def legacy_apply_variables(content, variable_values):
+    """기존 구현 (변수 수 x 내용 길이)"""
+    result = content
+    for var_name, var_value in variable_values.items():
+        pattern = r'\{\{' + var_name + r'\}\}'
+        result = re.sub(pattern, var_value, result)
+    return result
+
+
+def legacy_extract_variables(content):
+    return list(set(re.findall(r'\{\{(\w+)\}\}', content)))
+
+
+def make_template(num_variables, words_per_variable, seed=0):
+    rng = random.Random(seed)
+    names = [f'var_{i}' for i in range(num_variables)]
+    parts = []
+    for name in names:
+        parts.extend(
+            ''.join(rng.choices(string.ascii_lowercase, k=rng.randint(3, 9)))
+            for _ in range(words_per_variable)
+        )
+        parts.append('{{' + name + '}}')
+    content = ' '.join(parts)
+    values = {name: f'value for {name}' for name in names}
+    return content, values
+
+
+def run(num_variables, words_per_variable, repeat):
+    content, values = make_template(num_variables, words_per_variable)
+
+    compiled = CompiledTemplate(content)
+    assert compiled.render(values) == legacy_apply_variables(content, values)
+    assert sorted(compiled.variables) == sorted(legacy_extract_variables(content))
+
+    cache = TemplateCache()
+    key = (1, 'updated_at')
+
+    cases = {
+        'legacy re.sub': lambda: legacy_apply_variables(content, values),
+        'compiled (cold)': lambda: CompiledTemplate(content).render(values),
+        'compiled (cached)': lambda: cache.get(key, content).render(values),
+        'legacy extract': lambda: legacy_extract_variables(content),
+        'compiled extract (cached)': lambda: cache.get(key, content).variables,
+    }
+
+    print(f'content: {len(content):,} chars, variables: {num_variables}, repeat: {repeat}')
+    baseline = None
+    for label, func in cases.items():
+        elapsed = min(timeit.repeat(func, number=repeat, repeat=3)) / repeat
+        if label == 'legacy re.sub':
+            baseline = elapsed
+        speedup = f'  x{baseline / elapsed:,.1f}' if baseline and 'extract' not in label else ''
+        print(f'{label:<28} {elapsed * 1000:10.3f} ms{speedup}')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--variables', type=int, default=200)
+    parser.add_argument('--words', type=int, default=50, help='변수 사이 단어 수')
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+    run(args.variables, args.words, args.repeat)
+
+
+if __name__ == '__main__':
+    main()
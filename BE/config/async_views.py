@@ -0,0 +1,70 @@
+"""
+비동기(ASGI) 조회 뷰 기반
+
+DRF 3.14 APIView 는 동기 전용이다. AsyncAPIView 는 인증/권한/스로틀 확인만 스레드에서
+실행하고 핸들러는 코루틴으로 실행해, ASGI 에서 느린 조회가 워커 스레드를 붙잡지 않게 한다.
+
+Django 5.0 비동기 ORM(aget, aaggregate, async for ...)도 쿼리는 스레드에서 실행하며,
+요청 하나의 thread_sensitive 호출은 같은 스레드에서 차례로 처리된다. 서로 독립적인 쿼리는
+gather_queries 로 각자 다른 스레드/DB 연결에서 동시에 실행한다 (ASYNC_PARALLEL_QUERIES).
+"""
+import asyncio
+import inspect
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections
+from rest_framework.views import APIView
+
+
+def _in_worker(func):
+    """작업 스레드에서 실행한 뒤 그 스레드의 연결을 CONN_MAX_AGE 에 따라 정리"""
+    def run():
+        try:
+            return func()
+        finally:
+            close_old_connections()
+    return run
+
+
+async def gather_queries(*funcs):
+    """
+    인자 없는 동기 ORM 함수들을 동시에 실행해 결과를 순서대로 돌려준다
+
+    ASYNC_PARALLEL_QUERIES 가 꺼져 있으면 요청 스레드에서 차례로 실행한다.
+    TestCase 트랜잭션이나 SQLite 메모리 DB 의 데이터는 다른 연결에서 보이지 않는다.
+    """
+    if not settings.ASYNC_PARALLEL_QUERIES:
+        return [await sync_to_async(func)() for func in funcs]
+    return await asyncio.gather(*(
+        sync_to_async(_in_worker(func), thread_sensitive=False)() for func in funcs
+    ))
+
+
+class AsyncAPIView(APIView):
+    """핸들러(get 등)를 async def 로 작성하는 APIView"""
+
+    async def dispatch(self, request, *args, **kwargs):
+        # APIView.dispatch 와 같은 흐름 - DB 를 쓰는 initial() 만 스레드에서 실행
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+
+        try:
+            await sync_to_async(self.initial)(request, *args, **kwargs)
+
+            if request.method.lower() in self.http_method_names:
+                handler = getattr(self, request.method.lower(), self.http_method_not_allowed)
+            else:
+                handler = self.http_method_not_allowed
+
+            response = handler(request, *args, **kwargs)
+            if inspect.isawaitable(response):
+                response = await response
+        except Exception as exc:
+            response = self.handle_exception(exc)
+
+        self.response = self.finalize_response(request, response, *args, **kwargs)
+        return self.response
@@ -0,0 +1,24 @@
+"""
+SQLite 동시성 모드 백엔드 (SQLITE_CONCURRENT_MODE)
+
+- 연결마다 SQLITE_PRAGMAS 를 적용한다 (connection_created): WAL 저널, synchronous,
+  busy_timeout, mmap_size, cache_size. WAL 에서는 읽기와 쓰기가 서로를 막지 않는다.
+- 트랜잭션을 BEGIN IMMEDIATE 로 시작한다. 기본 BEGIN(DEFERRED)은 읽던 트랜잭션이 쓰기로
+  바뀔 때 다른 쓰기가 먼저 있었으면 busy_timeout 을 기다리지 않고 바로 "database is locked" 를 낸다.
+"""
+from django.conf import settings
+from django.db.backends.signals import connection_created
+from django.db.backends.sqlite3 import base
+from django.dispatch import receiver
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    def _start_transaction_under_autocommit(self):
+        self.cursor().execute('BEGIN IMMEDIATE')
+
+
+@receiver(connection_created, sender=DatabaseWrapper)
+def apply_pragmas(sender, connection, **kwargs):
+    with connection.cursor() as cursor:
+        for name, value in settings.SQLITE_PRAGMAS.items():
+            cursor.execute(f'PRAGMA {name} = {value}')
@@ -0,0 +1,122 @@
+"""
+읽기 replica DB 라우팅
+
+쓰기는 항상 default(primary)로 간다. 읽기는 요청 단위로 정한다.
+- ReplicaRoutingMiddleware 가 요청마다 라우팅 상태를 만든다 (contextvar, 비동기 뷰 작업 스레드에도 전달)
+- ReplicaReadMixin 을 단 뷰의 조회 action(안전한 메서드)만 replica 하나를 골라 요청 끝까지 쓴다
+- 로그인 사용자가 쓰기 요청을 하면 DB_REPLICA_STICKY_SECONDS 동안 그 사용자의 읽기는
+  primary 에서 한다 (복제 지연 중에도 방금 쓴 내용이 보이도록, read-your-writes)
+- 트랜잭션 안의 읽기, 요청 밖(관리 명령, 백그라운드 스레드)의 읽기는 primary
+- 응답 캐시(prompts.response_cache)는 DB_REPLICA_STICKY_SECONDS 안에 바뀐 스코프의 응답을
+  use_primary 로 primary 에서 만든다 (지연된 replica 결과가 새 버전 키로 캐시되지 않도록)
+
+primary 와 같은 DB 를 가리키는 replica 는 쓰지 않는다. 테스트에서는 replica 가
+TEST MIRROR 로 default 테스트 DB 를 가리키므로 모든 쿼리가 default 로 간다.
+"""
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connections
+from rest_framework.permissions import SAFE_METHODS
+
+STICKY_KEY = 'db:sticky:user:{user_id}'
+
+_routing = ContextVar('db_routing', default=None)
+
+
+class RoutingState:
+    """요청 하나의 읽기 DB (None 이면 primary)"""
+
+    def __init__(self):
+        self.read_alias = None
+
+
+def _same_database(alias):
+    primary = settings.DATABASES[DEFAULT_DB_ALIAS]
+    replica = settings.DATABASES[alias]
+    return all(replica.get(key) == primary.get(key) for key in ('ENGINE', 'NAME', 'HOST', 'PORT'))
+
+
+def replica_aliases():
+    """primary 와 다른 DB 를 가리키는 replica alias 목록"""
+    return [alias for alias in settings.DATABASES if alias != DEFAULT_DB_ALIAS and not _same_database(alias)]
+
+
+@contextmanager
+def routing_scope():
+    """블록 안의 읽기 라우팅 상태 (미들웨어가 요청마다 사용)"""
+    state = RoutingState()
+    token = _routing.set(state)
+    try:
+        yield state
+    finally:
+        _routing.reset(token)
+
+
+def is_sticky(user):
+    return bool(user and user.is_authenticated and cache.get(STICKY_KEY.format(user_id=user.pk)))
+
+
+def mark_sticky(user):
+    """user 의 읽기를 잠시 primary 로 고정"""
+    timeout = settings.DB_REPLICA_STICKY_SECONDS
+    if timeout and user and user.is_authenticated:
+        cache.set(STICKY_KEY.format(user_id=user.pk), True, timeout)
+
+
+def use_replica(user=None):
+    """현재 요청의 읽기를 replica 로 (replica 가 없거나 user 가 고정 상태면 그대로 primary)"""
+    state = _routing.get()
+    aliases = replica_aliases()
+    if state is None or not aliases or is_sticky(user):
+        return None
+    state.read_alias = random.choice(aliases)
+    return state.read_alias
+
+
+def use_primary():
+    """현재 요청의 남은 읽기를 primary 로 (replica 를 골랐더라도)"""
+    state = _routing.get()
+    if state is not None:
+        state.read_alias = None
+
+
+class PrimaryReplicaRouter:
+    """DATABASE_ROUTERS - 쓰기는 primary, 읽기는 요청 라우팅 상태를 따른다"""
+
+    def db_for_read(self, model, **hints):
+        state = _routing.get()
+        if state is None or state.read_alias is None:
+            return DEFAULT_DB_ALIAS
+        if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        return state.read_alias
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # 모든 alias 가 같은 데이터를 가진다
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # replica 스키마는 복제(또는 sync_sqlite_replicas)로 맞춘다
+        return db == DEFAULT_DB_ALIAS
+
+
+class ReplicaReadMixin:
+    """
+    APIView/ViewSet 용 - 안전한 메서드의 조회를 replica 에서 읽는다
+
+    replica_actions 가 None 이면 모든 GET/HEAD/OPTIONS, 아니면 ViewSet action 이름 집합
+    """
+    replica_actions = None
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        action = getattr(self, 'action', None)
+        if request.method in SAFE_METHODS and (self.replica_actions is None or action in self.replica_actions):
+            use_replica(request.user)
@@ -0,0 +1,158 @@
+"""
+요청별 SQL 계측 미들웨어 (+ replica 라우팅 상태, ReplicaRoutingMiddleware)
+
+모든 DB 연결에 execute_wrapper 를 한 번 설치하고, 요청마다 contextvar 에 둔 QueryStats 로
+쿼리 수와 시간을 모은다. sync_to_async 는 contextvar 를 작업 스레드로 복사하므로
+비동기 뷰가 다른 스레드/연결에서 실행한 쿼리도 해당 요청에 합산된다.
+
+- Server-Timing 헤더 (REQUEST_TIMING_HEADER): db(쿼리 시간/수), app(전체 처리 시간)
+- 느린 요청 로그: 처리 시간이 SLOW_REQUEST_MS 이상이거나 쿼리 수가 SLOW_REQUEST_QUERIES
+  이상이면 뷰 이름과 함께 WARNING 으로 남긴다 (0 이면 해당 기준 사용 안 함)
+
+StreamingHttpResponse 본문을 만드는 동안 실행되는 쿼리는 응답을 돌려준 뒤라 포함되지 않는다.
+"""
+import logging
+import threading
+import time
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+from rest_framework.permissions import SAFE_METHODS
+
+from .db_router import mark_sticky, routing_scope
+
+logger = logging.getLogger(__name__)
+
+_current_stats = ContextVar('query_stats', default=None)
+
+
+class QueryStats:
+    """execute_wrapper - 쿼리 수와 누적 시간 (여러 스레드에서 동시에 호출될 수 있다)"""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self._lock = threading.Lock()
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                self.duration += elapsed
+                self.count += 1
+
+
+def _record_query(execute, sql, params, many, context):
+    stats = _current_stats.get()
+    if stats is None:
+        return execute(sql, params, many, context)
+    return stats(execute, sql, params, many, context)
+
+
+@receiver(connection_created)
+def install_query_recorder(sender, connection, **kwargs):
+    # execute_wrapper() 컨텍스트는 마지막 항목을 pop 하므로 맨 앞에 넣는다
+    if _record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.insert(0, _record_query)
+
+
+class QueryTimingMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+
+        # 미들웨어를 불러오기 전에 열린 연결에도 설치
+        for connection in connections.all():
+            install_query_recorder(sender=None, connection=connection)
+
+        stats = QueryStats()
+        token = _current_stats.set(stats)
+        start = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            _current_stats.reset(token)
+        return self.process(request, response, stats, time.perf_counter() - start)
+
+    async def __acall__(self, request):
+        stats = QueryStats()
+        token = _current_stats.set(stats)
+        start = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current_stats.reset(token)
+        return self.process(request, response, stats, time.perf_counter() - start)
+
+    def process(self, request, response, stats, elapsed):
+        if settings.REQUEST_TIMING_HEADER:
+            response['Server-Timing'] = (
+                f'db;dur={stats.duration * 1000:.1f};desc="{stats.count} queries", '
+                f'app;dur={elapsed * 1000:.1f}'
+            )
+
+        slow_ms = settings.SLOW_REQUEST_MS
+        slow_queries = settings.SLOW_REQUEST_QUERIES
+        if (slow_ms and elapsed * 1000 >= slow_ms) or (slow_queries and stats.count >= slow_queries):
+            match = request.resolver_match
+            logger.warning(
+                'Slow request %s %s (%s): %.1f ms, %d queries (%.1f ms)',
+                request.method,
+                request.path,
+                (match.view_name or match._func_path) if match else '-',
+                elapsed * 1000,
+                stats.count,
+                stats.duration * 1000,
+            )
+        return response
+
+
+class ReplicaRoutingMiddleware:
+    """
+    요청마다 읽기 DB 라우팅 상태를 만들고 (config.db_router),
+    로그인 사용자의 쓰기 요청 뒤에는 그 사용자의 읽기를 잠시 primary 로 고정한다
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        with routing_scope():
+            response = self.get_response(request)
+        self.process(request, response)
+        return response
+
+    async def __acall__(self, request):
+        with routing_scope():
+            response = await self.get_response(request)
+        if request.method not in SAFE_METHODS:
+            await sync_to_async(self.process)(request, response)
+        return response
+
+    def process(self, request, response):
+        # 실패한 쓰기는 바꾼 것이 없다. DRF 는 인증한 사용자를 HttpRequest.user 에도 넣는다
+        if request.method not in SAFE_METHODS and response.status_code < 400:
+            mark_sticky(getattr(request, 'user', None))
@@ -48,6 +48,7 @@ INSTALLED_APPS = [
     # Third-party apps
     'rest_framework',
     'rest_framework_simplejwt',
+    'rest_framework_simplejwt.token_blacklist',
     'drf_spectacular',
     'taggit',
     'django_filters',
@@ -61,6 +62,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'config.middleware.QueryTimingMiddleware',
+    'config.middleware.ReplicaRoutingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'corsheaders.middleware.CorsMiddleware',
@@ -103,6 +106,53 @@ DATABASES = {
         'PASSWORD': os.getenv('DB_PASSWORD', ''),
         'HOST': os.getenv('DB_HOST', ''),
         'PORT': os.getenv('DB_PORT', ''),
+        # 연결 유지 시간(초, 0 이면 요청마다 새 연결)과 재사용 전 연결 확인
+        'CONN_MAX_AGE': int(os.getenv('DB_CONN_MAX_AGE', 60)),
+        'CONN_HEALTH_CHECKS': os.getenv('DB_CONN_HEALTH_CHECKS', 'True') == 'True',
+    }
+}
+
+# SQLite 동시성 모드 (단일 노드 배포) - config.db_backends.sqlite3 백엔드로 바꿔
+# 연결마다 아래 PRAGMA 를 적용하고 BEGIN IMMEDIATE 로 쓰기 트랜잭션을 시작한다.
+# 사용 이력/사용 횟수는 한 writer 스레드가 기록한다 (PROMPT_USAGE_QUEUE SINGLE_WRITER)
+SQLITE_CONCURRENT_MODE = os.getenv('SQLITE_CONCURRENT_MODE', 'False') == 'True'
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': os.getenv('SQLITE_SYNCHRONOUS', 'NORMAL'),
+    'busy_timeout': int(os.getenv('SQLITE_BUSY_TIMEOUT', 5000)),  # ms
+    'mmap_size': int(os.getenv('SQLITE_MMAP_SIZE', 268435456)),  # bytes
+    'cache_size': int(os.getenv('SQLITE_CACHE_SIZE', -20000)),  # 음수는 KiB 단위
+}
+if SQLITE_CONCURRENT_MODE and DATABASES['default']['ENGINE'] == 'django.db.backends.sqlite3':
+    DATABASES['default']['ENGINE'] = 'config.db_backends.sqlite3'
+
+# 읽기 전용 replica (쉼표 구분, alias 는 replica1, replica2, ...)
+# SQLite 는 파일 이름 (로컬에서 sync_sqlite_replicas 로 primary 를 복사), 그 외는 host 또는 host:port
+for _index, _replica in enumerate(filter(None, os.getenv('DB_REPLICAS', '').split(',')), start=1):
+    if 'sqlite' in DATABASES['default']['ENGINE']:
+        _location = {'NAME': BASE_DIR / _replica.strip()}
+    else:
+        _host, _, _port = _replica.strip().partition(':')
+        _location = {'HOST': _host, 'PORT': _port or DATABASES['default']['PORT']}
+    DATABASES[f'replica{_index}'] = {
+        **DATABASES['default'],
+        **_location,
+        'TEST': {'MIRROR': 'default'},
+    }
+
+DATABASE_ROUTERS = ['config.db_router.PrimaryReplicaRouter']
+
+# 쓰기 요청 뒤 같은 사용자의 읽기를 primary 에서 할 시간(초) - 복제 지연보다 길게
+DB_REPLICA_STICKY_SECONDS = int(os.getenv('DB_REPLICA_STICKY_SECONDS', 5))
+
+
+# Cache
+# https://docs.djangoproject.com/en/5.0/topics/cache/
+
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv('CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.getenv('CACHE_LOCATION', ''),
     }
 }
 
@@ -151,7 +201,7 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 # REST Framework Settings
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'accounts.authentication.CachedJWTAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticatedOrReadOnly',
@@ -174,6 +224,9 @@ SIMPLE_JWT = {
     'BLACKLIST_AFTER_ROTATION': True,
     'ALGORITHM': 'HS256',
 }
+# 인증 사용자 캐시 (accounts.authentication) - 유지 시간(초, 0 이면 사용 안 함)과 최대 사용자 수
+JWT_USER_CACHE_TIMEOUT = int(os.getenv('JWT_USER_CACHE_TIMEOUT', 30))
+JWT_USER_CACHE_SIZE = int(os.getenv('JWT_USER_CACHE_SIZE', 1024))
 
 # drf-spectacular Settings
 SPECTACULAR_SETTINGS = {
@@ -186,3 +239,67 @@ SPECTACULAR_SETTINGS = {
 # CORS Settings
 CORS_ALLOWED_ORIGINS = os.getenv('CORS_ALLOWED_ORIGINS', 'http://localhost:3000').split(',')
 CORS_ALLOW_CREDENTIALS = True
+
+# Prompt Settings
+PROMPT_BATCH_RENDER_MAX = int(os.getenv('PROMPT_BATCH_RENDER_MAX', 10000))
+# 유사 프롬프트 기준 (MinHash 로 추정한 자카드 유사도, similar/ 와 import skip_near_duplicates)
+PROMPT_SIMILARITY_THRESHOLD = float(os.getenv('PROMPT_SIMILARITY_THRESHOLD', 0.8))
+# 로컬 벡터 검색 인덱스 (prompts.vector_index) - 메모리 맵 파일 디렉터리와 벡터 차원
+PROMPT_VECTOR_INDEX_DIR = str(BASE_DIR / os.getenv('PROMPT_VECTOR_INDEX_DIR', 'vector_index'))
+PROMPT_VECTOR_DIM = int(os.getenv('PROMPT_VECTOR_DIM', 512))
+# PromptUsage 보관 기간(일)과 월별 압축 아카이브 디렉터리 (archive_usage 명령, prompts.usage_archive)
+PROMPT_USAGE_RETENTION_DAYS = int(os.getenv('PROMPT_USAGE_RETENTION_DAYS', 180))
+PROMPT_USAGE_ARCHIVE_DIR = str(BASE_DIR / os.getenv('PROMPT_USAGE_ARCHIVE_DIR', 'usage_archive'))
+# 사용자별 frecency 점수 반감기(일) - 바꾸면 rebuild_frecency_scores 로 다시 계산
+PROMPT_FRECENCY_HALF_LIFE_DAYS = float(os.getenv('PROMPT_FRECENCY_HALF_LIFE_DAYS', 14))
+# use_count/last_used write-behind 반영 주기(초)와 버퍼 최대 프롬프트 수
+PROMPT_USAGE_FLUSH_INTERVAL = float(os.getenv('PROMPT_USAGE_FLUSH_INTERVAL', 5))
+PROMPT_USAGE_FLUSH_THRESHOLD = int(os.getenv('PROMPT_USAGE_FLUSH_THRESHOLD', 1000))
+
+# PromptUsage 적재 큐 (prompts.usage_queue)
+# BACKEND: SyncUsageQueue | MemoryUsageQueue | DatabaseUsageQueue
+# 기본값은 at-least-once 인 DatabaseUsageQueue (process_usage_events 워커 필요).
+# MemoryUsageQueue 는 강제 종료 시 큐에 남은 이벤트를 잃으므로 명시적으로 설정하거나
+# SQLite 동시성 모드(단일 writer)에서만 쓴다. 쓰기가 실패하면(database is locked 등) 워커가
+# 이벤트를 버리지 않고 백오프하며 다시 기록한다
+PROMPT_USAGE_QUEUE = {
+    'BACKEND': os.getenv(
+        'PROMPT_USAGE_QUEUE_BACKEND',
+        'prompts.usage_queue.MemoryUsageQueue' if SQLITE_CONCURRENT_MODE else 'prompts.usage_queue.DatabaseUsageQueue',
+    ),
+    'BATCH_SIZE': int(os.getenv('PROMPT_USAGE_QUEUE_BATCH_SIZE', 500)),
+    'MAX_SIZE': int(os.getenv('PROMPT_USAGE_QUEUE_MAX_SIZE', 10000)),
+    'PUT_TIMEOUT': float(os.getenv('PROMPT_USAGE_QUEUE_PUT_TIMEOUT', 0.5)),
+    'FLUSH_INTERVAL': float(os.getenv('PROMPT_USAGE_QUEUE_FLUSH_INTERVAL', 1)),
+    # MemoryUsageQueue 전용 - 워커 스레드 하나만 사용 이력과 use_count/last_used 를 기록하고
+    # 큐가 가득 차면 요청 스레드가 직접 쓰지 않고 기다린다
+    'SINGLE_WRITER': os.getenv('PROMPT_USAGE_QUEUE_SINGLE_WRITER', str(SQLITE_CONCURRENT_MODE)) == 'True',
+    # 단일 writer 에서 큐 자리를 기다리는 최대 시간(초) - 지나면 요청 스레드가 쓰기 락을 잡고 직접 기록
+    'SINGLE_WRITER_TIMEOUT': float(os.getenv('PROMPT_USAGE_QUEUE_SINGLE_WRITER_TIMEOUT', 30)),
+}
+
+# 테스트 DB 를 지우기 전에 남은 사용 기록을 반영 (종료 시 반영이 원래 DB 로 가지 않도록)
+TEST_RUNNER = 'config.testing.TestRunner'
+
+# 인기 프롬프트 응답 캐시 시간(초), 0 이면 캐시하지 않음
+TRENDING_CACHE_TIMEOUT = int(os.getenv('TRENDING_CACHE_TIMEOUT', 60))
+
+# 요청별 SQL 계측 (config.middleware.QueryTimingMiddleware)
+# Server-Timing 헤더 노출 여부, 느린 요청 로그 기준 (처리 시간 ms / 쿼리 수, 0 이면 사용 안 함)
+REQUEST_TIMING_HEADER = os.getenv('REQUEST_TIMING_HEADER', str(DEBUG)) == 'True'
+SLOW_REQUEST_MS = int(os.getenv('SLOW_REQUEST_MS', 500))
+SLOW_REQUEST_QUERIES = int(os.getenv('SLOW_REQUEST_QUERIES', 30))
+
+# 목록/즐겨찾기/검색 응답을 .values() 기반 빠른 경로로 직렬화 (False 면 ModelSerializer)
+PROMPT_FAST_SERIALIZATION = os.getenv('PROMPT_FAST_SERIALIZATION', 'True') == 'True'
+
+# 프롬프트 목록/상세 응답 캐시 유지 시간 (초, 0 이면 사용 안 함) - 변경 시 버전 키로 즉시 무효화
+PROMPT_RESPONSE_CACHE_TIMEOUT = int(os.getenv('PROMPT_RESPONSE_CACHE_TIMEOUT', 300))
+
+# 자동완성 prefix 인덱스 (prompts.autocomplete) - 프로세스당 보관할 스코프 수, 변경이 없어도 다시 만드는 주기(초)
+PROMPT_AUTOCOMPLETE_CACHE_SIZE = int(os.getenv('PROMPT_AUTOCOMPLETE_CACHE_SIZE', 256))
+PROMPT_AUTOCOMPLETE_MAX_AGE = int(os.getenv('PROMPT_AUTOCOMPLETE_MAX_AGE', 300))
+
+# 비동기 뷰(/api/async/)의 독립 쿼리를 각자 다른 스레드/DB 연결에서 동시에 실행
+# (False 면 요청 스레드에서 차례로 실행, SQLite 메모리 DB 나 테스트에서 사용)
+ASYNC_PARALLEL_QUERIES = os.getenv('ASYNC_PARALLEL_QUERIES', 'True') == 'True'
@@ -0,0 +1,91 @@
+"""
+테스트 도우미 - N+1 쿼리 감지, 테스트 러너
+
+행 수를 늘려 가며 같은 요청을 실행하고, 쿼리 수가 달라지면 실패한다.
+
+    class PromptListTests(QueryCountTestMixin, TestCase):
+        def test_list(self):
+            self.assertConstantQueries(
+                lambda: self.client.get('/api/prompts/'),
+                grow=lambda n: make_prompts(self.user, n),
+            )
+
+TestRunner 는 테스트 DB 를 지우기 전에 프로세스에 남은 사용 기록(use_count 버퍼, 메모리 큐)을
+테스트 DB 에 반영해, 종료 시(atexit) 반영이 원래 DB 로 가지 않게 한다.
+"""
+from contextlib import contextmanager
+from itertools import accumulate
+
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.test.runner import DiscoverRunner
+from django.test.utils import CaptureQueriesContext
+
+
+def _consume(response):
+    """스트리밍 응답은 본문을 끝까지 읽어야 쿼리가 실행된다"""
+    if getattr(response, 'streaming', False):
+        b''.join(response.streaming_content)
+    return response
+
+
+def count_queries(func, using=DEFAULT_DB_ALIAS):
+    """func() 실행 중 쿼리 목록과 반환값"""
+    with CaptureQueriesContext(connections[using]) as context:
+        result = _consume(func())
+    return context.captured_queries, result
+
+
+def assert_constant_queries(func, grow, sizes=(1, 5), using=DEFAULT_DB_ALIAS):
+    """
+    grow(n) 으로 행을 n 개 더한 뒤 func() 를 실행하기를 sizes 만큼 반복하고,
+    쿼리 수가 행 수에 따라 달라지면 AssertionError
+
+    sizes 는 단계별로 추가할 행 수 - (1, 5) 면 1개, 6개 상태에서 각각 측정한다.
+    """
+    runs = []
+    for size in sizes:
+        grow(size)
+        queries, _ = count_queries(func, using=using)
+        runs.append(queries)
+
+    counts = [len(queries) for queries in runs]
+    if len(set(counts)) > 1:
+        totals = list(accumulate(sizes))
+        detail = '\n'.join(
+            f'{index}. {query["sql"]}' for index, query in enumerate(runs[-1], start=1)
+        )
+        raise AssertionError(
+            f'Query count grows with rows: {dict(zip(totals, counts))} (rows: queries)\n'
+            f'Queries with {totals[-1]} rows:\n{detail}'
+        )
+    return counts[0]
+
+
+@contextmanager
+def query_budget(max_queries, using=DEFAULT_DB_ALIAS):
+    """블록 안의 쿼리 수가 max_queries 를 넘으면 AssertionError"""
+    with CaptureQueriesContext(connections[using]) as context:
+        yield context
+    if len(context) > max_queries:
+        detail = '\n'.join(f'{index}. {query["sql"]}' for index, query in enumerate(context.captured_queries, start=1))
+        raise AssertionError(f'{len(context)} queries executed, budget is {max_queries}:\n{detail}')
+
+
+class QueryCountTestMixin:
+    """TestCase 용 메서드 이름 (unittest 스타일)"""
+
+    def assertConstantQueries(self, func, grow, sizes=(1, 5), using=DEFAULT_DB_ALIAS):
+        return assert_constant_queries(func, grow, sizes=sizes, using=using)
+
+
+class TestRunner(DiscoverRunner):
+    """테스트 DB 를 지우기 전에 남은 사용 기록을 반영하는 러너"""
+
+    def teardown_databases(self, old_config, **kwargs):
+        from prompts.usage import flush_usage_counters
+        from prompts.usage_queue import flush_usage_queue, get_usage_queue
+
+        flush_usage_counters()
+        if get_usage_queue.cache_info().currsize:
+            flush_usage_queue()
+        super().teardown_databases(old_config, **kwargs)
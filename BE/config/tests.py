@@ -0,0 +1,81 @@
+import os
+import sqlite3
+import tempfile
+from unittest import mock
+
+from django.contrib.auth.models import AnonymousUser, User
+from django.core.cache import cache
+from django.db import connection
+from django.db.utils import load_backend
+from django.test import SimpleTestCase, override_settings
+
+from prompts.models import Prompt
+from .db_router import PrimaryReplicaRouter, mark_sticky, routing_scope, use_replica
+
+
+@override_settings(DB_REPLICA_STICKY_SECONDS=5)
+@mock.patch('config.db_router.replica_aliases', return_value=['replica1'])
+class PrimaryReplicaRouterTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.router = PrimaryReplicaRouter()
+
+    def test_primary_outside_request(self, aliases):
+        self.assertIsNone(use_replica())
+        self.assertEqual(self.router.db_for_read(Prompt), 'default')
+
+    def test_replica_for_read_request(self, aliases):
+        with routing_scope():
+            self.assertEqual(self.router.db_for_read(Prompt), 'default')
+            self.assertEqual(use_replica(AnonymousUser()), 'replica1')
+            self.assertEqual(self.router.db_for_read(Prompt), 'replica1')
+            self.assertEqual(self.router.db_for_write(Prompt), 'default')
+        self.assertEqual(self.router.db_for_read(Prompt), 'default')
+
+    def test_sticky_after_write(self, aliases):
+        user, other = User(pk=1), User(pk=2)
+        mark_sticky(user)
+        with routing_scope():
+            self.assertIsNone(use_replica(user))
+            self.assertEqual(self.router.db_for_read(Prompt), 'default')
+        with routing_scope():
+            self.assertEqual(use_replica(other), 'replica1')
+
+    def test_migrations_only_on_primary(self, aliases):
+        self.assertTrue(self.router.allow_migrate('default', 'prompts'))
+        self.assertFalse(self.router.allow_migrate('replica1', 'prompts'))
+
+
+class SQLiteConcurrentBackendTests(SimpleTestCase):
+    """config.db_backends.sqlite3 - 연결마다 PRAGMA 적용, BEGIN IMMEDIATE"""
+
+    def setUp(self):
+        tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        settings_dict = {
+            **connection.settings_dict,
+            'ENGINE': 'config.db_backends.sqlite3',
+            'NAME': os.path.join(tmpdir.name, 'concurrent.sqlite3'),
+        }
+        self.wrapper = load_backend('config.db_backends.sqlite3').DatabaseWrapper(settings_dict, 'concurrent')
+        self.addCleanup(self.wrapper.close)
+
+    def pragma(self, name):
+        with self.wrapper.cursor() as cursor:
+            return cursor.execute(f'PRAGMA {name}').fetchone()[0]
+
+    @override_settings(SQLITE_PRAGMAS={'journal_mode': 'WAL', 'synchronous': 'NORMAL', 'busy_timeout': 1234})
+    def test_pragmas(self):
+        self.assertEqual(self.pragma('journal_mode'), 'wal')
+        self.assertEqual(self.pragma('synchronous'), 1)
+        self.assertEqual(self.pragma('busy_timeout'), 1234)
+
+    @override_settings(SQLITE_PRAGMAS={})
+    def test_transaction_takes_write_lock(self):
+        # atomic() 이 트랜잭션을 시작하는 방식. BEGIN IMMEDIATE 는 시작부터 쓰기 락을 잡는다
+        self.wrapper.set_autocommit(False, force_begin_transaction_with_broken_autocommit=True)
+        other = sqlite3.connect(self.wrapper.settings_dict['NAME'], timeout=0)
+        self.addCleanup(other.close)
+        with self.assertRaises(sqlite3.OperationalError):
+            other.execute('BEGIN IMMEDIATE')
+        self.wrapper.rollback()
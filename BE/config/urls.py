@@ -33,4 +33,8 @@ urlpatterns = [
 
     # Analytics
     path('api/analytics/', include('analytics.urls')),
+
+    # Async (ASGI) read-only endpoints
+    path('api/async/', include('prompts.async_urls')),
+    path('api/async/analytics/', include('analytics.async_urls')),
 ]
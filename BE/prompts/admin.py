@@ -7,10 +7,7 @@ class CategoryAdmin(admin.ModelAdmin):
     list_display = ['name', 'color', 'prompt_count', 'created_at']
     search_fields = ['name']
     list_filter = ['color']
-
-    def prompt_count(self, obj):
-        return obj.prompts.count()
-    prompt_count.short_description = 'Prompts'
+    readonly_fields = ['prompt_count']
 
 
 @admin.register(Prompt)
@@ -0,0 +1,7 @@
+from django.urls import path
+from .async_views import AsyncPromptActionView
+
+urlpatterns = [
+    path('prompts/', AsyncPromptActionView.as_view(action='list'), name='async-prompt-list'),
+    path('prompts/search/', AsyncPromptActionView.as_view(action='search'), name='async-prompt-search'),
+]
@@ -0,0 +1,35 @@
+"""
+프롬프트 비동기(ASGI) 조회 뷰
+
+목록/검색은 필터 -> 페이지 조회 -> 태그 조회가 앞 단계 결과에 의존하는 쿼리 사슬이라
+동시에 실행할 쿼리가 없다. PromptViewSet 의 action 을 한 번의 스레드 전환으로 실행해
+필터, 커서 페이지네이션, 빠른 직렬화, 응답 캐시/ETag 를 동기 엔드포인트와 똑같이 쓴다.
+"""
+from asgiref.sync import sync_to_async
+
+from config.async_views import AsyncAPIView
+from config.db_router import ReplicaReadMixin
+from .renderers import ORJSONRenderer
+from .views import PromptViewSet
+
+
+class AsyncPromptActionView(ReplicaReadMixin, AsyncAPIView):
+    """
+    PromptViewSet 조회 action 의 비동기 버전
+
+    GET /api/async/prompts/          (list)
+    GET /api/async/prompts/search/   (search)
+    """
+    permission_classes = PromptViewSet.permission_classes
+    renderer_classes = [ORJSONRenderer]
+    action = 'list'
+
+    async def get(self, request, *args, **kwargs):
+        viewset = PromptViewSet(
+            request=request,
+            action=self.action,
+            args=args,
+            kwargs=kwargs,
+            format_kwarg=self.format_kwarg,
+        )
+        return await sync_to_async(getattr(viewset, self.action))(request, *args, **kwargs)
@@ -0,0 +1,205 @@
+"""
+제목/태그/카테고리 자동완성 (메모리 prefix 인덱스)
+
+스코프마다 정규화한(casefold, 공백 하나로) 키를 정렬한 배열을 만들고 bisect 로 prefix 범위를 찾는다.
+제목/태그는 단어 시작 위치마다 키를 두어 중간 단어로도 찾는다 ('review' -> 'Code Review').
+
+- public: 공개 프롬프트의 제목/태그, user:<id>: 본인 프롬프트의 제목/태그, categories: 카테고리
+- 처음 조회할 때 DB 에서 만들어 프로세스 메모리에 둔다 (최대 PROMPT_AUTOCOMPLETE_CACHE_SIZE 스코프)
+- 만들 때의 자동완성 버전을 같이 저장한다. 응답 캐시와 같은 스코프 이름을 쓰지만 버전 키는 따로 두어
+  제목/태그/카테고리/공개 여부가 바뀔 때만 올린다 (signals). 버전이 올라가면 다음 조회에서 다시 만든다.
+  평소 조회는 버전 확인(cache.get_many 한 번)뿐이다
+- 사용 횟수 반영(초당 한 번꼴)으로는 버전을 올리지 않는다. 가중치(사용 횟수, 프롬프트 수)는
+  PROMPT_AUTOCOMPLETE_MAX_AGE 초가 지나 다시 만들 때 반영된다
+
+결과 순서는 가중치(제목: 사용 횟수, 태그/카테고리: 프롬프트 수) 내림차순, 같으면 이름 순.
+"""
+import bisect
+import heapq
+import re
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.db.models import Count
+
+from . import response_cache
+
+# 키(단어 시작부터)와 검색어는 이 길이까지만 비교
+KEY_LENGTH = 64
+MAX_LIMIT = 20
+# 이 길이 이하의 prefix 는 범위가 넓으므로 상위 MAX_LIMIT 개를 미리 계산
+PRECOMPUTED_LENGTH = 2
+
+CATEGORIES = 'categories'
+VERSION_KEY = 'prompts:autocomplete:version:{scope}'
+_WORD = re.compile(r'\w+')
+
+
+def normalize(text):
+    return ' '.join((text or '').casefold().split())
+
+
+class PrefixIndex:
+    """{문자열: 가중치} 의 prefix 검색"""
+
+    def __init__(self, weights):
+        # 순위(가중치 내림차순, 이름 순)를 id 로 쓰면 범위 안의 상위 N 개 = 가장 작은 id N 개
+        self.texts = sorted(weights, key=lambda text: (-weights[text], text))
+        self.weights = [weights[text] for text in self.texts]
+
+        pairs = []
+        for rank, text in enumerate(self.texts):
+            normalized = normalize(text)
+            starts = {0} | {match.start() for match in _WORD.finditer(normalized)}
+            pairs.extend((normalized[start:start + KEY_LENGTH], rank) for start in starts if normalized)
+        pairs.sort()
+        self._keys = [key for key, _ in pairs]
+        self._ranks = [rank for _, rank in pairs]
+
+        self._top = {}
+        for length in range(1, PRECOMPUTED_LENGTH + 1):
+            groups = {}
+            for key, rank in pairs:
+                if len(key) >= length:
+                    groups.setdefault(key[:length], set()).add(rank)
+            for prefix, ranks in groups.items():
+                self._top[prefix] = heapq.nsmallest(MAX_LIMIT, ranks)
+
+    def __len__(self):
+        return len(self.texts)
+
+    def lookup(self, prefix, limit):
+        """정규화한 prefix -> [(문자열, 가중치), ...] 최대 limit 개"""
+        prefix = prefix[:KEY_LENGTH]
+        if len(prefix) <= PRECOMPUTED_LENGTH:
+            ranks = self._top.get(prefix, ())[:limit]
+        else:
+            start = bisect.bisect_left(self._keys, prefix)
+            end = bisect.bisect_left(self._keys, prefix + '\U0010ffff', start)
+            ranks = heapq.nsmallest(limit, set(self._ranks[start:end]))
+        return [(self.texts[rank], self.weights[rank]) for rank in ranks]
+
+
+class IndexCache:
+    """스코프 -> (버전, 만든 시각, 인덱스) LRU 캐시 (스레드 안전)"""
+
+    def __init__(self):
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, scope, versions):
+        with self._lock:
+            entry = self._entries.get(scope)
+            if entry is None:
+                return None
+            cached_versions, built_at, indexes = entry
+            if cached_versions != versions or time.monotonic() - built_at >= settings.PROMPT_AUTOCOMPLETE_MAX_AGE:
+                del self._entries[scope]
+                return None
+            self._entries.move_to_end(scope)
+            return indexes
+
+    def set(self, scope, versions, indexes):
+        with self._lock:
+            self._entries[scope] = (versions, time.monotonic(), indexes)
+            self._entries.move_to_end(scope)
+            while len(self._entries) > settings.PROMPT_AUTOCOMPLETE_CACHE_SIZE:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+index_cache = IndexCache()
+
+
+def bump_versions(scopes, using=None):
+    """스코프의 인덱스를 다음 조회에서 다시 만들게 한다 (응답 캐시 버전과 같은 방식)"""
+    response_cache.bump_versions(scopes, using=using, key_format=VERSION_KEY)
+
+
+def invalidate_prompts(prompt_ids, using=None):
+    """id 로만 알고 있는 프롬프트들의 소유자/공개 스코프와 카테고리 무효화"""
+    from .models import Prompt
+
+    prompt_ids = list(prompt_ids)
+    if not prompt_ids:
+        return
+    rows = Prompt.objects.using(using).filter(pk__in=prompt_ids).values_list('user_id', 'is_public')
+    bump_versions(response_cache.scopes_for(rows) | {CATEGORIES}, using=using)
+
+
+def _prompt_indexes(queryset):
+    titles = {}
+    for title, use_count in queryset.values_list('title', 'use_count').order_by():
+        titles[title] = max(titles.get(title, 0), use_count)
+    tags = dict(
+        queryset.filter(tags__isnull=False)
+        .values_list('tags__name')
+        .annotate(count=Count('id'))
+        .order_by()
+    )
+    return {'titles': PrefixIndex(titles), 'tags': PrefixIndex(tags)}
+
+
+def build_indexes(scope):
+    """스코프의 인덱스를 DB 에서 만든다"""
+    from .models import Category, Prompt
+
+    if scope == CATEGORIES:
+        return {'categories': PrefixIndex(dict(Category.objects.values_list('name', 'prompt_count')))}
+    if scope == response_cache.PUBLIC:
+        return _prompt_indexes(Prompt.objects.filter(is_public=True))
+    user_id = int(scope.split(':', 1)[1])
+    return _prompt_indexes(Prompt.objects.filter(user_id=user_id))
+
+
+def _indexes(scope, versions):
+    indexes = index_cache.get(scope, versions)
+    if indexes is None:
+        indexes = build_indexes(scope)
+        # 만들기 전에 읽은 버전으로 저장 - 만드는 동안 바뀌었으면 다음 조회에서 다시 만든다
+        index_cache.set(scope, versions, indexes)
+    return indexes
+
+
+def _merge(results, limit):
+    weights = {}
+    for text, weight in results:
+        weights[text] = max(weights.get(text, 0), weight)
+    return sorted(weights, key=lambda text: (-weights[text], text))[:limit]
+
+
+def autocomplete(query, user=None, limit=10):
+    """
+    query 로 시작하는 단어가 있는 제목/태그/카테고리
+
+    로그인 사용자는 공개 프롬프트와 본인 프롬프트, 익명은 공개 프롬프트에서 찾는다.
+    """
+    prefix = normalize(query)
+    if not prefix:
+        return {'titles': [], 'tags': [], 'categories': []}
+    limit = min(limit, MAX_LIMIT)
+
+    scopes = [response_cache.PUBLIC]
+    if user is not None and user.is_authenticated:
+        scopes.append(response_cache.user_scope(user.pk))
+    global_version, categories_version, *versions = response_cache.get_versions(
+        [response_cache.GLOBAL, CATEGORIES, *scopes], key_format=VERSION_KEY,
+    )
+
+    titles, tags = [], []
+    for scope, version in zip(scopes, versions):
+        indexes = _indexes(scope, (global_version, version))
+        titles.extend(indexes['titles'].lookup(prefix, limit))
+        tags.extend(indexes['tags'].lookup(prefix, limit))
+    categories = _indexes(CATEGORIES, (global_version, categories_version))['categories'].lookup(prefix, limit)
+
+    return {
+        'titles': _merge(titles, limit),
+        'tags': _merge(tags, limit),
+        'categories': [name for name, _ in categories],
+    }
@@ -0,0 +1,42 @@
+"""
+지수 감쇠 점수 계산
+
+점수 = Σ exp(-λ (now - tᵢ)) 를 매번 다시 계산하지 않도록 고정 기준 시각(EPOCH)에 대한
+로그 값 log Σ exp(λ (tᵢ - EPOCH)) 로 저장한다. 현재 시각 항은 모든 행에 공통이므로
+저장된 값의 순서가 곧 감쇠 점수의 순서가 되고, 새 이벤트는 log_add 한 번으로 O(1) 반영된다.
+"""
+import math
+from datetime import datetime, timezone as dt_timezone
+
+EPOCH = datetime(2025, 1, 1, tzinfo=dt_timezone.utc)
+
+
+def decay_rate(half_life):
+    """반감기(timedelta)에 해당하는 초당 감쇠율 λ"""
+    return math.log(2) / half_life.total_seconds()
+
+
+def log_weight(when, rate):
+    """시각 when 에 발생한 이벤트 1회의 로그 점수"""
+    return rate * (when - EPOCH).total_seconds()
+
+
+def log_add(a, b):
+    """log(exp(a) + exp(b)) - a 가 None 이면 b"""
+    if a is None:
+        return b
+    if a < b:
+        a, b = b, a
+    return a + math.log1p(math.exp(b - a))
+
+
+def log_sum(values, initial=None):
+    result = initial
+    for value in values:
+        result = log_add(result, value)
+    return result
+
+
+def current_score(log_score, rate, now):
+    """저장된 로그 점수를 now 시점의 감쇠 점수로 변환"""
+    return math.exp(log_score - log_weight(now, rate))
@@ -0,0 +1,86 @@
+"""
+프롬프트 Export 스트리밍
+
+queryset 을 청크 단위로 읽으면서(태그는 청크마다 prefetch) JSON/NDJSON 을
+조금씩 만들어 내보낸다. 전체 목록을 메모리에 올리지 않으므로 라이브러리
+크기와 관계없이 메모리 사용량이 일정하다.
+"""
+import json
+import textwrap
+import zlib
+
+EXPORT_VERSION = '1.0'
+
+CHUNK_SIZE = 500
+BUFFER_SIZE = 64 * 1024
+
+
+def export_record(prompt):
+    """프롬프트 1개의 export 형식 (태그는 prefetch 된 값 사용)"""
+    return {
+        'title': prompt.title,
+        'content': prompt.content,
+        'category': prompt.category.name if prompt.category else None,
+        'tags': [tag.name for tag in prompt.tags.all()],
+        'is_template': prompt.is_template,
+        'variables': prompt.variables,
+        'color_label': prompt.color_label,
+        'is_favorite': prompt.is_favorite,
+        'is_public': prompt.is_public,
+    }
+
+
+def iter_records(queryset, chunk_size=CHUNK_SIZE):
+    for prompt in queryset.iterator(chunk_size=chunk_size):
+        yield export_record(prompt)
+
+
+def _buffered(parts, size=BUFFER_SIZE):
+    """작은 문자열 조각을 size 바이트 안팎으로 모아 UTF-8 로 내보낸다"""
+    buffer = []
+    length = 0
+    for part in parts:
+        buffer.append(part)
+        length += len(part)
+        if length >= size:
+            yield ''.join(buffer).encode('utf-8')
+            buffer = []
+            length = 0
+    if buffer:
+        yield ''.join(buffer).encode('utf-8')
+
+
+def iter_json(queryset, exported_at, count, chunk_size=CHUNK_SIZE):
+    """기존 JsonResponse(indent=2) 와 같은 모양의 JSON 을 조각으로 생성"""
+    def parts():
+        header = json.dumps({'version': EXPORT_VERSION, 'exported_at': exported_at, 'count': count}, indent=2)
+        yield header[:-2] + ',\n  "prompts": ['
+
+        first = True
+        for record in iter_records(queryset, chunk_size):
+            yield ('\n' if first else ',\n') + textwrap.indent(
+                json.dumps(record, ensure_ascii=False, indent=2), '    '
+            )
+            first = False
+
+        yield ']\n}' if first else '\n  ]\n}'
+
+    return _buffered(parts())
+
+
+def iter_ndjson(queryset, chunk_size=CHUNK_SIZE):
+    """한 줄에 프롬프트 하나 - import_prompts 에 그대로 업로드할 수 있다"""
+    return _buffered(
+        json.dumps(record, ensure_ascii=False) + '\n'
+        for record in iter_records(queryset, chunk_size)
+    )
+
+
+def gzip_stream(chunks, level=6):
+    """바이트 조각 스트림을 gzip 으로 압축하며 내보낸다"""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
@@ -0,0 +1,139 @@
+"""
+목록 응답 빠른 직렬화
+
+ModelSerializer 는 행마다 필드 객체, 점 표기 source 조회, TaggableManager 를 거친다.
+목록/즐겨찾기/검색은 필요한 컬럼만 .values() 로 읽고 태그를 한 번에 조회한 뒤
+dict 를 직접 만든다. 결과는 기존 Serializer 출력과 같다.
+
+- category_name 은 카테고리가 없으면 키를 생략한다 (read_only source 필드의 SkipField 동작)
+- 날짜/시간은 DRF DateTimeField 와 같은 형식 (현재 시간대, UTC 면 Z)
+- 태그 순서는 prefetch_related('tags') 와 같은 쿼리로 읽어 맞춘다
+"""
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.db import connections
+from rest_framework import serializers
+from rest_framework.response import Response
+from taggit.models import Tag, TaggedItem
+
+from .models import Prompt
+
+# 직렬화 필드 -> .values() 컬럼
+COLUMNS = {
+    'id': 'id',
+    'user': 'user_id',
+    'username': 'user__username',
+    'title': 'title',
+    'content': 'content',
+    'category': 'category_id',
+    'category_name': 'category__name',
+    'is_template': 'is_template',
+    'variables': 'variables',
+    'color_label': 'color_label',
+    'is_favorite': 'is_favorite',
+    'is_public': 'is_public',
+    'use_count': 'use_count',
+    'last_used': 'last_used',
+    'created_at': 'created_at',
+    'updated_at': 'updated_at',
+}
+DATETIME_FIELDS = {'last_used', 'created_at', 'updated_at'}
+OPTIONAL_FIELDS = {'category_name'}
+
+# 페이지네이션 커서와 Last-Modified 에 필요한 컬럼
+EXTRA_COLUMNS = ['id', 'created_at', 'updated_at', 'use_count', 'last_used']
+
+_datetime_field = serializers.DateTimeField()
+
+
+def fast_fields(serializer_class):
+    """빠른 경로로 만들 수 있는 Serializer 면 필드 목록, 아니면 None"""
+    fields = getattr(getattr(serializer_class, 'Meta', None), 'fields', None)
+    if not isinstance(fields, (list, tuple)):
+        return None
+    if not all(field in COLUMNS or field == 'tags' for field in fields):
+        return None
+    return list(fields)
+
+
+def values_queryset(queryset, fields):
+    columns = [COLUMNS[field] for field in fields if field != 'tags']
+    columns += [column for column in EXTRA_COLUMNS if column not in columns]
+    # 커서에 쓰는 정렬 주석
+    columns += [name for name in ('search_rank', 'frecency') if name in queryset.query.annotations]
+    return queryset.prefetch_related(None).values(*columns)
+
+
+def tag_names(prompt_ids, using):
+    """프롬프트 id -> 태그 이름 목록 (prefetch_related('tags') 와 같은 쿼리/순서)"""
+    if not prompt_ids:
+        return {}
+    relname = TaggedItem.tag_relname()
+    content_type = ContentType.objects.get_for_model(Prompt)
+    qn = connections[using].ops.quote_name
+    rows = (
+        Tag.objects.using(using)
+        .filter(**{
+            f'{relname}__content_type__app_label': content_type.app_label,
+            f'{relname}__content_type__model': content_type.model,
+            f'{relname}__object_id__in': set(prompt_ids),
+        })
+        .distinct()
+        .order_by()
+        .extra(select={'_prefetch_related_val': f'{qn(TaggedItem._meta.db_table)}.{qn("object_id")}'})
+        .values_list('_prefetch_related_val', 'name')
+    )
+    names = {}
+    for prompt_id, name in rows:
+        names.setdefault(prompt_id, []).append(name)
+    return names
+
+
+def serialize_rows(rows, fields, using):
+    """.values() 행 -> Serializer 와 같은 dict 목록"""
+    tags = tag_names([row['id'] for row in rows], using) if 'tags' in fields else {}
+    datetime_to_representation = _datetime_field.to_representation
+
+    data = []
+    for row in rows:
+        item = {}
+        for field in fields:
+            if field == 'tags':
+                item[field] = tags.get(row['id'], [])
+                continue
+            value = row[COLUMNS[field]]
+            if value is None:
+                if field not in OPTIONAL_FIELDS:
+                    item[field] = None
+            elif field in DATETIME_FIELDS:
+                item[field] = datetime_to_representation(value)
+            else:
+                item[field] = value
+        data.append(item)
+    return data
+
+
+class FastListMixin:
+    """list 와 목록형 action 을 .values() 기반 빠른 경로로 직렬화 (PROMPT_FAST_SERIALIZATION)"""
+
+    def list(self, request, *args, **kwargs):
+        return self.list_response(self.filter_queryset(self.get_queryset()))
+
+    def list_response(self, queryset):
+        """queryset 을 페이지네이션해 현재 action 의 Serializer 형식으로 응답"""
+        fields = fast_fields(self.get_serializer_class()) if settings.PROMPT_FAST_SERIALIZATION else None
+        if fields is None:
+            page = self.paginate_queryset(queryset)
+            if page is not None:
+                serializer = self.get_serializer(page, many=True)
+                return self.get_paginated_response(serializer.data)
+            serializer = self.get_serializer(queryset, many=True)
+            return Response(serializer.data)
+
+        rows = values_queryset(queryset, fields)
+        page = self.paginate_queryset(rows)
+        rows = list(rows) if page is None else page
+        data = serialize_rows(rows, fields, using=queryset.db)
+        if page is not None:
+            return self.get_paginated_response(data)
+        return Response(data)
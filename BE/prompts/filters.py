@@ -1,4 +1,9 @@
+from django.contrib.contenttypes.models import ContentType
+from django.db.models import Count, Q
 from django_filters import rest_framework as filters
+from rest_framework.filters import OrderingFilter
+from taggit.models import Tag, TaggedItem
+from .frecency import annotate_frecency
 from .models import Prompt
 
 
@@ -8,6 +13,10 @@ class PromptFilter(filters.FilterSet):
     content = filters.CharFilter(lookup_expr='icontains')
     category = filters.NumberFilter(field_name='category__id')
     tags = filters.CharFilter(method='filter_tags')
+    tags_match = filters.ChoiceFilter(
+        choices=[('all', 'All'), ('any', 'Any'), ('contains', 'Contains')],
+        method='filter_tags_match',
+    )
     is_template = filters.BooleanFilter()
     is_favorite = filters.BooleanFilter()
     color_label = filters.ChoiceFilter(choices=Prompt.LABEL_CHOICES)
@@ -19,14 +28,83 @@ class PromptFilter(filters.FilterSet):
     class Meta:
         model = Prompt
         fields = [
-            'title', 'content', 'category', 'tags',
+            'title', 'content', 'category', 'tags', 'tags_match',
             'is_template', 'is_favorite', 'color_label',
             'created_after', 'created_before'
         ]
 
     def filter_tags(self, queryset, name, value):
-        """태그 필터 - 쉼표로 구분된 여러 태그 지원"""
-        tags = [tag.strip() for tag in value.split(',')]
-        for tag in tags:
-            queryset = queryset.filter(tags__name__icontains=tag)
+        """
+        태그 필터 - 쉼표로 구분된 여러 태그 지원
+
+        tags_match=all(기본): 모든 태그가 달린 프롬프트
+        tags_match=any: 하나라도 달린 프롬프트
+        tags_match=contains: 태그 이름 부분 일치 (각 검색어마다 일치하는 태그가 있어야 함)
+
+        all/any 는 이름 또는 slug 가 정확히 같은 태그만 찾는다 (둘 다 unique 인덱스).
+        어떤 경우든 프롬프트에는 TaggedItem 서브쿼리 하나만 붙는다.
+        """
+        terms = list(dict.fromkeys(tag.strip() for tag in value.split(',') if tag.strip()))
+        if not terms:
+            return queryset
+
+        mode = self.form.cleaned_data.get('tags_match') or 'all'
+        tagged = TaggedItem.objects.filter(content_type=ContentType.objects.get_for_model(Prompt))
+
+        if mode == 'contains':
+            if len(terms) == 1:
+                object_ids = tagged.filter(tag__name__icontains=terms[0]).values('object_id')
+            else:
+                # 검색어별로 일치한 태그 수를 세어 모두 1 이상인 프롬프트만
+                object_ids = tagged.values('object_id').annotate(**{
+                    f'term_{index}': Count('id', filter=Q(tag__name__icontains=term))
+                    for index, term in enumerate(terms)
+                }).filter(**{
+                    f'term_{index}__gt': 0 for index in range(len(terms))
+                }).values('object_id')
+            return queryset.filter(id__in=object_ids)
+
+        tag_ids = self._resolve_tag_ids(terms)
+        if mode == 'all' and len(tag_ids) < len(terms):
+            # 존재하지 않는 태그가 있으면 모두 달린 프롬프트도 없다
+            return queryset.none()
+
+        tag_ids = set(tag_ids.values())
+        if not tag_ids:
+            return queryset.none()
+
+        tagged = tagged.filter(tag_id__in=tag_ids)
+        if mode == 'all' and len(tag_ids) > 1:
+            tagged = tagged.values('object_id').annotate(
+                tag_count=Count('tag_id', distinct=True)
+            ).filter(tag_count=len(tag_ids))
+        return queryset.filter(id__in=tagged.values('object_id'))
+
+    def filter_tags_match(self, queryset, name, value):
+        """filter_tags 에서 함께 사용"""
         return queryset
+
+    @staticmethod
+    def _resolve_tag_ids(terms):
+        """검색어 -> Tag id (이름 또는 slug 가 같은 태그, 없는 검색어는 빠진다)"""
+        slugs = {term: Tag().slugify(term) for term in terms}
+        tags = Tag.objects.filter(Q(name__in=terms) | Q(slug__in=slugs.values())).values_list('id', 'name', 'slug')
+
+        by_name = {tag_name: tag_id for tag_id, tag_name, _ in tags}
+        by_slug = {slug: tag_id for tag_id, _, slug in tags}
+        resolved = {}
+        for term in terms:
+            tag_id = by_name.get(term) or by_slug.get(slugs[term])
+            if tag_id is not None:
+                resolved[term] = tag_id
+        return resolved
+
+
+class PromptOrderingFilter(OrderingFilter):
+    """ordering=-frecency 면 요청 사용자의 frecency 점수를 주석으로 붙여 정렬"""
+
+    def filter_queryset(self, request, queryset, view):
+        ordering = self.get_ordering(request, queryset, view)
+        if ordering and any(term.lstrip('-') == 'frecency' for term in ordering):
+            queryset = annotate_frecency(queryset, request.user)
+        return super().filter_queryset(request, queryset, view)
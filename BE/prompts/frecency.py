@@ -0,0 +1,114 @@
+"""
+사용자별 프롬프트 frecency (빈도 + 최근성)
+
+사용 1회마다 반감기 PROMPT_FRECENCY_HALF_LIFE_DAYS 인 지수 감쇠 점수를 더한 값을
+(사용자, 프롬프트)별 PromptFrecency 에 prompts.decay 의 로그 점수로 저장한다.
+자주 쓴 프롬프트일수록, 최근에 쓴 프롬프트일수록 높고, 오래 안 쓰면 상대적으로 내려간다.
+
+- 사용 이력이 기록될 때(usage_recorded) 이벤트마다 log_add 한 번으로 O(1) 갱신
+- 조회는 (user, -score, -prompt) 인덱스 순서로 읽는다 (PromptUsage 를 다시 세지 않는다)
+- 반감기를 바꾸면 rebuild_frecency_scores 로 다시 계산해야 한다
+"""
+from collections import defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import F, FilteredRelation, FloatField, Q, Value
+
+from .decay import decay_rate, log_add, log_sum, log_weight
+from .models import PromptFrecency
+from .usage_archive import iter_usages
+
+
+def rate():
+    return decay_rate(timedelta(days=settings.PROMPT_FRECENCY_HALF_LIFE_DAYS))
+
+
+def apply_events(events):
+    """(user_id, prompt_id, used_at) 이벤트를 frecency 점수에 반영"""
+    grouped = defaultdict(list)
+    for user_id, prompt_id, used_at in events:
+        grouped[(user_id, prompt_id)].append(used_at)
+    if not grouped:
+        return
+
+    try:
+        with transaction.atomic():
+            _apply_grouped(grouped)
+    except IntegrityError:
+        # 다른 워커가 같은 (user, prompt) 행을 먼저 만든 경우 - 한 번 더 시도하면 갱신 경로로 간다
+        with transaction.atomic():
+            _apply_grouped(grouped)
+
+
+def _apply_grouped(grouped):
+    decay = rate()
+    existing = {
+        (row.user_id, row.prompt_id): row
+        for row in PromptFrecency.objects.select_for_update().filter(
+            user_id__in={user_id for user_id, _ in grouped},
+            prompt_id__in={prompt_id for _, prompt_id in grouped},
+        )
+    }
+
+    to_update = []
+    to_create = []
+    for (user_id, prompt_id), times in grouped.items():
+        increment = log_sum(log_weight(when, decay) for when in times)
+        row = existing.get((user_id, prompt_id))
+        if row is None:
+            to_create.append(PromptFrecency(
+                user_id=user_id, prompt_id=prompt_id, score=increment, use_count=len(times), last_used=max(times),
+            ))
+        else:
+            row.score = log_add(row.score, increment)
+            row.use_count += len(times)
+            row.last_used = max(row.last_used, *times)
+            to_update.append(row)
+
+    PromptFrecency.objects.bulk_update(to_update, ['score', 'use_count', 'last_used'], batch_size=500)
+    PromptFrecency.objects.bulk_create(to_create, batch_size=500)
+
+
+def rebuild_scores(using=None, batch_size=2000):
+    """전체 사용 이력(아카이브 포함)으로 점수를 다시 계산 - 만든 행 수 반환"""
+    decay = rate()
+    usages = iter_usages(('user_id', 'prompt_id', 'used_at'), using=using, chunk_size=batch_size)
+
+    rows = {}
+    for user_id, prompt_id, used_at in usages:
+        key = (user_id, prompt_id)
+        score, count, last_used = rows.get(key, (None, 0, used_at))
+        rows[key] = (log_add(score, log_weight(used_at, decay)), count + 1, max(last_used, used_at))
+
+    with transaction.atomic(using=using):
+        PromptFrecency.objects.using(using).all().delete()
+        PromptFrecency.objects.using(using).bulk_create(
+            [
+                PromptFrecency(user_id=user_id, prompt_id=prompt_id, score=score, use_count=count, last_used=last_used)
+                for (user_id, prompt_id), (score, count, last_used) in rows.items()
+            ],
+            batch_size=batch_size,
+        )
+    return len(rows)
+
+
+def annotate_frecency(queryset, user):
+    """프롬프트 queryset 에 user 의 frecency 로그 점수 주석 (frecency, 사용한 적 없으면 NULL)"""
+    if 'frecency' in queryset.query.annotations:
+        return queryset
+    if not user.is_authenticated:
+        return queryset.annotate(frecency=Value(None, output_field=FloatField()))
+    return queryset.annotate(
+        user_frecency=FilteredRelation('frecency_scores', condition=Q(frecency_scores__user=user)),
+        frecency=F('user_frecency__score'),
+    )
+
+
+def frecent_prompts(queryset, user):
+    """queryset 중 user 가 쓴 적 있는 프롬프트 (frecency 주석, 점수 내림차순)"""
+    # INNER JOIN 으로 (user, -score) 인덱스에서 읽는다
+    return queryset.filter(frecency_scores__user=user).annotate(
+        frecency=F('frecency_scores__score'),
+    ).order_by('-frecency', '-id')
@@ -0,0 +1,303 @@
+"""
+프롬프트 일괄 Import
+
+행 단위로 get_or_create/조회/저장/tags.set 을 반복하지 않고, 청크마다
+카테고리·기존 제목·태그를 한 번에 조회한 뒤 bulk_create/bulk_update 와
+through 테이블(TaggedItem) 일괄 INSERT 로 처리한다. 청크 하나가 트랜잭션 하나다.
+
+결과(imported/skipped/errors)는 행을 순서대로 처리하던 기존 방식과 같다.
+- 같은 제목이 이미 있으면(이번 import 에서 먼저 들어온 행 포함) 건너뛰거나 덮어쓴다.
+- 알 수 없는 필드는 무시한다.
+- 청크 일괄 처리 중 DB 오류가 나면 그 청크만 행 단위로 다시 처리해 오류 행을 찾는다.
+- skip_near_duplicates 면 내용이 기존 프롬프트나 앞선 행과 거의 같은 행(MinHash, prompts.similarity)도
+  건너뛰고 near_duplicates 로 알려준다.
+"""
+from collections import Counter
+from itertools import islice
+
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.db import transaction
+from django.utils import timezone
+from taggit.models import Tag, TaggedItem
+
+from . import similarity
+from .models import Prompt, Category
+from .signals import prompts_bulk_saved
+
+IMPORT_FIELDS = [
+    'title', 'content', 'is_template', 'variables',
+    'color_label', 'is_favorite', 'is_public',
+]
+UPDATE_FIELDS = IMPORT_FIELDS + ['category', 'updated_at']
+
+CHUNK_SIZE = 500
+
+
+class _Row:
+    """검증을 마친 import 행"""
+    __slots__ = ('title', 'fields', 'category', 'tags')
+
+    def __init__(self, data):
+        if not isinstance(data, dict):
+            raise ValueError('Each prompt must be an object')
+
+        self.title = data['title']
+        self.fields = {key: data[key] for key in IMPORT_FIELDS if key in data}
+        self.category = data.get('category') or None
+        self.tags = data.get('tags') if 'tags' in data else None
+
+        if self.category is not None and not isinstance(self.category, str):
+            raise ValueError('category must be a string')
+        if self.tags is not None and (
+            not isinstance(self.tags, list) or not all(isinstance(tag, str) for tag in self.tags)
+        ):
+            raise ValueError('tags must be a list of strings')
+
+
+def _error_title(data):
+    return data.get('title', 'Unknown') if isinstance(data, dict) else 'Unknown'
+
+
+class _NearDuplicateFilter:
+    """청크 행 중 내용이 사용자의 기존 프롬프트나 앞서 받아들인 행과 거의 같은 것 찾기"""
+
+    def __init__(self, user, rows, existing, threshold):
+        self.threshold = threshold
+        self.indexes = [i for i, row in enumerate(rows) if isinstance(row.fields.get('content'), str)]
+        self.signatures = {}
+        self.buckets = {}
+        self.matches = {}
+        # 앞서 받아들인 행 - 밴드 해시 -> [(제목, 서명)]
+        self.accepted = {}
+        if not self.indexes:
+            return
+
+        signatures = similarity.compute_signatures([rows[i].fields['content'] for i in self.indexes])
+        # 같은 제목의 기존 프롬프트는 제목 규칙(건너뛰기/덮어쓰기)을 따른다
+        exclude = []
+        for i in self.indexes:
+            prompt = existing.get(rows[i].title)
+            exclude.append({prompt.pk} if prompt is not None and prompt.pk else set())
+        matches = similarity.match_signatures(
+            signatures, Prompt.objects.filter(user=user), threshold, exclude=exclude,
+        )
+        titles = dict(Prompt.objects.filter(pk__in=[found[0][0] for found in matches if found]).values_list('pk', 'title'))
+        for i, signature, bucket_row, found in zip(
+            self.indexes, signatures, similarity.band_buckets(signatures), matches
+        ):
+            self.signatures[i] = signature
+            self.buckets[i] = [int(bucket) for bucket in bucket_row]
+            if found:
+                self.matches[i] = {'similar_to': titles[found[0][0]], 'similar_to_id': found[0][0]}
+
+    def match(self, i):
+        """비슷한 기존 프롬프트나 이번 청크의 앞선 행 {'similar_to': 제목, 'similar_to_id': id 또는 None}"""
+        if i in self.matches:
+            return self.matches[i]
+        signature = self.signatures.get(i)
+        if signature is None:
+            return None
+        for bucket in self.buckets[i]:
+            for title, other in self.accepted.get(bucket, ()):
+                if (other == signature).mean() >= self.threshold:
+                    return {'similar_to': title, 'similar_to_id': None}
+        return None
+
+    def accept(self, i, title):
+        if i in self.signatures:
+            for bucket in self.buckets[i]:
+                self.accepted.setdefault(bucket, []).append((title, self.signatures[i]))
+
+
+class PromptImporter:
+    """
+    사용자 한 명의 프롬프트 import
+
+        importer = PromptImporter(request.user, overwrite=False)
+        importer.run(rows)
+        importer.result()
+    """
+
+    def __init__(self, user, overwrite=False, chunk_size=CHUNK_SIZE, skip_near_duplicates=False):
+        self.user = user
+        self.overwrite = overwrite
+        self.chunk_size = chunk_size
+        self.skip_near_duplicates = skip_near_duplicates
+        self.imported = 0
+        self.skipped = 0
+        self.errors = []
+        self.near_duplicates = []
+        # 이번 import 에서 만든/덮어쓴 제목 -> Prompt (청크를 넘어선 중복 처리용)
+        self._seen = {}
+        self._content_type = ContentType.objects.get_for_model(Prompt)
+
+    def result(self):
+        result = {
+            'status': 'completed',
+            'imported': self.imported,
+            'skipped': self.skipped,
+            'errors': self.errors,
+        }
+        if self.skip_near_duplicates:
+            result['near_duplicates'] = self.near_duplicates
+        return result
+
+    def run(self, rows):
+        rows = iter(rows)
+        while True:
+            chunk = list(islice(rows, self.chunk_size))
+            if not chunk:
+                return self
+            try:
+                self._import_chunk(chunk)
+            except Exception:
+                # 어느 행이 문제인지 찾기 위해 이 청크만 한 행씩 다시 처리
+                for data in chunk:
+                    try:
+                        self._import_chunk([data])
+                    except Exception as exc:
+                        self.errors.append({'title': _error_title(data), 'error': str(exc)})
+
+    def _import_chunk(self, chunk):
+        rows = []
+        errors = []
+        for data in chunk:
+            try:
+                rows.append(_Row(data))
+            except Exception as exc:
+                errors.append({'title': _error_title(data), 'error': str(exc)})
+
+        with transaction.atomic():
+            categories = self._resolve_categories({row.category for row in rows if row.category})
+            existing = self._existing_prompts({row.title for row in rows})
+
+            to_create = {}  # title -> Prompt (아직 저장 전)
+            to_update = {}  # title -> Prompt
+            tag_sets = {}   # title -> 태그 목록 (설정할 것만)
+            imported = skipped = 0
+            near_duplicates = []
+            near = None
+            if self.skip_near_duplicates:
+                near = _NearDuplicateFilter(self.user, rows, existing, settings.PROMPT_SIMILARITY_THRESHOLD)
+
+            for i, row in enumerate(rows):
+                prompt = to_create.get(row.title) or to_update.get(row.title) or existing.get(row.title)
+                if prompt is not None and not self.overwrite:
+                    skipped += 1
+                    continue
+                if near is not None:
+                    similar_to = near.match(i)
+                    if similar_to is not None:
+                        skipped += 1
+                        near_duplicates.append({'title': row.title, **similar_to})
+                        continue
+                    near.accept(i, row.title)
+
+                if prompt is None:
+                    prompt = Prompt(user=self.user, **row.fields)
+                    to_create[row.title] = prompt
+                    if row.tags:
+                        tag_sets[row.title] = row.tags
+                else:
+                    for key, value in row.fields.items():
+                        setattr(prompt, key, value)
+                    if prompt.pk is not None:
+                        to_update[row.title] = prompt
+                    if row.tags is not None:
+                        tag_sets[row.title] = row.tags
+
+                prompt.category = categories.get(row.category)
+                imported += 1
+
+            now = timezone.now()
+            for prompt in [*to_create.values(), *to_update.values()]:
+                # save() 를 거치지 않으므로 변수 추출과 updated_at 을 직접 처리
+                if prompt.is_template:
+                    prompt.variables = prompt.extract_variables()
+                prompt.updated_at = now
+
+            Prompt.objects.bulk_create(list(to_create.values()), batch_size=self.chunk_size)
+            Prompt.objects.bulk_update(list(to_update.values()), UPDATE_FIELDS, batch_size=self.chunk_size)
+
+            prompts = {**to_update, **to_create}
+            Category.adjust_prompt_counts(self._category_deltas(to_create.values(), to_update.values()))
+            self._set_tags({prompts[title].pk: names for title, names in tag_sets.items()})
+
+            changed_ids = [prompt.pk for prompt in prompts.values()]
+            prompts_bulk_saved.send(sender=Prompt, prompt_ids=changed_ids)
+
+        # 트랜잭션이 성공한 뒤에만 결과 반영
+        for prompt in prompts.values():
+            prompt._loaded_values = {**getattr(prompt, '_loaded_values', {}), 'category_id': prompt.category_id}
+        self._seen.update(prompts)
+        self.imported += imported
+        self.skipped += skipped
+        self.errors.extend(errors)
+        self.near_duplicates.extend(near_duplicates)
+
+    def _category_deltas(self, created, updated):
+        """bulk 저장으로 바뀐 카테고리별 프롬프트 수 증감"""
+        deltas = Counter(prompt.category_id for prompt in created)
+        for prompt in updated:
+            old_category_id = prompt._loaded_values.get('category_id')
+            if old_category_id != prompt.category_id:
+                deltas[old_category_id] -= 1
+                deltas[prompt.category_id] += 1
+        return deltas
+
+    def _resolve_categories(self, names):
+        """카테고리 이름 -> Category (없는 것은 한 번에 생성)"""
+        if not names:
+            return {}
+        categories = {c.name: c for c in Category.objects.filter(name__in=names)}
+        missing = names - categories.keys()
+        if missing:
+            Category.objects.bulk_create([Category(name=name) for name in missing], ignore_conflicts=True)
+            categories.update({c.name: c for c in Category.objects.filter(name__in=missing)})
+        return categories
+
+    def _existing_prompts(self, titles):
+        """제목 -> 기존 Prompt (같은 제목이 여러 개면 가장 최근 것)"""
+        existing = {}
+        for prompt in Prompt.objects.filter(user=self.user, title__in=titles).order_by('-created_at'):
+            existing.setdefault(prompt.title, prompt)
+        existing.update({title: self._seen[title] for title in titles if title in self._seen})
+        return existing
+
+    def _resolve_tags(self, names):
+        """태그 이름 -> Tag id (없는 태그는 한 번에 생성)"""
+        if not names:
+            return {}
+        tags = dict(Tag.objects.filter(name__in=names).values_list('name', 'id'))
+        missing = names - tags.keys()
+        if missing:
+            Tag.objects.bulk_create(
+                [Tag(name=name, slug=Tag().slugify(name)) for name in missing],
+                ignore_conflicts=True,
+            )
+            tags.update(Tag.objects.filter(name__in=missing).values_list('name', 'id'))
+            # slug 가 겹쳐 만들어지지 않은 태그는 taggit 의 slug 중복 처리에 맡긴다
+            for name in missing - tags.keys():
+                tags[name] = Tag.objects.get_or_create(name=name)[0].pk
+        return tags
+
+    def _set_tags(self, tag_sets):
+        """프롬프트별 태그를 지정한 목록으로 교체 (through 테이블 일괄 DELETE/INSERT)"""
+        if not tag_sets:
+            return
+        tag_ids = self._resolve_tags({name for names in tag_sets.values() for name in names})
+
+        TaggedItem.objects.filter(
+            content_type=self._content_type,
+            object_id__in=list(tag_sets),
+        ).delete()
+        TaggedItem.objects.bulk_create(
+            [
+                TaggedItem(content_type=self._content_type, object_id=prompt_id, tag_id=tag_ids[name])
+                for prompt_id, names in tag_sets.items()
+                for name in dict.fromkeys(names)
+            ],
+            batch_size=self.chunk_size,
+            ignore_conflicts=True,
+        )
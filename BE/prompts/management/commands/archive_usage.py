@@ -0,0 +1,44 @@
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from prompts.models import PromptUsage
+from prompts.usage_archive import ArchiveError, UsageArchive
+
+
+class Command(BaseCommand):
+    help = '보관 기간이 지난 PromptUsage 를 월별 NDJSON gzip 아카이브로 옮기고 테이블에서 지운다'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days', type=int, default=None,
+            help='보관 기간(일, 기본 PROMPT_USAGE_RETENTION_DAYS) - 이보다 오래된 이력을 옮긴다',
+        )
+        parser.add_argument('--database', default=None, help='대상 DB 별칭')
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--dry-run', action='store_true', help='옮기지 않고 대상 행 수만 출력')
+
+    def handle(self, *args, **options):
+        days = options['days'] if options['days'] is not None else settings.PROMPT_USAGE_RETENTION_DAYS
+        if days < 1:
+            raise CommandError('--days 는 1 이상이어야 합니다')
+        before = timezone.now() - timedelta(days=days)
+
+        if options['dry_run']:
+            count = PromptUsage.objects.using(options['database']).filter(used_at__lt=before).count()
+            self.stdout.write(self.style.WARNING(f'{before:%Y-%m-%d %H:%M} 이전 사용 이력 {count}행을 옮길 수 있습니다.'))
+            return
+
+        started = time.perf_counter()
+        archive = UsageArchive()
+        try:
+            archived = archive.archive(before, batch_size=options['batch_size'], using=options['database'])
+        except ArchiveError as exc:
+            raise CommandError(str(exc))
+        for month, count in sorted(archived.items()):
+            self.stdout.write(f'{month}: {count}행 -> {archive.path(month)}')
+        self.stdout.write(self.style.SUCCESS(
+            f'{sum(archived.values())}행을 아카이브했습니다 ({time.perf_counter() - started:.1f}초).'
+        ))
@@ -0,0 +1,41 @@
+import signal
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from prompts.usage_queue import DatabaseUsageQueue, get_usage_queue
+
+
+class Command(BaseCommand):
+    help = 'DB 사용 이벤트 큐(PendingUsage)를 PromptUsage 로 일괄 적재하는 워커'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=None, help='한 번에 적재할 이벤트 수')
+        parser.add_argument('--interval', type=float, default=1.0, help='큐가 비었을 때 대기 시간(초)')
+        parser.add_argument('--once', action='store_true', help='큐를 한 번 비우고 종료')
+
+    def handle(self, *args, **options):
+        usage_queue = get_usage_queue()
+        if not isinstance(usage_queue, DatabaseUsageQueue):
+            raise CommandError(
+                f'{type(usage_queue).__name__} 는 별도 워커가 필요 없습니다. '
+                'PROMPT_USAGE_QUEUE_BACKEND=prompts.usage_queue.DatabaseUsageQueue 일 때 사용하세요.'
+            )
+
+        self._running = True
+        signal.signal(signal.SIGTERM, self._stop)
+        signal.signal(signal.SIGINT, self._stop)
+
+        total = 0
+        while self._running:
+            written = usage_queue.drain(options['batch_size'])
+            total += written
+            if written:
+                continue
+            if options['once']:
+                break
+            time.sleep(options['interval'])
+
+        self.stdout.write(self.style.SUCCESS(f'{total}개 사용 이벤트를 적재했습니다.'))
+
+    def _stop(self, signum, frame):
+        self._running = False
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+from prompts.frecency import rebuild_scores
+
+
+class Command(BaseCommand):
+    help = '전체 PromptUsage 로 사용자별 frecency 점수를 다시 계산한다'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database', default=None, help='대상 DB 별칭')
+        parser.add_argument('--batch-size', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        total = rebuild_scores(using=options['database'], batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'{total}개 frecency 점수 행을 만들었습니다.'))
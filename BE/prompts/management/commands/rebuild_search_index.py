@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+from prompts import search
+
+
+class Command(BaseCommand):
+    help = '프롬프트 전문 검색 인덱스를 처음부터 다시 만든다'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database', default=None, help='대상 DB 별칭')
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        backend = search.get_search_backend(options['database'])
+        if isinstance(backend, search.BasicSearchBackend):
+            self.stdout.write(self.style.WARNING(
+                f'{backend.alias}: 전문 검색 인덱스가 없어 icontains 검색을 사용합니다.'
+            ))
+            return
+
+        total = search.rebuild_index(using=options['database'], batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'{total}개 프롬프트를 색인했습니다.'))
@@ -0,0 +1,19 @@
+import time
+
+from django.core.management.base import BaseCommand
+from prompts import similarity
+
+
+class Command(BaseCommand):
+    help = '유사 프롬프트 탐지용 MinHash 서명과 LSH 버킷을 처음부터 다시 만든다'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database', default=None, help='대상 DB 별칭')
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        total = similarity.rebuild_index(using=options['database'], batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f'{total}개 프롬프트를 색인했습니다 ({time.perf_counter() - started:.1f}초).'
+        ))
@@ -0,0 +1,20 @@
+import time
+
+from django.core.management.base import BaseCommand
+from prompts import vector_index
+
+
+class Command(BaseCommand):
+    help = '로컬 벡터 검색 인덱스(메모리 맵 파일)를 처음부터 다시 만든다'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database', default=None, help='대상 DB 별칭')
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        total = vector_index.rebuild_index(using=options['database'], batch_size=options['batch_size'])
+        index = vector_index.get_vector_index(options['database'])
+        self.stdout.write(self.style.SUCCESS(
+            f'{total}개 프롬프트를 색인했습니다 ({time.perf_counter() - started:.1f}초, {index.vectors_path}).'
+        ))
@@ -0,0 +1,37 @@
+from django.db import transaction
+from django.db.models import Count
+from django.core.management.base import BaseCommand
+from prompts.models import Category, Prompt
+
+
+class Command(BaseCommand):
+    help = 'Category.prompt_count 를 실제 프롬프트 수와 맞춘다'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help='고치지 않고 어긋난 카테고리만 출력')
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            # 보정 중 다른 요청이 카운터를 바꾸지 않도록 먼저 잠근 뒤 집계한다 (지원하는 DB 에서만)
+            categories = list(Category.objects.select_for_update().only('id', 'name', 'prompt_count'))
+            actual = dict(
+                Prompt.objects.filter(category__isnull=False)
+                .order_by()
+                .values_list('category_id')
+                .annotate(count=Count('id'))
+            )
+
+            fixed = 0
+            for category in categories:
+                count = actual.get(category.pk, 0)
+                if category.prompt_count == count:
+                    continue
+                self.stdout.write(f'{category.name}: {category.prompt_count} -> {count}')
+                if not options['dry_run']:
+                    Category.objects.filter(pk=category.pk).update(prompt_count=count)
+                fixed += 1
+
+        if options['dry_run']:
+            self.stdout.write(self.style.WARNING(f'{fixed}개 카테고리의 프롬프트 수가 어긋나 있습니다.'))
+        else:
+            self.stdout.write(self.style.SUCCESS(f'{fixed}개 카테고리의 프롬프트 수를 보정했습니다.'))
@@ -0,0 +1,33 @@
+import sqlite3
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from config.db_router import replica_aliases
+
+
+class Command(BaseCommand):
+    help = '로컬 개발용 - SQLite primary 를 replica 파일(DB_REPLICAS)로 복사한다 (복제 대신 사용)'
+
+    def handle(self, *args, **options):
+        primary = connections[DEFAULT_DB_ALIAS]
+        if primary.vendor != 'sqlite':
+            raise CommandError('SQLite 에서만 사용할 수 있습니다. 다른 DB 는 DB 자체 복제를 사용하세요.')
+
+        aliases = replica_aliases()
+        if not aliases:
+            self.stdout.write(self.style.WARNING('DB_REPLICAS 에 replica 가 없습니다.'))
+            return
+
+        primary.ensure_connection()
+        for alias in aliases:
+            connections[alias].close()
+            target = sqlite3.connect(connections[alias].settings_dict['NAME'])
+            try:
+                # 백업 API 는 쓰기 중에도 일관된 스냅샷을 복사한다
+                primary.connection.backup(target)
+            finally:
+                target.close()
+            self.stdout.write(f'{alias}: {connections[alias].settings_dict["NAME"]}')
+
+        self.stdout.write(self.style.SUCCESS(f'{len(aliases)}개 replica 를 primary 와 맞췄습니다.'))
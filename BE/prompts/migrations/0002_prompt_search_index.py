@@ -0,0 +1,76 @@
+from django.db import migrations, OperationalError
+
+
+def create_search_index(apps, schema_editor):
+    connection = schema_editor.connection
+
+    if connection.vendor == 'sqlite':
+        try:
+            schema_editor.execute(
+                "CREATE VIRTUAL TABLE prompts_prompt_fts USING fts5("
+                "title, content, tags, "
+                "tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3')"
+            )
+        except OperationalError:
+            # FTS5 미지원 빌드 - icontains 검색으로 대체됨
+            return
+    elif connection.vendor == 'postgresql':
+        schema_editor.execute(
+            "CREATE TABLE prompts_prompt_fts ("
+            "prompt_id bigint PRIMARY KEY REFERENCES prompts_prompt (id) "
+            "ON DELETE CASCADE DEFERRABLE INITIALLY DEFERRED, "
+            "document tsvector NOT NULL)"
+        )
+        schema_editor.execute(
+            "CREATE INDEX prompts_prompt_fts_document_gin "
+            "ON prompts_prompt_fts USING GIN (document)"
+        )
+    else:
+        return
+
+    # 이 시점의 색인 방식을 그대로 둔다 (prompts.search 가 바뀌어도 이 마이그레이션 결과는 같다)
+    if connection.vendor == 'sqlite':
+        insert = 'INSERT INTO prompts_prompt_fts (rowid, title, content, tags) VALUES (%s, %s, %s, %s)'
+    else:
+        insert = (
+            "INSERT INTO prompts_prompt_fts (prompt_id, document) VALUES (%s, "
+            "setweight(to_tsvector('simple', %s), 'A') || "
+            "setweight(to_tsvector('simple', %s), 'C') || "
+            "setweight(to_tsvector('simple', %s), 'B'))"
+        )
+
+    Prompt = apps.get_model('prompts', 'Prompt')
+    TaggedItem = apps.get_model('taggit', 'TaggedItem')
+    ids = list(Prompt.objects.using(connection.alias).values_list('id', flat=True))
+    for start in range(0, len(ids), 1000):
+        batch = ids[start:start + 1000]
+        tags = {}
+        tagged = TaggedItem.objects.using(connection.alias).filter(
+            content_type__app_label='prompts', content_type__model='prompt', object_id__in=batch,
+        ).values_list('object_id', 'tag__name')
+        for object_id, name in tagged:
+            tags.setdefault(object_id, []).append(name)
+        rows = Prompt.objects.using(connection.alias).filter(id__in=batch).values_list('id', 'title', 'content')
+        with connection.cursor() as cursor:
+            cursor.executemany(insert, [
+                (prompt_id, title, content, ' '.join(tags.get(prompt_id, [])))
+                for prompt_id, title, content in rows
+            ])
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor in ('sqlite', 'postgresql'):
+        schema_editor.execute('DROP TABLE IF EXISTS prompts_prompt_fts')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('prompts', '0001_initial'),
+        ('taggit', '0006_rename_taggeditem_content_type_object_id_taggit_tagg_content_8fc721_idx'),
+        ('contenttypes', '0002_remove_content_type_name'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.0.1 on 2026-10-18 10:56
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('prompts', '0002_prompt_search_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PendingUsage',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('prompt_id', models.BigIntegerField()),
+                ('user_id', models.IntegerField()),
+                ('used_at', models.DateTimeField()),
+                ('variables_used', models.JSONField(blank=True, null=True)),
+            ],
+        ),
+        migrations.AlterField(
+            model_name='promptusage',
+            name='used_at',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+    ]
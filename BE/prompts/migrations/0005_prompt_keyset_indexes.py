@@ -0,0 +1,54 @@
+# Generated by Django 5.0.1 on 2026-10-18 11:03
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def create_last_used_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    # 커서 페이지네이션은 last_used 의 NULL 을 내림차순에서 맨 뒤로 정렬한다.
+    # SQLite 는 DESC 에서 NULL 이 원래 맨 뒤이고 인덱스 정의에 NULLS LAST 를 쓸 수 없다.
+    if vendor == 'postgresql':
+        schema_editor.execute(
+            'CREATE INDEX prompts_last_used_id_idx '
+            'ON prompts_prompt (last_used DESC NULLS LAST, id DESC)'
+        )
+    elif vendor == 'sqlite':
+        schema_editor.execute(
+            'CREATE INDEX prompts_last_used_id_idx '
+            'ON prompts_prompt (last_used DESC, id DESC)'
+        )
+
+
+def drop_last_used_index(apps, schema_editor):
+    if schema_editor.connection.vendor in ('sqlite', 'postgresql'):
+        schema_editor.execute('DROP INDEX IF EXISTS prompts_last_used_id_idx')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('prompts', '0004_prompt_user_use_count_index'),
+        ('taggit', '0006_rename_taggeditem_content_type_object_id_taggit_tagg_content_8fc721_idx'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='prompt',
+            name='prompts_pro_use_cou_ee584b_idx',
+        ),
+        migrations.AddIndex(
+            model_name='prompt',
+            index=models.Index(fields=['-created_at', '-id'], name='prompts_pro_created_7bd45c_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='prompt',
+            index=models.Index(fields=['-updated_at', '-id'], name='prompts_pro_updated_8437bd_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='prompt',
+            index=models.Index(fields=['-use_count', '-id'], name='prompts_pro_use_cou_efa7bb_idx'),
+        ),
+        migrations.RunPython(create_last_used_index, drop_last_used_index),
+    ]
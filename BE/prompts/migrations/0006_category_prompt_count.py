@@ -0,0 +1,35 @@
+# Generated by Django 5.0.1 on 2026-10-18 11:07
+
+from django.db import migrations, models
+
+
+def fill_prompt_counts(apps, schema_editor):
+    Category = apps.get_model('prompts', 'Category')
+    Prompt = apps.get_model('prompts', 'Prompt')
+    alias = schema_editor.connection.alias
+
+    counts = (
+        Prompt.objects.using(alias)
+        .filter(category__isnull=False)
+        .order_by()
+        .values_list('category_id')
+        .annotate(count=models.Count('id'))
+    )
+    for category_id, count in counts:
+        Category.objects.using(alias).filter(pk=category_id).update(prompt_count=count)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('prompts', '0005_prompt_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='category',
+            name='prompt_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(fill_prompt_counts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 5.0.1 on 2026-10-18 11:42
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def build_similarity_index(apps, schema_editor):
+    from prompts import similarity
+
+    similarity.rebuild_index(using=schema_editor.connection.alias)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('prompts', '0006_category_prompt_count'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PromptSignature',
+            fields=[
+                ('prompt', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='signature', serialize=False, to='prompts.prompt')),
+                ('minhash', models.BinaryField()),
+            ],
+        ),
+        migrations.CreateModel(
+            name='PromptLSHBucket',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('bucket', models.BigIntegerField()),
+                ('prompt', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='prompts.prompt')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['bucket', 'prompt'], name='prompts_pro_bucket_6e20f8_idx')],
+            },
+        ),
+        migrations.RunPython(build_similarity_index, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 5.0.1 on 2026-10-18 11:55
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def build_frecency_scores(apps, schema_editor):
+    from prompts import frecency
+
+    frecency.rebuild_scores(using=schema_editor.connection.alias)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('prompts', '0007_prompt_similarity_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PromptFrecency',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('score', models.FloatField()),
+                ('use_count', models.PositiveIntegerField(default=0)),
+                ('last_used', models.DateTimeField()),
+                ('prompt', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='frecency_scores', to='prompts.prompt')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name_plural': 'Prompt frecencies',
+                'indexes': [models.Index(fields=['user', '-score', '-prompt'], name='prompts_pro_user_id_627bde_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='promptfrecency',
+            constraint=models.UniqueConstraint(fields=('user', 'prompt'), name='unique_user_prompt_frecency'),
+        ),
+        migrations.RunPython(build_frecency_scores, migrations.RunPython.noop),
+    ]
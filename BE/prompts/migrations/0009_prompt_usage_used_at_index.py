@@ -0,0 +1,19 @@
+# Generated by Django 5.0.1 on 2026-10-18 12:01
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('prompts', '0008_prompt_frecency'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='promptusage',
+            index=models.Index(fields=['used_at'], name='prompts_pro_used_at_3d707c_idx'),
+        ),
+    ]
@@ -1,8 +1,10 @@
-from django.db import models
+from django.db import models, router, transaction
+from django.db.models.functions import Greatest
+from django.utils import timezone
 from django.contrib.auth.models import User
 from django.core.validators import MinLengthValidator
 from taggit.managers import TaggableManager
-import re
+from .templating import get_compiled_template
 
 
 class Category(models.Model):
@@ -18,6 +20,8 @@ class Category(models.Model):
     name = models.CharField(max_length=50, unique=True)
     description = models.TextField(blank=True)
     color = models.CharField(max_length=20, choices=COLOR_CHOICES, default='blue')
+    # 프롬프트 수 (Prompt 저장/삭제 시 같은 트랜잭션에서 갱신, reconcile_category_counts 로 보정)
+    prompt_count = models.PositiveIntegerField(default=0, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
 
     class Meta:
@@ -27,6 +31,16 @@ class Category(models.Model):
     def __str__(self):
         return self.name
 
+    @classmethod
+    def adjust_prompt_counts(cls, deltas, using=None):
+        """{category_id: 증감} 을 prompt_count 에 반영 (None 키와 0 은 무시)"""
+        for category_id, delta in deltas.items():
+            if category_id is not None and delta:
+                # 어긋난 값에서 빼도 0 아래로 내려가 CHECK 제약을 어기지 않도록
+                cls.objects.using(using).filter(pk=category_id).update(
+                    prompt_count=Greatest(models.F('prompt_count') + delta, 0)
+                )
+
 
 class Prompt(models.Model):
     """프롬프트 모델 - 변수 템플릿 지원"""
@@ -86,25 +100,59 @@ class Prompt(models.Model):
         ordering = ['-created_at']
         indexes = [
             models.Index(fields=['user', '-created_at']),
-            models.Index(fields=['-use_count']),
+            models.Index(fields=['user', '-use_count']),
             models.Index(fields=['is_favorite', '-last_used']),
             models.Index(fields=['category', '-created_at']),
+            # 커서 페이지네이션 (정렬 필드, id)
+            models.Index(fields=['-created_at', '-id']),
+            models.Index(fields=['-updated_at', '-id']),
+            models.Index(fields=['-use_count', '-id']),
+            # (last_used DESC NULLS LAST, id DESC) 인덱스는 DB 마다 문법이 달라 마이그레이션 0005 에서 생성
         ]
 
     def __str__(self):
         return self.title
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # 저장 신호에서 변경 전 값과 비교하기 위해 보관
+        instance._loaded_values = dict(zip(field_names, values))
+        return instance
+
     def extract_variables(self):
-        """프롬프트 내용에서 {{변수}} 추출"""
-        pattern = r'\{\{(\w+)\}\}'
-        found_vars = re.findall(pattern, self.content)
-        return list(set(found_vars))  # 중복 제거
+        """프롬프트 내용에서 {{변수}} 추출 (등장 순서 유지, 중복 제거)"""
+        return list(get_compiled_template(self).variables)
 
     def save(self, *args, **kwargs):
-        """저장 시 자동으로 변수 추출"""
+        """저장 시 자동으로 변수 추출, 카테고리 프롬프트 수 갱신"""
         if self.is_template:
             self.variables = self.extract_variables()
-        super().save(*args, **kwargs)
+
+        using = kwargs.get('using') or router.db_for_write(Prompt, instance=self)
+        update_fields = kwargs.get('update_fields')
+        track_category = update_fields is None or 'category' in update_fields or 'category_id' in update_fields
+
+        with transaction.atomic(using=using):
+            if track_category:
+                old_category_id = self._original_category_id(using)
+            super().save(*args, **kwargs)
+            if track_category and old_category_id != self.category_id:
+                Category.adjust_prompt_counts({old_category_id: -1, self.category_id: 1}, using=using)
+        self._loaded_values = {
+            field.attname: self.__dict__[field.attname]
+            for field in self._meta.concrete_fields
+            if field.attname in self.__dict__
+        }
+
+    def _original_category_id(self, using):
+        """DB 에 저장되어 있는 카테고리 id (새 프롬프트면 None)"""
+        if self._state.adding:
+            return None
+        loaded = getattr(self, '_loaded_values', {})
+        if 'category_id' in loaded:
+            return loaded['category_id']
+        return Prompt.objects.using(using).filter(pk=self.pk).values_list('category_id', flat=True).first()
 
     def apply_variables(self, variable_values: dict) -> str:
         """
@@ -116,18 +164,37 @@ class Prompt(models.Model):
         Returns:
             변수가 대체된 프롬프트 문자열
         """
-        result = self.content
-        for var_name, var_value in variable_values.items():
-            pattern = r'\{\{' + var_name + r'\}\}'
-            result = re.sub(pattern, var_value, result)
-        return result
+        return get_compiled_template(self).render(variable_values)
+
+
+class PromptSignature(models.Model):
+    """프롬프트 내용의 MinHash 서명 (prompts.similarity, uint32 x NUM_PERM)"""
+    prompt = models.OneToOneField(Prompt, on_delete=models.CASCADE, primary_key=True, related_name='signature')
+    minhash = models.BinaryField()
+
+    def __str__(self):
+        return f"signature {self.prompt_id}"
+
+
+class PromptLSHBucket(models.Model):
+    """MinHash 밴드 해시 - 버킷이 같은 프롬프트가 유사 후보"""
+    prompt = models.ForeignKey(Prompt, on_delete=models.CASCADE, related_name='+')
+    bucket = models.BigIntegerField()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['bucket', 'prompt']),
+        ]
+
+    def __str__(self):
+        return f"{self.prompt_id} - {self.bucket}"
 
 
 class PromptUsage(models.Model):
     """프롬프트 사용 이력"""
     prompt = models.ForeignKey(Prompt, on_delete=models.CASCADE, related_name='usages')
     user = models.ForeignKey(User, on_delete=models.CASCADE)
-    used_at = models.DateTimeField(auto_now_add=True)
+    used_at = models.DateTimeField(default=timezone.now)
     variables_used = models.JSONField(
         null=True,
         blank=True,
@@ -139,7 +206,42 @@ class PromptUsage(models.Model):
         indexes = [
             models.Index(fields=['prompt', '-used_at']),
             models.Index(fields=['user', '-used_at']),
+            # 보관 기간이 지난 행 찾기 (archive_usage)
+            models.Index(fields=['used_at']),
         ]
 
     def __str__(self):
         return f"{self.prompt.title} - {self.used_at}"
+
+
+class PromptFrecency(models.Model):
+    """사용자별 프롬프트 frecency - 사용 빈도와 최근성 (score 는 prompts.decay 의 로그 점수)"""
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='+')
+    prompt = models.ForeignKey(Prompt, on_delete=models.CASCADE, related_name='frecency_scores')
+    score = models.FloatField()
+    use_count = models.PositiveIntegerField(default=0)
+    last_used = models.DateTimeField()
+
+    class Meta:
+        verbose_name_plural = 'Prompt frecencies'
+        indexes = [
+            # frecent/ 와 ordering=-frecency 커서 페이지네이션 (사용자, 점수, 프롬프트 id)
+            models.Index(fields=['user', '-score', '-prompt']),
+        ]
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'prompt'], name='unique_user_prompt_frecency'),
+        ]
+
+    def __str__(self):
+        return f"{self.user_id} - {self.prompt_id}: {self.score:.3f}"
+
+
+class PendingUsage(models.Model):
+    """PromptUsage 적재 대기열 - DB 큐 백엔드용 (보조 인덱스 없음)"""
+    prompt_id = models.BigIntegerField()
+    user_id = models.IntegerField()
+    used_at = models.DateTimeField()
+    variables_used = models.JSONField(null=True, blank=True)
+
+    def __str__(self):
+        return f"{self.prompt_id} - {self.used_at}"
@@ -0,0 +1,214 @@
+"""
+프롬프트 목록 커서(keyset) 페이지네이션
+
+마지막 항목의 정렬 키 (정렬 필드 값, id) 를 커서로 넘기고 다음 페이지는
+`WHERE (필드, id) < (값, id) ORDER BY 필드 DESC, id DESC LIMIT n` 으로 읽는다.
+COUNT(*) 와 OFFSET 이 없으므로 500 번째 페이지도 첫 페이지와 비용이 같다.
+
+- 지원 정렬: created_at, updated_at, use_count, last_used, search_rank, frecency (+ id 동점 처리)
+- last_used/frecency 의 NULL(한 번도 사용 안 함)은 DB 와 관계없이 내림차순이면 맨 뒤, 오름차순이면 맨 앞
+- ?page= 나 ?page_size= 가 있으면 기존 PageNumberPagination 응답(count/next/previous)을 그대로 돌려준다
+  (count 를 읽는 기존 클라이언트 호환)
+"""
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from collections import OrderedDict
+
+from django.db.models import F, Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+KEYSET_FIELDS = {
+    'created_at': parse_datetime,
+    'updated_at': parse_datetime,
+    'last_used': parse_datetime,
+    'use_count': int,
+    'search_rank': float,
+    'frecency': float,
+    'id': int,
+}
+NULLABLE_FIELDS = {'last_used', 'frecency'}
+
+
+def _encode_value(value):
+    return value.isoformat() if hasattr(value, 'isoformat') else value
+
+
+def _ordering_keys(queryset):
+    """queryset 정렬을 [(필드, 내림차순 여부), ...] 로 - keyset 으로 처리할 수 없으면 None"""
+    query = queryset.query
+    ordering = query.order_by or (query.get_meta().ordering if query.default_ordering else ())
+    keys = []
+    for term in ordering:
+        if not isinstance(term, str):
+            return None
+        name = term.lstrip('-')
+        if name == 'pk':
+            name = 'id'
+        if name not in KEYSET_FIELDS:
+            return None
+        keys.append((name, term.startswith('-')))
+        if name == 'id':
+            break
+    if not keys:
+        return None
+    if keys[-1][0] != 'id':
+        keys.append(('id', keys[0][1]))
+    return keys
+
+
+def _order_expression(name, descending):
+    if name in NULLABLE_FIELDS:
+        # NULL 은 가장 작은 값으로 취급
+        return F(name).desc(nulls_last=True) if descending else F(name).asc(nulls_first=True)
+    return F(name).desc() if descending else F(name).asc()
+
+
+def _after(name, descending, value):
+    """정렬 순서상 value 보다 뒤에 오는 행 조건 (없으면 None)"""
+    if value is None:
+        return None if descending else Q(**{f'{name}__isnull': False})
+    condition = Q(**{f'{name}__lt' if descending else f'{name}__gt': value})
+    if descending and name in NULLABLE_FIELDS:
+        condition |= Q(**{f'{name}__isnull': True})
+    return condition
+
+
+def _equal(name, value):
+    if value is None:
+        return Q(**{f'{name}__isnull': True})
+    return Q(**{name: value})
+
+
+def keyset_filter(keys, values):
+    """(k1, k2, ...) > (v1, v2, ...) 를 사전식 비교 조건으로 펼친다"""
+    condition = Q(pk__in=[])
+    prefix = Q()
+    for (name, descending), value in zip(keys, values):
+        after = _after(name, descending, value)
+        if after is not None:
+            condition |= prefix & after
+        prefix &= _equal(name, value)
+    return condition
+
+
+class PromptCursorPagination(BasePagination):
+    """
+    무한 스크롤용 커서 페이지네이션 (다음 페이지만 제공)
+
+    응답: {"next": "...?cursor=...", "results": [...]}
+    """
+    cursor_query_param = 'cursor'
+    page_query_param = 'page'
+    page_size_query_param = 'page_size'
+    page_size = PageNumberPagination.page_size
+
+    def __init__(self):
+        self._page_number = None
+
+    def paginate_queryset(self, queryset, request, view=None):
+        keys = _ordering_keys(queryset)
+        page_number = (
+            self.page_query_param in request.query_params
+            or self.page_size_query_param in request.query_params
+        )
+        if keys is None or page_number:
+            self._page_number = PageNumberPagination()
+            return self._page_number.paginate_queryset(queryset, request, view)
+        self._page_number = None
+
+        if not self.page_size:
+            return None
+
+        self.request = request
+        self.keys = keys
+        queryset = queryset.order_by(*(_order_expression(name, desc) for name, desc in keys))
+
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded:
+            queryset = queryset.filter(keyset_filter(keys, self.decode_cursor(encoded)))
+
+        page = list(queryset[:self.page_size + 1])
+        self.has_next = len(page) > self.page_size
+        self.page = page[:self.page_size]
+        return self.page
+
+    def decode_cursor(self, encoded):
+        try:
+            values = json.loads(urlsafe_b64decode(encoded.encode('ascii')))
+            if not isinstance(values, list) or len(values) != len(self.keys):
+                raise ValueError
+            decoded = [
+                None if value is None else KEYSET_FIELDS[name](value)
+                for (name, _), value in zip(self.keys, values)
+            ]
+            if any(value is None and name not in NULLABLE_FIELDS
+                   for (name, _), value in zip(self.keys, decoded)):
+                raise ValueError
+            return decoded
+        except (TypeError, ValueError, UnicodeError):
+            raise NotFound('Invalid cursor')
+
+    def encode_cursor(self, item):
+        # .values() 행(dict) 과 모델 인스턴스 모두 지원
+        get = item.get if isinstance(item, dict) else item.__getattribute__
+        values = [_encode_value(get(name)) for name, _ in self.keys]
+        return urlsafe_b64encode(json.dumps(values).encode('ascii')).decode('ascii')
+
+    def get_next_link(self):
+        if self._page_number is not None:
+            return self._page_number.get_next_link()
+        if not self.has_next:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(self.page[-1]))
+
+    def get_paginated_response(self, data):
+        if self._page_number is not None:
+            return self._page_number.get_paginated_response(data)
+        return Response(OrderedDict([
+            ('next', self.get_next_link()),
+            ('results', data),
+        ]))
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {
+                    'type': 'string',
+                    'nullable': True,
+                    'format': 'uri',
+                },
+                'results': schema,
+            },
+        }
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            {
+                'name': self.cursor_query_param,
+                'required': False,
+                'in': 'query',
+                'description': '이전 응답의 next 에 포함된 커서',
+                'schema': {'type': 'string'},
+            },
+            {
+                'name': self.page_query_param,
+                'required': False,
+                'in': 'query',
+                'description': '페이지 번호 (지정하면 count 를 포함한 페이지 번호 방식 응답)',
+                'schema': {'type': 'integer'},
+            },
+            {
+                'name': self.page_size_query_param,
+                'required': False,
+                'in': 'query',
+                'description': '지정하면 page 와 같이 페이지 번호 방식 응답 (페이지 크기는 서버 설정)',
+                'schema': {'type': 'integer'},
+            },
+        ]
@@ -0,0 +1,33 @@
+import json
+
+from django.conf import settings
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import BaseParser
+
+
+def iter_ndjson(stream, encoding='utf-8'):
+    """
+    NDJSON 스트림을 한 줄씩 읽어 객체를 내보낸다 (빈 줄 무시)
+
+    본문 전체를 메모리에 올리지 않으므로 큰 업로드도 줄 단위로 처리할 수 있다.
+    """
+    if stream is None:
+        return
+    for line_number, line in enumerate(stream, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield json.loads(line.decode(encoding) if isinstance(line, bytes) else line)
+        except ValueError as exc:
+            raise ParseError(f'NDJSON parse error on line {line_number} - {exc}')
+
+
+class NDJSONParser(BaseParser):
+    """application/x-ndjson 본문 파서 - 줄 단위 제너레이터를 반환"""
+    media_type = 'application/x-ndjson'
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get('encoding', settings.DEFAULT_CHARSET)
+        return iter_ndjson(stream, encoding)
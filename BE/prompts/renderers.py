@@ -0,0 +1,33 @@
+import orjson
+from rest_framework.renderers import JSONRenderer
+
+
+class ORJSONRenderer(JSONRenderer):
+    """
+    orjson 기반 JSON 렌더러 - DRF JSONRenderer 기본 설정과 같은 바이트를 낸다
+
+    (UTF-8, 공백 없는 구분자, U+2028/U+2029 이스케이프)
+    들여쓰기를 요청하면 DRF 기본 렌더러로 처리한다.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+
+        renderer_context = renderer_context or {}
+        if self.ensure_ascii or not self.compact or self.get_indent(accepted_media_type, renderer_context):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        try:
+            ret = orjson.dumps(
+                data,
+                default=self.encoder_class().default,
+                # 날짜/시간은 DRF 인코더 형식(밀리초, Z)을 따르도록 default 로 넘긴다
+                option=orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS | orjson.OPT_NON_STR_KEYS,
+            )
+        except orjson.JSONEncodeError:
+            # 64비트를 넘는 정수 등 orjson 이 다루지 못하는 값
+            return super().render(data, accepted_media_type, renderer_context)
+
+        # JSONRenderer 와 마찬가지로 JavaScript 에서 문자열을 끊는 두 문자는 이스케이프
+        return ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
@@ -0,0 +1,276 @@
+"""
+프롬프트 조회 응답 캐시 (버전 키 + ETag/Last-Modified)
+
+캐시 키에 버전 번호를 넣고, 내용이 바뀌면 버전만 올려 이전 항목을 한 번에 무효화한다.
+항목을 지우지 않으므로 LocMemCache 와 Redis/Memcached 같은 공유 캐시에서 똑같이 동작한다.
+
+- global: 카테고리/태그 변경 (모든 응답에 이름이 들어가므로 전체 무효화)
+- public: 공개 프롬프트 변경 (공개였거나 공개가 된 경우)
+- user:<id>: 해당 사용자 프롬프트 변경
+- counters:<public|user:id>: 사용 횟수 반영 (use_count/last_used 만 바뀜)
+
+익명 응답은 global+public, 로그인 응답은 global+public+user 버전을 키에 포함한다.
+캐시에는 직렬화된 data 와 ETag/Last-Modified 를 저장하므로, 일치하는 조건부 요청은
+ORM 조회와 직렬화 없이 304 를 받는다.
+
+사용 횟수 반영(부하 중에는 초당 한 번꼴)은 응답을 버리지 않는다. 항목에 만들 때의 counters 버전을
+같이 저장하고, 버전이 바뀌었으면 응답에 든 프롬프트의 use_count/last_used 만 한 번에 다시 읽어
+고친 뒤 ETag 를 다시 계산한다. 사용 횟수/최근 사용/frecency 로 정렬한 목록은 순서와 커서가
+바뀌므로 counters 버전도 키에 넣어 통째로 다시 만든다.
+
+Last-Modified 는 응답 행의 updated_at 이 아니라 버전을 올린 시각(스코프 중 가장 최근, 초 단위 올림)이다.
+삭제나 사용 횟수/태그/카테고리 변경도 반영되어 값이 줄어들지 않는다. 그 초가 지나기 전에 만든
+응답에는 붙이지 않는다 (같은 초에 다시 바뀌면 If-Modified-Since 로 구분할 수 없으므로).
+
+버전을 올린 지 DB_REPLICA_STICKY_SECONDS 가 지나지 않은 스코프의 응답은 replica 대신 primary 에서
+읽어 만든다. 복제가 늦은 replica 의 이전 결과가 새 버전 키와 ETag 로 캐시되지 않도록.
+"""
+import hashlib
+import json
+import math
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date
+from rest_framework import serializers
+from rest_framework.response import Response
+
+from config.db_router import use_primary
+
+VERSION_KEY = 'prompts:version:{scope}'
+CHANGED_KEY = 'prompts:changed:{scope}'
+RESPONSE_KEY = 'prompts:response:{user}:{versions}:{path}'
+
+GLOBAL = 'global'
+PUBLIC = 'public'
+
+# 사용 횟수 반영으로 바뀌는 필드와, 이 값으로 정렬한 목록의 ordering
+COUNTER_FIELDS = ('use_count', 'last_used')
+COUNTER_ORDERINGS = ('use_count', 'last_used', 'frecency')
+
+_datetime_field = serializers.DateTimeField()
+
+
+def user_scope(user_id):
+    return f'user:{user_id}'
+
+
+def counter_scope(scope):
+    """scope 응답에 든 use_count/last_used 의 버전 스코프"""
+    return f'counters:{scope}'
+
+
+def get_versions(scopes, key_format=VERSION_KEY):
+    """스코프별 현재 버전 (없으면 새로 만든다) - key_format 으로 다른 버전 키를 쓸 수 있다"""
+    keys = {key_format.format(scope=scope): scope for scope in scopes}
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            # 버전 키가 밀려나도 이전 번호로 돌아가지 않도록 시각 기반으로 시작
+            cache.add(key, time.time_ns(), timeout=None)
+            versions[key] = cache.get(key)
+    return [versions[key] for key in keys]
+
+
+def _bump(scopes, key_format=VERSION_KEY):
+    for scope in scopes:
+        key = key_format.format(scope=scope)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, time.time_ns(), timeout=None)
+    # 변경 시각(Last-Modified)은 응답 캐시 버전에만 기록
+    if key_format == VERSION_KEY:
+        cache.set_many({CHANGED_KEY.format(scope=scope): time.time() for scope in scopes}, timeout=None)
+
+
+def last_changed(scopes, default=None):
+    """스코프 중 가장 최근에 버전을 올린 시각 (기록이 없으면 default, 없으면 지금으로 본다)"""
+    keys = [CHANGED_KEY.format(scope=scope) for scope in scopes]
+    changed = cache.get_many(keys)
+    now = time.time() if default is None else default
+    for key in keys:
+        if key not in changed:
+            cache.add(key, now, timeout=None)
+            changed[key] = cache.get(key, now)
+    return max(changed.values())
+
+
+def bump_versions(scopes, using=None, key_format=VERSION_KEY):
+    """
+    버전을 올려 해당 스코프의 캐시 응답을 무효화
+
+    즉시 한 번, 커밋 후 한 번 더 올린다. 트랜잭션 도중 다른 요청이 커밋 전
+    데이터를 새 버전으로 캐시하더라도 커밋 후 버전이 다시 바뀐다.
+    """
+    scopes = set(scopes)
+    if not scopes:
+        return
+    _bump(scopes, key_format)
+    transaction.on_commit(lambda: _bump(scopes, key_format), using=using)
+
+
+def scopes_for(rows):
+    """(user_id, is_public) 목록 -> 올릴 스코프"""
+    scopes = set()
+    for user_id, is_public in rows:
+        scopes.add(user_scope(user_id))
+        if is_public:
+            scopes.add(PUBLIC)
+    return scopes
+
+
+def _prompt_scopes(prompt_ids, using=None):
+    from .models import Prompt
+
+    prompt_ids = list(prompt_ids)
+    if not prompt_ids:
+        return set()
+    rows = Prompt.objects.using(using).filter(pk__in=prompt_ids).values_list('user_id', 'is_public')
+    return scopes_for(rows)
+
+
+def invalidate_prompts(prompt_ids, using=None):
+    """id 로만 알고 있는 프롬프트들의 소유자/공개 스코프 무효화"""
+    bump_versions(_prompt_scopes(prompt_ids, using=using), using=using)
+
+
+def invalidate_counters(prompt_ids, using=None):
+    """사용 횟수가 반영된 프롬프트들의 counters 스코프만 올린다 (캐시된 응답은 다음 조회에서 고친다)"""
+    bump_versions({counter_scope(scope) for scope in _prompt_scopes(prompt_ids, using=using)}, using=using)
+
+
+def refresh_counters(data):
+    """캐시된 응답 data 에 든 프롬프트의 use_count/last_used 를 DB 값으로 고친다 (쿼리 한 번)"""
+    from .models import Prompt
+
+    items = data.get('results', [data]) if isinstance(data, dict) else data
+    ids = [item['id'] for item in items if isinstance(item, dict) and 'id' in item]
+    if not ids:
+        return
+    counters = {
+        prompt_id: (use_count, last_used)
+        for prompt_id, use_count, last_used in Prompt.objects.filter(pk__in=ids).values_list('id', *COUNTER_FIELDS)
+    }
+    for item in items:
+        row = counters.get(item.get('id')) if isinstance(item, dict) else None
+        if row is None:
+            continue
+        use_count, last_used = row
+        if 'use_count' in item:
+            item['use_count'] = use_count
+        if 'last_used' in item:
+            item['last_used'] = _datetime_field.to_representation(last_used) if last_used else None
+
+
+def _etag(data):
+    payload = json.dumps(data, cls=DjangoJSONEncoder, sort_keys=True).encode('utf-8')
+    return '"%s"' % hashlib.md5(payload, usedforsecurity=False).hexdigest()
+
+
+def _conditional_headers(response, etag, last_modified):
+    response['ETag'] = etag
+    if last_modified is not None:
+        response['Last-Modified'] = http_date(last_modified)
+    patch_vary_headers(response, ['Authorization'])
+    return response
+
+
+class CachedResponseMixin:
+    """
+    ViewSet 의 list/retrieve 응답을 버전 키로 캐시하고 ETag/Last-Modified 를 붙인다
+    """
+
+    def list(self, request, *args, **kwargs):
+        return self._cached_response(request, super().list, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self._cached_response(request, super().retrieve, *args, **kwargs)
+
+    def _scopes(self, request):
+        scopes = [GLOBAL, PUBLIC]
+        if request.user.is_authenticated:
+            scopes.append(user_scope(request.user.pk))
+        return scopes
+
+    def _orders_by_counters(self, request):
+        ordering = request.query_params.get('ordering', '')
+        return any(field in ordering for field in COUNTER_ORDERINGS)
+
+    def _response_key(self, request, versions):
+        user = request.user
+        versions = '.'.join(str(version) for version in versions)
+        # 같은 URL 이라도 응답 형식(JSON/Browsable API)이 다를 수 있다
+        path = hashlib.md5(
+            f'{request.get_full_path()}|{request.META.get("HTTP_ACCEPT", "")}'.encode('utf-8'),
+            usedforsecurity=False,
+        ).hexdigest()
+        return RESPONSE_KEY.format(user=user.pk or 'anon', versions=versions, path=path)
+
+    def _last_modified(self, changed):
+        """버전을 올린 시각(초 단위 올림) - 아직 그 초가 지나지 않았으면 None"""
+        last_modified = math.ceil(changed)
+        return last_modified if last_modified <= time.time() else None
+
+    def _changed(self, scopes, counter_scopes):
+        """(사용 횟수 포함 가장 최근 변경 시각, 내용 변경 시각) - 사용 횟수 기록이 없으면 내용 기준"""
+        changed = last_changed(scopes)
+        return max(changed, last_changed(counter_scopes, default=changed)), changed
+
+    def _cached_response(self, request, handler, *args, **kwargs):
+        timeout = settings.PROMPT_RESPONSE_CACHE_TIMEOUT
+        if request.method != 'GET' or not timeout:
+            return handler(request, *args, **kwargs)
+
+        scopes = self._scopes(request)
+        counter_scopes = [counter_scope(scope) for scope in scopes if scope != GLOBAL]
+        versions = get_versions([*scopes, *counter_scopes])
+        counters = versions[len(scopes):]
+        key = self._response_key(request, versions if self._orders_by_counters(request) else versions[:len(scopes)])
+        entry = cache.get(key)
+        if entry is None:
+            # 조회 전에 읽어 둔다 - 조회 중에 바뀌면 더 최근 시각이 되어 다음 요청이 200 을 받는다
+            changed, content_changed = self._changed(scopes, counter_scopes)
+            last_modified = self._last_modified(changed)
+            if time.time() - content_changed < settings.DB_REPLICA_STICKY_SECONDS:
+                # 방금 바뀐 스코프 - replica 가 아직 따라오지 못했을 수 있다
+                use_primary()
+            response = handler(request, *args, **kwargs)
+            if response.status_code != 200:
+                return response
+            entry = {
+                'data': response.data,
+                'etag': _etag(response.data),
+                'last_modified': last_modified,
+                'counters': counters,
+            }
+            cache.set(key, entry, timeout)
+        else:
+            response = None
+            if entry.get('counters') != counters:
+                # 사용 횟수만 바뀌었다 - 두 필드만 다시 읽어 고친다 (버전은 고치기 전에 읽은 값)
+                changed, _ = self._changed(scopes, counter_scopes)
+                if time.time() - changed < settings.DB_REPLICA_STICKY_SECONDS:
+                    use_primary()
+                refresh_counters(entry['data'])
+                entry['etag'] = _etag(entry['data'])
+                entry['last_modified'] = self._last_modified(changed)
+                entry['counters'] = counters
+                cache.set(key, entry, timeout)
+            elif entry['last_modified'] is None:
+                # 만들 때 아직 같은 초였다면 이제 붙일 수 있다 (그 뒤 변경은 키나 counters 버전이 바뀐다)
+                entry['last_modified'] = self._last_modified(self._changed(scopes, counter_scopes)[0])
+
+        not_modified = get_conditional_response(
+            request, etag=entry['etag'], last_modified=entry['last_modified'],
+        )
+        if not_modified is not None:
+            return _conditional_headers(not_modified, entry['etag'], entry['last_modified'])
+
+        if response is None:
+            response = Response(entry['data'])
+        return _conditional_headers(response, entry['etag'], entry['last_modified'])
@@ -0,0 +1,264 @@
+"""
+프롬프트 전문 검색 인덱스
+
+제목/내용/태그를 별도 인덱스 테이블(`prompts_prompt_fts`)에 보관하고
+DB 종류에 맞는 백엔드로 관련도 순 검색을 수행한다.
+
+- SQLite: FTS5 가상 테이블 (bm25 랭킹)
+- PostgreSQL: tsvector 컬럼 + GIN 인덱스 (ts_rank_cd 랭킹)
+- 그 외: 기존 icontains 검색으로 대체
+"""
+import re
+
+from django.contrib.contenttypes.models import ContentType
+from django.db import connections, router
+from django.db.models import FloatField, Q
+from django.db.models.expressions import RawSQL
+from taggit.models import TaggedItem
+
+INDEX_TABLE = 'prompts_prompt_fts'
+
+# 제목 > 태그 > 내용 순으로 가중치
+TITLE_WEIGHT = 10.0
+CONTENT_WEIGHT = 1.0
+TAGS_WEIGHT = 5.0
+
+TOKEN_PATTERN = re.compile(r'\w+', re.UNICODE)
+
+_backends = {}
+
+
+def tokenize(query):
+    """검색어를 인덱스 토큰으로 분리 (소문자, 특수문자 제거)"""
+    return [token.lower() for token in TOKEN_PATTERN.findall(query or '')]
+
+
+def build_documents(prompt_ids, using=None):
+    """인덱싱할 (id, title, content, tags) 튜플 목록 - 태그는 한 번에 조회"""
+    from .models import Prompt
+
+    prompt_ids = list(prompt_ids)
+    if not prompt_ids:
+        return []
+
+    rows = Prompt.objects.using(using).filter(id__in=prompt_ids).values_list('id', 'title', 'content')
+
+    tags = {}
+    tagged = TaggedItem.objects.using(using).filter(
+        content_type=ContentType.objects.db_manager(using).get_for_model(Prompt),
+        object_id__in=prompt_ids,
+    ).values_list('object_id', 'tag__name')
+    for object_id, name in tagged:
+        tags.setdefault(object_id, []).append(name)
+
+    return [
+        (prompt_id, title, content, ' '.join(tags.get(prompt_id, [])))
+        for prompt_id, title, content in rows
+    ]
+
+
+class BaseSearchBackend:
+    """검색 백엔드 기본 클래스"""
+    vendor = None
+
+    def __init__(self, alias):
+        self.alias = alias
+
+    def index(self, prompt_ids):
+        pass
+
+    def remove(self, prompt_ids):
+        pass
+
+    def clear(self):
+        pass
+
+    def search(self, queryset, query):
+        raise NotImplementedError
+
+
+class BasicSearchBackend(BaseSearchBackend):
+    """인덱스가 없는 DB용 - 기존 icontains 검색"""
+
+    def search(self, queryset, query):
+        return queryset.filter(
+            Q(title__icontains=query) |
+            Q(content__icontains=query) |
+            Q(tags__name__icontains=query)
+        ).distinct()
+
+
+class SQLiteSearchBackend(BaseSearchBackend):
+    """SQLite FTS5 가상 테이블 기반 검색"""
+    vendor = 'sqlite'
+
+    def index(self, prompt_ids):
+        documents = build_documents(prompt_ids, using=self.alias)
+        with connections[self.alias].cursor() as cursor:
+            self._delete(cursor, prompt_ids)
+            cursor.executemany(
+                f'INSERT INTO {INDEX_TABLE} (rowid, title, content, tags) VALUES (%s, %s, %s, %s)',
+                documents,
+            )
+
+    def remove(self, prompt_ids):
+        with connections[self.alias].cursor() as cursor:
+            self._delete(cursor, prompt_ids)
+
+    def clear(self):
+        with connections[self.alias].cursor() as cursor:
+            cursor.execute(f'DELETE FROM {INDEX_TABLE}')
+
+    def _delete(self, cursor, prompt_ids):
+        cursor.executemany(
+            f'DELETE FROM {INDEX_TABLE} WHERE rowid = %s',
+            [(prompt_id,) for prompt_id in prompt_ids],
+        )
+
+    def search(self, queryset, query):
+        tokens = tokenize(query)
+        if not tokens:
+            return queryset.none()
+
+        # 각 토큰을 접두어 구문으로 감싸 FTS5 문법 오류를 방지 (AND 검색)
+        match = ' '.join(f'"{token}"*' for token in tokens)
+        return queryset.extra(
+            tables=[INDEX_TABLE],
+            where=[
+                f'{INDEX_TABLE}.rowid = prompts_prompt.id',
+                f'{INDEX_TABLE} MATCH %s',
+            ],
+            params=[match],
+        ).annotate(
+            # bm25는 낮을수록 관련도가 높으므로 부호를 뒤집는다
+            search_rank=RawSQL(
+                f'-bm25({INDEX_TABLE}, {TITLE_WEIGHT}, {CONTENT_WEIGHT}, {TAGS_WEIGHT})', [],
+                output_field=FloatField(),
+            ),
+        ).order_by('-search_rank', '-id')
+
+
+class PostgreSQLSearchBackend(BaseSearchBackend):
+    """PostgreSQL tsvector + GIN 인덱스 기반 검색"""
+    vendor = 'postgresql'
+    config = 'simple'
+
+    def index(self, prompt_ids):
+        documents = build_documents(prompt_ids, using=self.alias)
+        with connections[self.alias].cursor() as cursor:
+            self._delete(cursor, prompt_ids)
+            cursor.executemany(
+                f"""
+                INSERT INTO {INDEX_TABLE} (prompt_id, document) VALUES (
+                    %s,
+                    setweight(to_tsvector('{self.config}', %s), 'A') ||
+                    setweight(to_tsvector('{self.config}', %s), 'C') ||
+                    setweight(to_tsvector('{self.config}', %s), 'B')
+                )
+                """,
+                documents,
+            )
+
+    def remove(self, prompt_ids):
+        with connections[self.alias].cursor() as cursor:
+            self._delete(cursor, prompt_ids)
+
+    def clear(self):
+        with connections[self.alias].cursor() as cursor:
+            cursor.execute(f'TRUNCATE {INDEX_TABLE}')
+
+    def _delete(self, cursor, prompt_ids):
+        cursor.execute(
+            f'DELETE FROM {INDEX_TABLE} WHERE prompt_id = ANY(%s)',
+            [list(prompt_ids)],
+        )
+
+    def search(self, queryset, query):
+        tokens = tokenize(query)
+        if not tokens:
+            return queryset.none()
+
+        # 접두어 검색 (python:* & 코드:*)
+        ts_query = ' & '.join(f'{token}:*' for token in tokens)
+        return queryset.extra(
+            tables=[INDEX_TABLE],
+            where=[
+                f'{INDEX_TABLE}.prompt_id = prompts_prompt.id',
+                f"{INDEX_TABLE}.document @@ to_tsquery('{self.config}', %s)",
+            ],
+            params=[ts_query],
+        ).annotate(
+            search_rank=RawSQL(
+                f"ts_rank_cd({INDEX_TABLE}.document, to_tsquery('{self.config}', %s))", [ts_query],
+                output_field=FloatField(),
+            ),
+        ).order_by('-search_rank', '-id')
+
+
+BACKENDS = {
+    backend.vendor: backend
+    for backend in (SQLiteSearchBackend, PostgreSQLSearchBackend)
+}
+
+
+def get_search_backend(alias=None):
+    """DB 별칭에 맞는 검색 백엔드 (인덱스 테이블이 없으면 icontains 대체)"""
+    from .models import Prompt
+
+    alias = alias or router.db_for_write(Prompt)
+    if alias not in _backends:
+        connection = connections[alias]
+        backend_class = BACKENDS.get(connection.vendor, BasicSearchBackend)
+        if backend_class is not BasicSearchBackend:
+            with connection.cursor() as cursor:
+                tables = connection.introspection.table_names(cursor)
+            if INDEX_TABLE not in tables:
+                backend_class = BasicSearchBackend
+        _backends[alias] = backend_class(alias)
+    return _backends[alias]
+
+
+def reset_backends():
+    """백엔드 캐시 초기화 (마이그레이션/테스트 DB 생성 후)"""
+    _backends.clear()
+
+
+def index_prompts(prompt_ids, using=None):
+    prompt_ids = list(prompt_ids)
+    if prompt_ids:
+        get_search_backend(using).index(prompt_ids)
+
+
+def remove_prompts(prompt_ids, using=None):
+    prompt_ids = list(prompt_ids)
+    if prompt_ids:
+        get_search_backend(using).remove(prompt_ids)
+
+
+def search_prompts(queryset, query):
+    """queryset 범위 안에서 관련도 순으로 검색 (search_rank 주석 포함)"""
+    return get_search_backend(queryset.db).search(queryset, query)
+
+
+def rebuild_index(using=None, batch_size=1000):
+    """전체 인덱스 재구축 - 색인한 프롬프트 수 반환"""
+    from .models import Prompt
+
+    backend = get_search_backend(using)
+    backend.clear()
+
+    total = 0
+    last_id = 0
+    while True:
+        ids = list(
+            Prompt.objects.using(backend.alias)
+            .filter(id__gt=last_id)
+            .order_by('id')
+            .values_list('id', flat=True)[:batch_size]
+        )
+        if not ids:
+            break
+        backend.index(ids)
+        total += len(ids)
+        last_id = ids[-1]
+    return total
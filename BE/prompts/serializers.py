@@ -1,3 +1,4 @@
+from django.conf import settings
 from rest_framework import serializers
 from .models import Prompt, Category, PromptUsage
 from taggit.serializers import TagListSerializerField, TaggitSerializer
@@ -77,6 +78,40 @@ class PromptApplyVariablesSerializer(serializers.Serializer):
         return value
 
 
+class PromptBatchApplyVariablesSerializer(serializers.Serializer):
+    """변수 일괄 적용 요청 - 변수 세트 목록을 한 번에 검증"""
+    variable_values = serializers.ListField(
+        child=serializers.DictField(),
+        allow_empty=False,
+        help_text="변수명:값 쌍 목록 (예: [{'language': 'Python'}, {'language': 'Go'}])"
+    )
+
+    def validate_variable_values(self, value):
+        """개수 제한, 값 타입, 필수 변수를 한 번에 검사하고 오류는 인덱스별로 모은다"""
+        max_size = settings.PROMPT_BATCH_RENDER_MAX
+        if len(value) > max_size:
+            raise serializers.ValidationError(
+                f"Ensure this field has no more than {max_size} elements."
+            )
+
+        prompt = self.context.get('prompt')
+        required_vars = set(prompt.variables) if prompt and prompt.is_template else set()
+
+        errors = {}
+        for index, variable_values in enumerate(value):
+            if not all(isinstance(v, str) for v in variable_values.values()):
+                errors[index] = ["Variable values must be strings"]
+                continue
+            missing = required_vars.difference(variable_values)
+            if missing:
+                errors[index] = [f"Missing required variables: {', '.join(sorted(missing))}"]
+
+        if errors:
+            raise serializers.ValidationError(errors)
+
+        return value
+
+
 class PromptUsageSerializer(serializers.ModelSerializer):
     prompt_title = serializers.CharField(source='prompt.title', read_only=True)
 
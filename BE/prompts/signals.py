@@ -0,0 +1,227 @@
+import threading
+
+from django.db import router, transaction
+from django.db.models.signals import post_save, post_delete, m2m_changed, post_migrate
+from django.dispatch import receiver, Signal
+from taggit.models import Tag, TaggedItem
+from . import autocomplete, frecency, response_cache, search, similarity, vector_index
+from .models import Prompt, Category
+
+# PromptUsage 가 일괄 기록된 직후 (같은 트랜잭션 안에서) 발생 - usages: 기록된 PromptUsage 목록
+usage_recorded = Signal()
+
+# bulk_create/bulk_update 처럼 post_save 가 발생하지 않는 일괄 변경 직후 발생 - prompt_ids: 변경된 프롬프트 id 목록
+prompts_bulk_saved = Signal()
+
+# 버퍼에 모인 use_count/last_used 가 DB 에 반영된 직후 발생 - prompt_ids: 갱신된 프롬프트 id 목록
+usage_counters_flushed = Signal()
+
+# (DB alias, 색인 함수) -> 커밋 뒤 색인할 프롬프트 id (스레드별 - 연결도 스레드별)
+_pending_index = threading.local()
+
+
+def _index_on_commit(index_prompts, prompt_ids, using=None):
+    """
+    커밋 뒤 index_prompts(prompt_ids) - 한 트랜잭션에서 여러 번 불려도 프롬프트마다 한 번만 색인
+
+    태그가 달린 프롬프트를 만들면 post_save, set() 의 post_clear/post_add 가 모두 재색인을 요청한다.
+    콜백은 매번 등록하고 처음 실행되는 콜백이 모인 id 를 가져간다 (롤백된 콜백의 id 도 남은 콜백이
+    색인하지만 DB 의 현재 값으로 다시 만드는 것이라 무해하다).
+    """
+    pending = getattr(_pending_index, 'ids', None)
+    if pending is None:
+        pending = _pending_index.ids = {}
+    key = (using or router.db_for_write(Prompt), index_prompts)
+    pending.setdefault(key, set()).update(prompt_ids)
+
+    def run():
+        ids = pending.pop(key, None)
+        if ids:
+            index_prompts(sorted(ids), using=using)
+
+    transaction.on_commit(run, using=using)
+
+
+def _fields_changed(instance, fields, created=False, update_fields=None):
+    """저장으로 fields 중 하나라도 바뀌었을 수 있는지 (update_fields 와 불러온 값 기준)"""
+    if update_fields is not None and not set(fields) & set(update_fields):
+        return False
+    loaded = getattr(instance, '_loaded_values', None)
+    if created or loaded is None:
+        return True
+    return any(loaded.get(field) != getattr(instance, field) for field in fields)
+
+
+@receiver(post_save, sender=Prompt)
+def index_saved_prompt(sender, instance, created=False, raw=False, using=None, update_fields=None, **kwargs):
+    """제목/내용이 바뀐 프롬프트를 검색 인덱스에 반영 (태그는 reindex_prompt_tags)"""
+    if raw or not _fields_changed(instance, ('title', 'content'), created, update_fields):
+        return
+    _index_on_commit(search.index_prompts, [instance.pk], using=using)
+
+
+@receiver(prompts_bulk_saved, sender=Prompt)
+def index_bulk_saved_prompts(sender, prompt_ids, using=None, **kwargs):
+    _index_on_commit(search.index_prompts, prompt_ids, using=using)
+
+
+@receiver(post_save, sender=Prompt)
+def update_prompt_signature(sender, instance, created=False, raw=False, using=None, update_fields=None, **kwargs):
+    """내용이 바뀐 프롬프트의 MinHash 서명/LSH 버킷 갱신 (삭제는 CASCADE)"""
+    if raw or not _fields_changed(instance, ('content',), created, update_fields):
+        return
+    similarity.index_prompts([instance.pk], using=using)
+
+
+@receiver(prompts_bulk_saved, sender=Prompt)
+def update_bulk_prompt_signatures(sender, prompt_ids, using=None, **kwargs):
+    similarity.index_prompts(prompt_ids, using=using)
+
+
+@receiver(post_save, sender=Prompt)
+def update_prompt_vector(sender, instance, created=False, raw=False, using=None, update_fields=None, **kwargs):
+    """제목/내용이 바뀌면 커밋 뒤 벡터 인덱스에 반영 (롤백된 변경은 파일에 남기지 않는다)"""
+    if raw or not _fields_changed(instance, ('title', 'content'), created, update_fields):
+        return
+    _index_on_commit(vector_index.index_prompts, [instance.pk], using=using)
+
+
+@receiver(prompts_bulk_saved, sender=Prompt)
+def update_bulk_prompt_vectors(sender, prompt_ids, using=None, **kwargs):
+    _index_on_commit(vector_index.index_prompts, prompt_ids, using=using)
+
+
+@receiver(post_delete, sender=Prompt)
+def remove_prompt_vector(sender, instance, using=None, **kwargs):
+    prompt_id = instance.pk
+    transaction.on_commit(lambda: vector_index.remove_prompts([prompt_id], using=using), using=using)
+
+
+@receiver(post_delete, sender=Prompt)
+def decrement_category_count(sender, instance, using=None, **kwargs):
+    """삭제된 프롬프트의 카테고리 프롬프트 수 감소 (삭제와 같은 트랜잭션)"""
+    category_id = getattr(instance, '_loaded_values', {}).get('category_id', instance.category_id)
+    Category.adjust_prompt_counts({category_id: -1}, using=using)
+
+
+@receiver(post_delete, sender=Prompt)
+def unindex_deleted_prompt(sender, instance, using=None, **kwargs):
+    search.remove_prompts([instance.pk], using=using)
+
+
+@receiver(m2m_changed, sender=TaggedItem)
+def reindex_prompt_tags(sender, instance, action, using=None, **kwargs):
+    """태그 추가/삭제 시 태그 텍스트 재색인"""
+    if not isinstance(instance, Prompt):
+        return
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        _index_on_commit(search.index_prompts, [instance.pk], using=using)
+        _index_on_commit(vector_index.index_prompts, [instance.pk], using=using)
+
+
+@receiver(post_save, sender=Tag)
+def reindex_renamed_tag(sender, instance, created=False, raw=False, using=None, **kwargs):
+    """태그 이름이 바뀌면 해당 태그가 달린 프롬프트 재색인"""
+    if created or raw:
+        return
+    prompt_ids = list(TaggedItem.objects.using(using).filter(
+        tag=instance,
+        content_type__app_label=Prompt._meta.app_label,
+        content_type__model=Prompt._meta.model_name,
+    ).values_list('object_id', flat=True))
+    _index_on_commit(search.index_prompts, prompt_ids, using=using)
+    _index_on_commit(vector_index.index_prompts, prompt_ids, using=using)
+
+
+@receiver(post_save, sender=Prompt)
+@receiver(post_delete, sender=Prompt)
+def invalidate_prompt_responses(sender, instance, created=False, using=None, **kwargs):
+    """프롬프트 저장/삭제 시 소유자 응답 캐시 무효화 (공개였거나 공개면 공개 응답도)"""
+    loaded = getattr(instance, '_loaded_values', None)
+    # 변경 전 값을 모르면 공개였을 수 있다고 본다
+    was_public = loaded.get('is_public', True) if loaded is not None else not created
+    response_cache.bump_versions(
+        response_cache.scopes_for([(instance.user_id, instance.is_public or was_public)]),
+        using=using,
+    )
+
+
+@receiver(prompts_bulk_saved, sender=Prompt)
+def invalidate_bulk_prompt_responses(sender, prompt_ids, using=None, **kwargs):
+    response_cache.invalidate_prompts(prompt_ids, using=using)
+
+
+@receiver(usage_counters_flushed, sender=Prompt)
+def invalidate_prompt_counters(sender, prompt_ids, using=None, **kwargs):
+    """사용 횟수 반영은 캐시된 응답의 use_count/last_used 만 고치게 한다"""
+    response_cache.invalidate_counters(prompt_ids, using=using)
+
+
+@receiver(m2m_changed, sender=TaggedItem)
+def invalidate_prompt_tag_responses(sender, instance, action, using=None, **kwargs):
+    if isinstance(instance, Prompt) and action in ('post_add', 'post_remove', 'post_clear'):
+        response_cache.bump_versions(
+            response_cache.scopes_for([(instance.user_id, instance.is_public)]),
+            using=using,
+        )
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(post_save, sender=Tag)
+@receiver(post_delete, sender=Tag)
+def invalidate_all_responses(sender, raw=False, using=None, **kwargs):
+    """카테고리/태그 이름은 모든 응답에 포함되므로 전체 무효화"""
+    if not raw:
+        response_cache.bump_versions([response_cache.GLOBAL], using=using)
+
+
+@receiver(post_save, sender=Prompt)
+@receiver(post_delete, sender=Prompt)
+def invalidate_prompt_autocomplete(sender, instance, signal, created=False, using=None, update_fields=None, **kwargs):
+    """제목/공개 여부/카테고리가 바뀐 프롬프트의 자동완성 인덱스 무효화 (사용 횟수만 바뀐 저장은 제외)"""
+    deleted = signal is post_delete
+    if not deleted and not _fields_changed(instance, ('title', 'is_public', 'category_id'), created, update_fields):
+        return
+    loaded = getattr(instance, '_loaded_values', None)
+    was_public = loaded.get('is_public', True) if loaded is not None else not created
+    scopes = response_cache.scopes_for([(instance.user_id, instance.is_public or was_public)])
+    # 카테고리 가중치(프롬프트 수)가 바뀐 경우
+    if deleted or _fields_changed(instance, ('category_id',), created, update_fields):
+        scopes.add(autocomplete.CATEGORIES)
+    autocomplete.bump_versions(scopes, using=using)
+
+
+@receiver(prompts_bulk_saved, sender=Prompt)
+def invalidate_bulk_prompt_autocomplete(sender, prompt_ids, using=None, **kwargs):
+    autocomplete.invalidate_prompts(prompt_ids, using=using)
+
+
+@receiver(m2m_changed, sender=TaggedItem)
+def invalidate_prompt_tag_autocomplete(sender, instance, action, using=None, **kwargs):
+    if isinstance(instance, Prompt) and action in ('post_add', 'post_remove', 'post_clear'):
+        autocomplete.bump_versions(
+            response_cache.scopes_for([(instance.user_id, instance.is_public)]),
+            using=using,
+        )
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(post_save, sender=Tag)
+@receiver(post_delete, sender=Tag)
+def invalidate_all_autocomplete(sender, raw=False, using=None, **kwargs):
+    """카테고리/태그 이름 변경은 모든 자동완성 인덱스에 영향"""
+    if not raw:
+        autocomplete.bump_versions([response_cache.GLOBAL], using=using)
+
+
+@receiver(usage_recorded)
+def update_frecency_scores(sender, usages, **kwargs):
+    """사용 이력이 기록되면 사용자별 frecency 갱신"""
+    frecency.apply_events((usage.user_id, usage.prompt_id, usage.used_at) for usage in usages)
+
+
+@receiver(post_migrate)
+def reset_search_backends(sender, **kwargs):
+    search.reset_backends()
@@ -0,0 +1,196 @@
+"""
+MinHash/LSH 유사 프롬프트 탐지
+
+내용을 정규화(소문자, 공백 하나로)한 뒤 글자 SHINGLE_SIZE-gram 집합의 MinHash 서명
+(NUM_PERM 개)을 PromptSignature 에 저장하고, 서명을 BANDS 개 구간으로 나눈 해시를
+PromptLSHBucket 에 둔다 (프롬프트 저장 시 갱신, rebuild_similarity_index 로 재구축).
+
+- 후보: 버킷이 하나라도 같은 프롬프트. 밴드 16 x 행 8 이면 자카드 유사도 0.7 부근부터
+  후보가 될 확률이 급격히 오른다 (0.8 이면 약 93%, 0.5 이면 약 6%)
+- 후보는 서명 일치 비율(자카드 유사도 추정치)이 threshold 이상인 것만 남긴다
+
+서명은 NumPy 로 여러 문서를 한 번에 계산한다.
+"""
+import numpy as np
+from django.db import connections, router, transaction
+
+SHINGLE_SIZE = 5
+NUM_PERM = 128
+BANDS = 16
+ROWS = NUM_PERM // BANDS
+
+# 해시 함수 NUM_PERM 개: multiply-shift ((a * h + b) mod 2**64) >> 32 - 나눗셈이 없어 mod 소수보다 빠르다
+_rng = np.random.default_rng(20240601)
+PERM_A = _rng.integers(0, 2 ** 63, NUM_PERM, dtype=np.uint64) | np.uint64(1)
+PERM_B = _rng.integers(0, 2 ** 63, NUM_PERM, dtype=np.uint64)
+_SHINGLE_POWERS = np.uint64(1000003) ** np.arange(SHINGLE_SIZE, dtype=np.uint64)
+_ROW_MULT = _rng.integers(1, 2 ** 63, ROWS, dtype=np.uint64) | np.uint64(1)
+_BAND_SALT = _rng.integers(0, 2 ** 63, BANDS, dtype=np.uint64)
+
+# 한 번에 (shingle 수 x NUM_PERM) 행렬을 만들 shingle 수 상한 (약 32MB)
+CHUNK_SHINGLES = 32768
+
+
+def normalize(text):
+    return ' '.join((text or '').lower().split())
+
+
+def shingle_hashes(text):
+    """정규화한 내용의 글자 shingle 32비트 해시 (중복 제거)"""
+    codes = np.frombuffer(normalize(text).encode('utf-32-le'), dtype='<u4').astype(np.uint64)
+    if len(codes) < SHINGLE_SIZE:
+        # 짧은 내용은 전체를 shingle 하나로
+        codes = np.concatenate([codes, np.zeros(SHINGLE_SIZE - len(codes), dtype=np.uint64)])
+    windows = np.lib.stride_tricks.sliding_window_view(codes, SHINGLE_SIZE)
+    hashes = (windows * _SHINGLE_POWERS).sum(axis=1, dtype=np.uint64)
+    return np.unique((hashes ^ (hashes >> np.uint64(32))) & np.uint64(0xFFFFFFFF))
+
+
+def compute_signatures(texts):
+    """내용 목록 -> (len(texts), NUM_PERM) uint32 MinHash 서명"""
+    shingles = [shingle_hashes(text) for text in texts]
+    signatures = np.empty((len(shingles), NUM_PERM), dtype=np.uint32)
+
+    start = 0
+    while start < len(shingles):
+        # shingle 수가 CHUNK_SHINGLES 를 넘지 않게 문서를 묶는다 (최소 1개)
+        end, size = start, 0
+        while end < len(shingles) and (end == start or size + len(shingles[end]) <= CHUNK_SHINGLES):
+            size += len(shingles[end])
+            end += 1
+        batch = shingles[start:end]
+        offsets = np.cumsum([0] + [len(hashes) for hashes in batch[:-1]])
+        values = np.concatenate(batch)[:, None] * PERM_A
+        values += PERM_B
+        values >>= np.uint64(32)
+        signatures[start:end] = np.minimum.reduceat(values, offsets, axis=0)
+        start = end
+    return signatures
+
+
+def band_buckets(signatures):
+    """서명 -> (n, BANDS) 밴드 해시 (BigIntegerField 에 들어가는 양수)"""
+    bands = signatures.astype(np.uint64).reshape(len(signatures), BANDS, ROWS)
+    hashes = (bands * _ROW_MULT).sum(axis=2, dtype=np.uint64) ^ _BAND_SALT
+    return (hashes >> np.uint64(1)).astype(np.int64)
+
+
+def to_bytes(signature):
+    return signature.astype('<u4').tobytes()
+
+
+def from_bytes(data):
+    return np.frombuffer(bytes(data), dtype='<u4')
+
+
+def index_prompts(prompt_ids, using=None):
+    """프롬프트 서명과 LSH 버킷 갱신 (없는 id 는 무시)"""
+    from .models import Prompt, PromptLSHBucket, PromptSignature
+
+    rows = list(Prompt.objects.using(using).filter(id__in=list(prompt_ids)).values_list('id', 'content'))
+    if not rows:
+        return
+    ids = [prompt_id for prompt_id, _ in rows]
+    signatures = compute_signatures([content for _, content in rows])
+    buckets = band_buckets(signatures)
+
+    with transaction.atomic(using=using):
+        PromptLSHBucket.objects.using(using).filter(prompt_id__in=ids).delete()
+        PromptSignature.objects.using(using).filter(prompt_id__in=ids).delete()
+        PromptSignature.objects.using(using).bulk_create([
+            PromptSignature(prompt_id=prompt_id, minhash=to_bytes(signature))
+            for prompt_id, signature in zip(ids, signatures)
+        ])
+        # 프롬프트당 BANDS 행 - 모델 인스턴스를 만들지 않고 executemany 로 넣는다
+        connection = connections[using or router.db_for_write(PromptLSHBucket)]
+        table = connection.ops.quote_name(PromptLSHBucket._meta.db_table)
+        with connection.cursor() as cursor:
+            cursor.executemany(
+                f'INSERT INTO {table} (prompt_id, bucket) VALUES (%s, %s)',
+                [(prompt_id, bucket) for prompt_id, row in zip(ids, buckets.tolist()) for bucket in row],
+            )
+
+
+def rebuild_index(using=None, batch_size=1000):
+    """전체 서명/버킷 재구축 - 색인한 프롬프트 수 반환"""
+    from .models import Prompt, PromptLSHBucket, PromptSignature
+
+    PromptLSHBucket.objects.using(using).all().delete()
+    PromptSignature.objects.using(using).all().delete()
+
+    total = 0
+    last_id = 0
+    while True:
+        ids = list(
+            Prompt.objects.using(using)
+            .filter(id__gt=last_id)
+            .order_by('id')
+            .values_list('id', flat=True)[:batch_size]
+        )
+        if not ids:
+            break
+        index_prompts(ids, using=using)
+        total += len(ids)
+        last_id = ids[-1]
+    return total
+
+
+def _candidates(buckets, queryset):
+    """밴드 해시 목록 -> {버킷: [queryset 안의 프롬프트 id]}"""
+    from .models import PromptLSHBucket
+
+    found = {}
+    buckets = list({int(bucket) for bucket in buckets})
+    # SQLite 변수 개수 제한에 걸리지 않게 나눠 조회
+    for start in range(0, len(buckets), 900):
+        pairs = PromptLSHBucket.objects.using(queryset.db).filter(
+            bucket__in=buckets[start:start + 900],
+            prompt__in=queryset.values('id'),
+        ).values_list('bucket', 'prompt_id')
+        for bucket, prompt_id in pairs:
+            found.setdefault(bucket, []).append(prompt_id)
+    return found
+
+
+def _signatures(prompt_ids, using=None):
+    from .models import PromptSignature
+
+    rows = PromptSignature.objects.using(using).filter(prompt_id__in=list(prompt_ids)).values_list('prompt_id', 'minhash')
+    return {prompt_id: from_bytes(minhash) for prompt_id, minhash in rows}
+
+
+def match_signatures(signatures, queryset, threshold, exclude=None):
+    """
+    서명마다 queryset 안의 유사 프롬프트 [(프롬프트 id, 유사도), ...] (유사도 내림차순)
+
+    exclude: 서명 순서대로 결과에서 뺄 프롬프트 id 집합 (None 가능)
+    """
+    buckets = band_buckets(signatures)
+    found = _candidates(buckets.ravel(), queryset)
+    candidate_sets = []
+    for i, row in enumerate(buckets):
+        candidates = {prompt_id for bucket in row for prompt_id in found.get(int(bucket), ())}
+        if exclude is not None:
+            candidates -= exclude[i]
+        candidate_sets.append(candidates)
+    stored = _signatures(set().union(*candidate_sets), using=queryset.db)
+
+    results = []
+    for signature, candidates in zip(signatures, candidate_sets):
+        ids = [prompt_id for prompt_id in candidates if prompt_id in stored]
+        if not ids:
+            results.append([])
+            continue
+        scores = (np.stack([stored[prompt_id] for prompt_id in ids]) == signature).mean(axis=1)
+        matches = [(prompt_id, float(score)) for prompt_id, score in zip(ids, scores) if score >= threshold]
+        results.append(sorted(matches, key=lambda match: (-match[1], -match[0])))
+    return results
+
+
+def similar_prompts(prompt, queryset, threshold, limit=20):
+    """prompt 와 내용이 거의 같은 queryset 안의 [(프롬프트 id, 유사도), ...]"""
+    signature = _signatures([prompt.pk], using=queryset.db).get(prompt.pk)
+    if signature is None:
+        # 아직 색인하지 않은 프롬프트 (rebuild_similarity_index 전)
+        signature = compute_signatures([prompt.content])[0]
+    return match_signatures(signature[None, :], queryset, threshold, exclude=[{prompt.pk}])[0][:limit]
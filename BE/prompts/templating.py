@@ -0,0 +1,85 @@
+"""
+{{변수}} 템플릿 컴파일러
+
+프롬프트 내용을 한 번만 파싱해 리터럴/변수 조각으로 나눠 두고,
+렌더링은 조각을 한 번에 join 하는 방식으로 처리한다.
+컴파일 결과는 (프롬프트 id, updated_at) 키로 캐시한다.
+"""
+import re
+import threading
+from collections import OrderedDict
+
+VARIABLE_PATTERN = re.compile(r'\{\{(\w+)\}\}')
+
+CACHE_SIZE = 512
+
+
+class CompiledTemplate:
+    """파싱된 템플릿 - 짝수 인덱스는 리터럴, 홀수 인덱스는 변수명"""
+    __slots__ = ('source', 'segments', 'variables')
+
+    def __init__(self, source):
+        self.source = source
+        # re.split 은 캡처 그룹을 포함해 [리터럴, 변수, 리터럴, ...] 형태로 반환
+        self.segments = tuple(VARIABLE_PATTERN.split(source))
+        # 등장 순서를 유지한 중복 제거
+        self.variables = tuple(dict.fromkeys(self.segments[1::2]))
+
+    def render(self, variable_values):
+        """
+        변수에 값을 대입해 최종 문자열 생성
+
+        값이 없는 변수는 {{변수}} 그대로 남긴다.
+        값은 정규식 치환 문자열이 아닌 일반 문자열로 취급한다.
+        """
+        parts = list(self.segments)
+        for i in range(1, len(parts), 2):
+            name = parts[i]
+            if name in variable_values:
+                parts[i] = variable_values[name]
+            else:
+                parts[i] = '{{' + name + '}}'
+        return ''.join(parts)
+
+
+class TemplateCache:
+    """크기 제한이 있는 LRU 캐시 (스레드 안전)"""
+
+    def __init__(self, maxsize=CACHE_SIZE):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, source):
+        with self._lock:
+            compiled = self._entries.get(key)
+            if compiled is not None and compiled.source == source:
+                self._entries.move_to_end(key)
+                return compiled
+
+        compiled = CompiledTemplate(source)
+        with self._lock:
+            self._entries[key] = compiled
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return compiled
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+template_cache = TemplateCache()
+
+
+def get_compiled_template(prompt):
+    """
+    프롬프트의 컴파일된 템플릿
+
+    저장된 프롬프트는 (id, updated_at) 키로 캐시한다. 저장 전에 내용만 바뀐
+    경우에도 잘못된 결과를 내지 않도록 캐시된 원문과 비교한다.
+    """
+    if prompt.pk is None:
+        return CompiledTemplate(prompt.content)
+    return template_cache.get((prompt.pk, prompt.updated_at), prompt.content)
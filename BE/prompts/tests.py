@@ -1,3 +1,1418 @@
-from django.test import TestCase
+import gzip
+import json
+import os
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta, timezone as dt_timezone
+from io import StringIO
+from itertools import count
+from unittest import mock
 
-# Create your tests here.
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import OperationalError
+from django.db.models import Count
+from django.core.management import call_command
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from django.utils.http import parse_http_date
+from rest_framework.test import APIClient
+
+from config import db_router
+from config.testing import QueryCountTestMixin, assert_constant_queries
+from . import autocomplete, frecency, response_cache, similarity, usage_archive, vector_index
+from .importer import PromptImporter
+from .models import Prompt, PromptFrecency, PromptUsage, PendingUsage, Category
+from .templating import CompiledTemplate, template_cache
+from .usage import UsageCounterBuffer, flush_usage_counters, record_usage, usage_counters
+from . import usage_queue as usage_queue_module
+from .usage_queue import DatabaseUsageQueue, MemoryUsageQueue, UsageEvent, flush_usage_queue
+from .views import PromptViewSet
+
+SYNC_USAGE_QUEUE = {
+    'BACKEND': 'prompts.usage_queue.SyncUsageQueue',
+    'BATCH_SIZE': 500,
+    'MAX_SIZE': 100,
+    'PUT_TIMEOUT': 0.1,
+    'FLUSH_INTERVAL': 1,
+}
+
+_sequence = count()
+
+
+def make_prompts(user, n, **fields):
+    """카테고리와 태그 2개가 달린 프롬프트 n 개 (행마다 다른 카테고리/태그)"""
+    prompts = []
+    for _ in range(n):
+        i = next(_sequence)
+        category = Category.objects.create(name=f'category {i}')
+        prompt = Prompt.objects.create(
+            user=user,
+            title=f'python prompt {i}',
+            content='Write {{language}} code for {{feature}}',
+            category=category,
+            is_template=True,
+            **fields,
+        )
+        prompt.tags.add(f'tag-{i}', 'python')
+        prompts.append(prompt)
+    return prompts
+
+
+class TemplateRenderTests(TestCase):
+    """컴파일된 템플릿 렌더링 - 값은 문자 그대로, 값이 없는 변수는 그대로 남긴다"""
+
+    def setUp(self):
+        template_cache.clear()
+        self.user = User.objects.create_user('owner', password='password')
+
+    @staticmethod
+    def reference(content, values):
+        # 변수마다 문자열 치환 (정규식 치환 문자열 해석 없음)
+        for name, value in values.items():
+            content = content.replace('{{' + name + '}}', value)
+        return content
+
+    def test_render_matches_plain_substitution(self):
+        content = 'Path {{path}} in {{language}}: {{path}} / {{missing}} {{ spaced }} {{language}}'
+        values = {'path': r'C:\new\table \1 \g<0>', 'language': '$1 {{missing}}', 'unused': 'x'}
+        prompt = Prompt.objects.create(user=self.user, title='paths', content=content, is_template=True)
+
+        expected = self.reference(content, values)
+        self.assertEqual(prompt.apply_variables(values), expected)
+        self.assertEqual(CompiledTemplate(content).render(values), expected)
+        # 캐시된 템플릿으로 다시 렌더링해도 같다
+        self.assertEqual(Prompt.objects.get(pk=prompt.pk).apply_variables(values), expected)
+        self.assertEqual(prompt.apply_variables({}), content)
+        self.assertEqual(prompt.variables, ['path', 'language', 'missing'])
+
+    def test_cache_follows_content(self):
+        prompt = Prompt.objects.create(user=self.user, title='greeting', content='Hello {{name}}', is_template=True)
+        self.assertEqual(prompt.apply_variables({'name': 'Ann'}), 'Hello Ann')
+        prompt.content = 'Bye {{name}}'
+        # 저장 전에 내용만 바뀐 경우에도 원문과 비교해 다시 컴파일한다
+        self.assertEqual(prompt.apply_variables({'name': 'Ann'}), 'Bye Ann')
+        prompt.save()
+        self.assertEqual(Prompt.objects.get(pk=prompt.pk).apply_variables({'name': 'Ann'}), 'Bye Ann')
+
+
+@override_settings(PROMPT_USAGE_QUEUE=SYNC_USAGE_QUEUE)
+class BatchApplyVariablesTests(TestCase):
+    """apply_variables/batch/ - 변수 세트 일괄 검증과 NDJSON 스트림"""
+
+    def setUp(self):
+        self.user = User.objects.create_user('owner', password='password')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.prompt = make_prompts(self.user, 1)[0]
+        self.path = f'/api/prompts/{self.prompt.pk}/apply_variables/batch/'
+        self.addCleanup(flush_usage_counters)
+
+    def results(self, response):
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        body = b''.join(response.streaming_content).decode('utf-8')
+        return [json.loads(line) for line in body.splitlines()]
+
+    def test_streams_results_in_order(self):
+        variable_sets = [{'language': lang, 'feature': 'csv'} for lang in ('Python', 'Go', '한국어')]
+        response = self.client.post(self.path, variable_sets, format='json')
+        self.assertEqual(self.results(response), [
+            {'index': i, 'result': f'Write {values["language"]} code for csv'}
+            for i, values in enumerate(variable_sets)
+        ])
+        self.assertEqual(PromptUsage.objects.filter(prompt=self.prompt).count(), 3)
+
+        body = '\n'.join(json.dumps(values) for values in variable_sets[:2]) + '\n'
+        response = self.client.post(self.path, body, content_type='application/x-ndjson')
+        self.assertEqual([line['index'] for line in self.results(response)], [0, 1])
+
+    def test_validation_errors_by_index(self):
+        response = self.client.post(self.path, {'variable_values': [
+            {'language': 'Python', 'feature': 'csv'},
+            {'language': 'Go'},
+            {'language': 1, 'feature': 'csv'},
+        ]}, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json(), {'variable_values': {
+            '1': ['Missing required variables: feature'],
+            '2': ['Variable values must be strings'],
+        }})
+        self.assertEqual(self.client.post(self.path, [], format='json').status_code, 400)
+        self.assertFalse(PromptUsage.objects.exists())
+
+        with override_settings(PROMPT_BATCH_RENDER_MAX=2):
+            response = self.client.post(self.path, [{'language': 'a', 'feature': 'b'}] * 3, format='json')
+        self.assertEqual(response.status_code, 400)
+
+    def test_ndjson_stream_stops_at_limit(self):
+        # 제한을 넘으면 뒤의 줄(깨진 JSON)까지 읽지 않고 개수 오류로 거절한다
+        body = json.dumps({'language': 'a', 'feature': 'b'}) + '\n'
+        with override_settings(PROMPT_BATCH_RENDER_MAX=2):
+            response = self.client.post(self.path, body * 3 + '{not json\n', content_type='application/x-ndjson')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json(), {'variable_values': ['Ensure this field has no more than 2 elements.']})
+        self.assertFalse(PromptUsage.objects.exists())
+
+
+class UsageCounterBufferTests(TestCase):
+    """use_count write-behind 버퍼 - 동시 기록, 반영 실패, 주기 반영"""
+
+    def setUp(self):
+        self.applied = {}
+        self.calls = 0
+        self.apply_lock = threading.Lock()
+        patcher = mock.patch('prompts.usage.apply_usage_counters', side_effect=self.apply)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def apply(self, pending):
+        with self.apply_lock:
+            self.calls += 1
+            if self.calls == 1:
+                raise RuntimeError('database is locked')
+            for prompt_id, (increment, _) in pending.items():
+                self.applied[prompt_id] = self.applied.get(prompt_id, 0) + increment
+
+    @override_settings(PROMPT_USAGE_FLUSH_THRESHOLD=3, PROMPT_USAGE_FLUSH_INTERVAL=60)
+    def test_concurrent_adds_lose_no_increments(self):
+        buffer = UsageCounterBuffer()
+
+        def worker():
+            for i in range(200):
+                buffer.add(i % 7)
+
+        with self.assertLogs('prompts.usage', 'ERROR'):
+            threads = [threading.Thread(target=worker) for _ in range(8)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        buffer.flush()
+
+        self.assertGreater(self.calls, 2)
+        self.assertEqual(buffer.pending, 0)
+        self.assertEqual(sum(self.applied.values()), 8 * 200)
+
+    @override_settings(PROMPT_USAGE_FLUSH_INTERVAL=0.05)
+    def test_idle_buffer_flushes_in_background(self):
+        self.calls = 1  # 실패 없이
+        buffer = UsageCounterBuffer()
+        buffer._last_flush = time.monotonic()
+        buffer.add(1, count=3)
+
+        deadline = time.monotonic() + 5
+        while buffer.pending and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(buffer.pending, 0)
+        self.assertEqual(self.applied, {1: 3})
+
+
+class UsageQueueTests(TestCase):
+    """사용 이벤트 큐 - DB 큐 적재/재전달, 메모리 큐 backpressure"""
+
+    def setUp(self):
+        self.user = User.objects.create_user('owner', password='password')
+        self.prompt = make_prompts(self.user, 1)[0]
+
+    def events(self, n):
+        return [UsageEvent(self.prompt.pk, self.user.pk, timezone.now(), {'n': i}) for i in range(n)]
+
+    def test_database_queue_is_default(self):
+        self.assertEqual(
+            settings.PROMPT_USAGE_QUEUE['BACKEND'].rsplit('.', 1)[1],
+            'MemoryUsageQueue' if settings.SQLITE_CONCURRENT_MODE else 'DatabaseUsageQueue',
+        )
+
+    @override_settings(PROMPT_USAGE_QUEUE={**SYNC_USAGE_QUEUE, 'BACKEND': 'prompts.usage_queue.DatabaseUsageQueue'})
+    def test_database_queue_drains_in_batches(self):
+        usage_queue = usage_queue_module.get_usage_queue()
+        usage_queue.put_many(self.events(5))
+        self.assertEqual(PendingUsage.objects.count(), 5)
+        self.assertEqual(PromptUsage.objects.count(), 0)
+
+        self.assertEqual(usage_queue.drain(max_events=2), 2)
+        self.assertEqual(PendingUsage.objects.count(), 3)
+        call_command('process_usage_events', '--once', stdout=StringIO())
+        self.assertEqual(PendingUsage.objects.count(), 0)
+        self.assertEqual(
+            sorted(PromptUsage.objects.values_list('variables_used__n', flat=True)), [0, 1, 2, 3, 4],
+        )
+
+    @override_settings(PROMPT_USAGE_QUEUE={**SYNC_USAGE_QUEUE, 'BACKEND': 'prompts.usage_queue.DatabaseUsageQueue'})
+    def test_database_queue_redelivers_after_failed_drain(self):
+        usage_queue = usage_queue_module.get_usage_queue()
+        usage_queue.put_many(self.events(3))
+        write = usage_queue_module.write_usage_events
+
+        def crash(events, **kwargs):
+            write(events, **kwargs)
+            raise RuntimeError('worker died')
+
+        with mock.patch('prompts.usage_queue.write_usage_events', side_effect=crash):
+            with self.assertRaises(RuntimeError):
+                usage_queue.drain()
+        # PromptUsage 기록과 대기 행 삭제가 함께 롤백되어 다음 drain 이 다시 처리한다
+        self.assertEqual(PromptUsage.objects.count(), 0)
+        self.assertEqual(PendingUsage.objects.count(), 3)
+
+        self.assertEqual(usage_queue.flush(), 3)
+        self.assertEqual(PromptUsage.objects.count(), 3)
+        self.assertEqual(PendingUsage.objects.count(), 0)
+
+    @mock.patch.object(MemoryUsageQueue, '_ensure_worker')
+    def test_memory_queue_backpressure_writes_overflow_synchronously(self, ensure_worker):
+        usage_queue = MemoryUsageQueue({**SYNC_USAGE_QUEUE, 'MAX_SIZE': 2, 'PUT_TIMEOUT': 0.01})
+        with self.assertLogs('prompts.usage_queue', 'WARNING'):
+            usage_queue.put_many(self.events(5))
+        # 큐에 들어간 2개는 워커를 기다리고, 넘친 3개는 요청 스레드에서 바로 기록
+        self.assertEqual(PromptUsage.objects.count(), 3)
+        self.assertEqual(usage_queue.flush(), 2)
+        self.assertEqual(PromptUsage.objects.count(), 5)
+
+    def test_memory_queue_worker_retries_failed_batch(self):
+        # 워커 스레드는 DB 대신 가짜 writer 로 - 첫 쓰기는 실패(database is locked)
+        written = []
+        failures = [OperationalError('database is locked')]
+
+        def write(events, **kwargs):
+            if failures:
+                raise failures.pop()
+            written.extend(event.variables_used['n'] for event in events)
+
+        usage_queue = MemoryUsageQueue({**SYNC_USAGE_QUEUE, 'BATCH_SIZE': 2, 'FLUSH_INTERVAL': 0.01})
+        with mock.patch('prompts.usage_queue.write_usage_events', side_effect=write), \
+                mock.patch('prompts.usage_queue.RETRY_DELAY', 0.01), \
+                self.assertLogs('prompts.usage_queue', 'ERROR'):
+            usage_queue.put_many(self.events(5))
+            deadline = time.monotonic() + 5
+            while len(written) < 5 and time.monotonic() < deadline:
+                time.sleep(0.01)
+        self.assertEqual(sorted(written), [0, 1, 2, 3, 4])
+
+    @mock.patch.object(MemoryUsageQueue, '_ensure_worker')
+    def test_memory_queue_drain_keeps_failed_events(self, ensure_worker):
+        usage_queue = MemoryUsageQueue(SYNC_USAGE_QUEUE)
+        usage_queue.put_many(self.events(3))
+        with mock.patch('prompts.usage_queue.write_usage_events', side_effect=OperationalError('database is locked')):
+            with self.assertRaises(OperationalError):
+                usage_queue.flush()
+        self.assertEqual(PromptUsage.objects.count(), 0)
+        self.assertEqual(usage_queue.flush(), 3)
+        self.assertEqual(PromptUsage.objects.count(), 3)
+
+
+class ExportTests(TestCase):
+    """스트리밍 export 가 기존 JsonResponse(indent=2) 와 같은 바이트를 내보내는지"""
+
+    def setUp(self):
+        self.user = User.objects.create_user('owner', password='password')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        prompts = make_prompts(self.user, 3)
+        plain = Prompt.objects.create(
+            user=self.user, title='한글 "따옴표" \\ 제목', content='줄바꿈\n탭\t이모지 🚀 </script>',
+            variables=['이름', {'nested': [1, 2.5, None, True]}], color_label='#ff0000', is_public=True,
+        )
+        plain.tags.add('한글', 'zeta', 'alpha')
+        User.objects.create_user('other').prompts.create(title='other', content='public', is_public=True)
+        base = timezone.now()
+        for offset, prompt in enumerate([*prompts, plain]):
+            Prompt.objects.filter(pk=prompt.pk).update(created_at=base - timedelta(minutes=offset))
+        self.now = base
+
+    def legacy_export(self):
+        """스트리밍 전 구현 - 목록 전체를 만들어 JsonResponse 로 직렬화"""
+        export_data = [{
+            'title': prompt.title,
+            'content': prompt.content,
+            'category': prompt.category.name if prompt.category else None,
+            'tags': list(prompt.tags.names()),
+            'is_template': prompt.is_template,
+            'variables': prompt.variables,
+            'color_label': prompt.color_label,
+            'is_favorite': prompt.is_favorite,
+            'is_public': prompt.is_public,
+        } for prompt in Prompt.objects.filter(user=self.user)]
+        return json.dumps({
+            'version': '1.0',
+            'exported_at': self.now.isoformat(),
+            'count': len(export_data),
+            'prompts': export_data,
+        }, cls=DjangoJSONEncoder, ensure_ascii=False, indent=2).encode('utf-8')
+
+    def export(self, query=''):
+        with mock.patch('prompts.views.timezone.now', return_value=self.now):
+            response = self.client.get(f'/api/prompts/export/{query}')
+        self.assertEqual(response.status_code, 200)
+        return b''.join(response.streaming_content)
+
+    def test_json_matches_legacy_bytes(self):
+        self.assertEqual(self.export(), self.legacy_export())
+
+    def test_empty_export_matches_legacy_bytes(self):
+        Prompt.objects.filter(user=self.user).delete()
+        self.assertEqual(self.export(), self.legacy_export())
+
+    def test_ndjson_and_gzip_carry_the_same_records(self):
+        records = json.loads(self.legacy_export())['prompts']
+        ndjson = self.export('?output=ndjson')
+        self.assertEqual([json.loads(line) for line in ndjson.splitlines()], records)
+        self.assertEqual(gzip.decompress(self.export('?output=ndjson&compress=gzip')), ndjson)
+        self.assertEqual(gzip.decompress(self.export('?compress=gzip')), self.legacy_export())
+
+
+class PromptImporterTests(TestCase):
+    """청크 일괄 import 가 행을 순서대로 처리하던 결과와 같은지 (청크 경계, 오류 행)"""
+
+    ROWS = [
+        {'title': 'A', 'content': 'a2', 'tags': ['new']},                     # 기존 제목
+        {'title': 'B', 'content': 'b1', 'category': 'import-1', 'tags': ['x']},
+        {'title': 'C', 'content': None},                                      # NOT NULL 위반 - 청크 실패
+        {'title': 'B', 'content': 'b2', 'category': 'import-2'},              # 앞 청크와 같은 제목
+        'not an object',
+        {'title': 'D', 'content': 'd1', 'tags': 'x'},                         # 검증 오류
+        {'title': 'D', 'content': 'd2'},
+        {'content': 'no title'},
+    ]
+
+    def run_import(self, chunk_size, overwrite):
+        user = User.objects.create_user(f'owner-{chunk_size}-{overwrite}')
+        existing = Prompt.objects.create(user=user, title='A', content='a1')
+        existing.tags.add('old')
+        importer = PromptImporter(user, overwrite=overwrite, chunk_size=chunk_size).run(self.ROWS)
+        state = {
+            prompt.title: (prompt.content, prompt.category and prompt.category.name, sorted(prompt.tags.names()))
+            for prompt in Prompt.objects.filter(user=user)
+        }
+        result = importer.result()
+        result['errors'] = [error['title'] for error in result['errors']]
+        return result, state
+
+    def test_skip_existing_titles(self):
+        for chunk_size in (1, 2, 3, 500):
+            with self.subTest(chunk_size=chunk_size):
+                result, state = self.run_import(chunk_size, overwrite=False)
+                self.assertEqual(result['imported'], 2)
+                self.assertEqual(result['skipped'], 2)
+                self.assertEqual(sorted(result['errors']), ['C', 'D', 'Unknown', 'Unknown'])
+                self.assertEqual(state, {
+                    'A': ('a1', None, ['old']),
+                    'B': ('b1', 'import-1', ['x']),
+                    'D': ('d2', None, []),
+                })
+
+    def test_overwrite_keeps_last_row(self):
+        for chunk_size in (1, 2, 3, 500):
+            with self.subTest(chunk_size=chunk_size):
+                result, state = self.run_import(chunk_size, overwrite=True)
+                self.assertEqual(result['imported'], 4)
+                self.assertEqual(result['skipped'], 0)
+                self.assertEqual(sorted(result['errors']), ['C', 'D', 'Unknown', 'Unknown'])
+                # tags 가 없는 행은 기존 태그를 유지한다
+                self.assertEqual(state, {
+                    'A': ('a2', None, ['new']),
+                    'B': ('b2', 'import-2', ['x']),
+                    'D': ('d2', None, []),
+                })
+        self.assertEqual(
+            dict(Category.objects.filter(name__startswith='import-').values_list('name', 'prompt_count')),
+            {'import-1': 0, 'import-2': 4},
+        )
+
+
+@override_settings(PROMPT_USAGE_QUEUE=SYNC_USAGE_QUEUE, PROMPT_RESPONSE_CACHE_TIMEOUT=0)
+class CursorPaginationTests(TestCase):
+    """커서로 여러 페이지를 넘겨도 행이 빠지거나 중복되지 않는지 (동점, NULL 포함)"""
+
+    ORDERINGS = ['created_at', 'updated_at', 'use_count', 'last_used']
+
+    def setUp(self):
+        self.user = User.objects.create_user('owner', password='password')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        with self.captureOnCommitCallbacks(execute=True):
+            prompts = make_prompts(self.user, 45, is_favorite=True)
+        base = timezone.now()
+        for i, prompt in enumerate(prompts):
+            # 동점이 많도록 값을 몇 개로만 나눈다. last_used 는 1/3 이 NULL
+            Prompt.objects.filter(pk=prompt.pk).update(
+                created_at=base - timedelta(minutes=i % 4),
+                updated_at=base - timedelta(minutes=i % 5),
+                use_count=i % 3,
+                last_used=None if i % 3 == 0 else base - timedelta(hours=i % 2),
+            )
+
+    def expected(self, ordering):
+        name = ordering.lstrip('-')
+        rows = Prompt.objects.filter(user=self.user).values_list(name, 'id')
+        # NULL 은 가장 작은 값, 동점은 id 로 같은 방향
+        ordered = sorted(rows, key=lambda row: (row[0] is not None, row[0] or 0, row[1]))
+        if ordering.startswith('-'):
+            ordered.reverse()
+        return [prompt_id for _, prompt_id in ordered]
+
+    def walk(self, path):
+        ids, pages = [], 0
+        while path:
+            body = self.client.get(path).json()
+            self.assertNotIn('count', body)
+            ids.extend(row['id'] for row in body['results'])
+            path = body['next']
+            pages += 1
+        return ids, pages
+
+    def test_walk_every_ordering(self):
+        for name in self.ORDERINGS:
+            for ordering in (f'-{name}', name):
+                for base in ('/api/prompts/', '/api/prompts/favorites/'):
+                    with self.subTest(path=base, ordering=ordering):
+                        ids, pages = self.walk(f'{base}?ordering={ordering}')
+                        self.assertEqual(pages, 3)
+                        self.assertEqual(ids, self.expected(ordering))
+
+    def test_walk_search_rank(self):
+        ids, pages = self.walk('/api/prompts/search/?q=python')
+        self.assertEqual(pages, 3)
+        self.assertEqual(len(ids), len(set(ids)))
+        self.assertEqual(set(ids), set(Prompt.objects.values_list('id', flat=True)))
+
+    def test_page_or_page_size_keeps_page_number_response(self):
+        for query in ('?page=1', '?page_size=1000', '?page=2&page_size=5'):
+            with self.subTest(query=query):
+                body = self.client.get(f'/api/prompts/{query}').json()
+                self.assertEqual(body['count'], 45)
+                self.assertIn('previous', body)
+
+
+class _Clock:
+    """응답 캐시가 읽는 시각 (time_ns 는 실제 값)"""
+
+    def __init__(self):
+        self.now = time.time()
+
+    def time(self):
+        return self.now
+
+    def time_ns(self):
+        return time.time_ns()
+
+
+@override_settings(PROMPT_USAGE_QUEUE=SYNC_USAGE_QUEUE, PROMPT_RESPONSE_CACHE_TIMEOUT=300)
+class ResponseCacheTests(TestCase):
+    """목록/상세 응답 캐시의 ETag/Last-Modified 와 변경 시 무효화"""
+
+    def setUp(self):
+        cache.clear()
+        self.clock = _Clock()
+        self.enterContext(mock.patch.object(response_cache, 'time', self.clock))
+        self.user = User.objects.create_user('owner', password='password')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.prompt, self.other = make_prompts(self.user, 2, is_public=True)
+        self.addCleanup(flush_usage_counters)
+        self.tick()
+
+    def tick(self):
+        self.clock.now += 2
+
+    def get(self, path, **headers):
+        return self.client.get(path, headers=headers)
+
+    def test_unchanged_list_and_detail_return_304(self):
+        for path in ('/api/prompts/', f'/api/prompts/{self.prompt.pk}/'):
+            with self.subTest(path=path):
+                response = self.get(path)
+                self.assertEqual(response.status_code, 200)
+                self.assertIn('Last-Modified', response)
+                self.tick()
+                self.assertEqual(self.get(path, if_none_match=response['ETag']).status_code, 304)
+                self.assertEqual(self.get(path, if_modified_since=response['Last-Modified']).status_code, 304)
+
+    def test_no_last_modified_within_the_change_second(self):
+        self.prompt.title = 'renamed'
+        self.prompt.save()
+        response = self.get('/api/prompts/')
+        self.assertNotIn('Last-Modified', response)
+        self.tick()
+        self.assertIn('Last-Modified', self.get('/api/prompts/'))
+
+    def lagging_replica(self, replicated_pk):
+        """replica1 - replicated_pk 이후 만든 프롬프트가 아직 복제되지 않은 replica"""
+        get_queryset = PromptViewSet.get_queryset
+
+        def stale_get_queryset(view):
+            queryset = get_queryset(view)
+            state = db_router._routing.get()
+            if state is not None and state.read_alias == 'replica1':
+                queryset = queryset.filter(pk__lte=replicated_pk)
+            return queryset
+
+        self.enterContext(mock.patch('config.db_router.replica_aliases', return_value=['replica1']))
+        self.enterContext(mock.patch.object(PromptViewSet, 'get_queryset', stale_get_queryset))
+
+    @override_settings(DB_REPLICA_STICKY_SECONDS=5)
+    def test_recent_change_is_not_cached_from_lagging_replica(self):
+        self.lagging_replica(self.other.pk)
+        reader = APIClient()
+        fresh = User.objects.create_user('writer').prompts.create(title='fresh', content='...', is_public=True)
+
+        # 방금 바뀐 스코프 - 복제가 늦어도 primary 에서 읽어 새 버전 키로 캐시한다
+        response = reader.get('/api/prompts/')
+        self.assertIn(fresh.pk, [item['id'] for item in response.json()['results']])
+        self.clock.now += 5
+        self.assertEqual(reader.get('/api/prompts/').json(), response.json())
+        # 창이 지나면 replica 에서 읽는다 (가짜 replica 는 아직 fresh 를 모른다)
+        self.assertEqual(reader.get(f'/api/prompts/{fresh.pk}/').status_code, 404)
+
+    def test_counter_flush_refreshes_cached_counters(self):
+        def use(prompt):
+            self.client.post(f'/api/prompts/{prompt.pk}/mark_used/')
+            flush_usage_counters()
+            self.tick()
+
+        path = '/api/prompts/'
+        before = self.get(path)
+        use(self.prompt)
+        # 응답을 다시 만들지 않고 use_count/last_used 만 한 번에 다시 읽는다
+        with self.assertNumQueries(1):
+            response = self.get(path)
+        self.assertNotEqual(response['ETag'], before['ETag'])
+        item = next(item for item in response.json()['results'] if item['id'] == self.prompt.pk)
+        self.assertEqual(item['use_count'], 1)
+        with override_settings(PROMPT_RESPONSE_CACHE_TIMEOUT=0):
+            self.assertEqual(response.json(), self.get(path).json())
+        with self.assertNumQueries(0):
+            self.assertEqual(self.get(path, if_none_match=response['ETag']).status_code, 304)
+
+        # 사용 횟수로 정렬한 목록은 순서가 바뀌므로 다시 만든다
+        ordered = '/api/prompts/?ordering=-use_count'
+        self.assertEqual(self.get(ordered).json()['results'][0]['id'], self.prompt.pk)
+        use(self.other)
+        use(self.other)
+        self.assertEqual(self.get(ordered).json()['results'][0]['id'], self.other.pk)
+
+    def test_changes_invalidate_etag_and_last_modified(self):
+        category = self.prompt.category
+        victims = make_prompts(self.user, 2, is_public=True)
+        names = count()
+        self.tick()
+
+        def save():
+            self.prompt.title = f'renamed {next(names)}'
+            self.prompt.save()
+
+        def tag():
+            self.prompt.tags.add(f'new-tag-{next(names)}')
+
+        def rename_category():
+            category.name = f'renamed category {next(names)}'
+            category.save()
+
+        def use():
+            self.client.post(f'/api/prompts/{self.prompt.pk}/mark_used/')
+            flush_usage_counters()
+
+        def delete():
+            victims.pop().delete()
+
+        detail = f'/api/prompts/{self.prompt.pk}/'
+        for change in (save, tag, rename_category, use, delete):
+            for path in ('/api/prompts/', detail):
+                with self.subTest(change=change.__name__, path=path):
+                    before = self.get(path)
+                    self.tick()
+                    change()
+                    self.tick()
+                    # 응답 행의 updated_at 이 그대로여도(태그, 사용 횟수, 삭제) Last-Modified 는 늘어난다
+                    self.assertEqual(self.get(path, if_modified_since=before['Last-Modified']).status_code, 200)
+                    response = self.get(path, if_none_match=before['ETag'])
+                    self.assertGreater(
+                        parse_http_date(response['Last-Modified']), parse_http_date(before['Last-Modified']),
+                    )
+                    if change is delete and path == detail:
+                        # 다른 프롬프트 삭제 - 상세 내용은 그대로
+                        self.assertEqual(response.status_code, 304)
+                    else:
+                        self.assertEqual(response.status_code, 200)
+                        self.assertNotEqual(response['ETag'], before['ETag'])
+
+
+@override_settings(PROMPT_USAGE_QUEUE=SYNC_USAGE_QUEUE, PROMPT_RESPONSE_CACHE_TIMEOUT=0)
+class CategoryPromptCountTests(TestCase):
+    """Category.prompt_count 가 생성/이동/삭제/import 후 실제 프롬프트 수와 같은지"""
+
+    def setUp(self):
+        self.user = User.objects.create_user('owner', password='password')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.coding = Category.objects.create(name='Coding')
+        self.writing = Category.objects.create(name='Writing')
+
+    def assertCountsMatch(self, expected):
+        counted = dict(Category.objects.annotate(n=Count('prompts')).values_list('name', 'n'))
+        stored = dict(Category.objects.values_list('name', 'prompt_count'))
+        self.assertEqual(stored, counted)
+        self.assertEqual({name: stored[name] for name in expected}, expected)
+
+    def create(self, title, category):
+        response = self.client.post('/api/prompts/', {
+            'title': title, 'content': 'Write some code for me', 'category': category.pk, 'tags': ['count'],
+        }, format='json')
+        self.assertEqual(response.status_code, 201, response.content)
+        return response.json()['id']
+
+    def test_create_move_delete(self):
+        first = self.create('first', self.coding)
+        self.create('second', self.coding)
+        self.assertCountsMatch({'Coding': 2, 'Writing': 0})
+
+        self.client.patch(f'/api/prompts/{first}/', {'category': self.writing.pk}, format='json')
+        self.assertCountsMatch({'Coding': 1, 'Writing': 1})
+
+        self.client.patch(f'/api/prompts/{first}/', {'title': 'first renamed'}, format='json')
+        self.assertCountsMatch({'Coding': 1, 'Writing': 1})
+
+        self.client.delete(f'/api/prompts/{first}/')
+        self.assertCountsMatch({'Coding': 1, 'Writing': 0})
+
+    def test_import_creates_and_moves(self):
+        self.create('existing', self.coding)
+        rows = [
+            {'title': 'existing', 'content': 'Moved by import', 'category': 'Writing'},
+            {'title': 'new', 'content': 'Created by import', 'category': 'Research'},
+            {'title': 'uncategorized', 'content': 'No category here'},
+        ]
+        self.client.post('/api/prompts/import_prompts/', {'prompts': rows, 'overwrite': True}, format='json')
+        self.assertCountsMatch({'Coding': 0, 'Writing': 1, 'Research': 1})
+
+    def test_drifted_count_does_not_go_negative(self):
+        prompt_id = self.create('first', self.coding)
+        Category.objects.filter(pk=self.coding.pk).update(prompt_count=0)
+        self.client.delete(f'/api/prompts/{prompt_id}/')
+        self.coding.refresh_from_db()
+        self.assertEqual(self.coding.prompt_count, 0)
+
+        self.create('second', self.writing)
+        Category.objects.filter(pk=self.writing.pk).update(prompt_count=5)
+        call_command('reconcile_category_counts', stdout=StringIO())
+        self.assertCountsMatch({'Coding': 0, 'Writing': 1})
+
+
+@override_settings(PROMPT_USAGE_QUEUE=SYNC_USAGE_QUEUE, PROMPT_RESPONSE_CACHE_TIMEOUT=0)
+class TagFilterTests(TestCase):
+    """?tags= 와 tags_match=all/any/contains"""
+
+    TAGS = {
+        'both': ['python', 'django'],
+        'python': ['python'],
+        'django_rest': ['django', 'rest'],
+        'ml': ['Machine Learning'],
+        'python_restful': ['python', 'restful'],
+        'untagged': [],
+    }
+
+    def setUp(self):
+        self.user = User.objects.create_user('owner', password='password')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.ids = {}
+        for title, tags in self.TAGS.items():
+            prompt = Prompt.objects.create(user=self.user, title=title, content='Tagged prompt content')
+            prompt.tags.add(*tags)
+            self.ids[prompt.pk] = title
+        # 다른 사용자의 비공개 프롬프트는 태그가 같아도 보이지 않는다
+        User.objects.create_user('other').prompts.create(title='hidden', content='Hidden content').tags.add('python')
+
+    def titles(self, query):
+        response = self.client.get(f'/api/prompts/?{query}')
+        self.assertEqual(response.status_code, 200)
+        return {self.ids[row['id']] for row in response.json()['results']}
+
+    def test_all(self):
+        self.assertEqual(self.titles('tags=python,django'), {'both'})
+        self.assertEqual(self.titles('tags=python,django&tags_match=all'), {'both'})
+        self.assertEqual(self.titles('tags=python, python'), {'both', 'python', 'python_restful'})
+        self.assertEqual(self.titles('tags=python,missing'), set())
+
+    def test_any(self):
+        self.assertEqual(
+            self.titles('tags=python,django&tags_match=any'), {'both', 'python', 'django_rest', 'python_restful'},
+        )
+        self.assertEqual(self.titles('tags=rest,missing&tags_match=any'), {'django_rest'})
+        self.assertEqual(self.titles('tags=missing&tags_match=any'), set())
+
+    def test_name_or_slug(self):
+        self.assertEqual(self.titles('tags=Machine Learning'), {'ml'})
+        self.assertEqual(self.titles('tags=machine-learning'), {'ml'})
+        self.assertEqual(self.titles('tags=machine-learning,rest&tags_match=any'), {'ml', 'django_rest'})
+
+    def test_contains(self):
+        self.assertEqual(self.titles('tags=PY&tags_match=contains'), {'both', 'python', 'python_restful'})
+        self.assertEqual(self.titles('tags=jan&tags_match=contains'), {'both', 'django_rest'})
+        # 검색어마다 일치하는 태그가 있어야 한다 (rest 는 rest, restful 모두 일치)
+        self.assertEqual(self.titles('tags=py,rest&tags_match=contains'), {'python_restful'})
+        self.assertEqual(self.titles('tags=rest&tags_match=contains'), {'django_rest', 'python_restful'})
+        self.assertEqual(self.titles('tags=learn,py&tags_match=contains'), set())
+
+    def test_empty_and_invalid(self):
+        self.assertEqual(self.titles('tags=,'), set(self.TAGS))
+        self.assertEqual(self.client.get('/api/prompts/?tags=python&tags_match=some').status_code, 400)
+
+
+@override_settings(PROMPT_USAGE_QUEUE=SYNC_USAGE_QUEUE, PROMPT_RESPONSE_CACHE_TIMEOUT=0)
+class FastSerializationTests(TestCase):
+    """values() 빠른 경로 + ORJSONRenderer 응답이 ModelSerializer + JSONRenderer 와 같은 바이트인지"""
+
+    PATHS = [
+        '/api/prompts/',
+        '/api/prompts/?page=1',
+        '/api/prompts/?ordering=-last_used',
+        '/api/prompts/?ordering=use_count&tags=python',
+        '/api/prompts/favorites/',
+        '/api/prompts/search/?q=python',
+        '/api/prompts/frecent/',
+    ]
+
+    def setUp(self):
+        self.user = User.objects.create_user('owner', password='password')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        with self.captureOnCommitCallbacks(execute=True):
+            prompts = make_prompts(self.user, 3, is_favorite=True)
+            odd = Prompt.objects.create(
+                user=self.user, title='줄 구분\u2028문단\u2029 "quote" </script> 🚀', content='python 한글 content',
+                variables=['x', {'nested': [1, 2.5, None]}], is_favorite=True,
+            )
+            odd.tags.add('zeta', 'alpha', '한글', 'python')
+            other = User.objects.create_user('other').prompts.create(
+                title='public python', content='Shared python prompt', is_public=True,
+            )
+        Prompt.objects.filter(pk=prompts[0].pk).update(
+            use_count=7, last_used=timezone.now().replace(microsecond=123456),
+        )
+        frecency.apply_events((self.user.pk, prompt.pk, timezone.now()) for prompt in [*prompts, odd, other])
+
+    def render(self, path):
+        response = self.client.get(path)
+        self.assertEqual(response.status_code, 200)
+        return response.content
+
+    def test_fast_path_matches_serializer_bytes(self):
+        from rest_framework.renderers import JSONRenderer
+
+        for path in self.PATHS:
+            with self.subTest(path=path):
+                fast = self.render(path)
+                with override_settings(PROMPT_FAST_SERIALIZATION=False), \
+                        mock.patch.object(PromptViewSet, 'renderer_classes', [JSONRenderer]):
+                    legacy = self.render(path)
+                self.assertEqual(fast, legacy)
+                self.assertTrue(json.loads(fast)['results'])
+
+    def test_anonymous_matches_serializer_bytes(self):
+        self.client = APIClient()
+        fast = self.render('/api/prompts/')
+        with override_settings(PROMPT_FAST_SERIALIZATION=False):
+            self.assertEqual(self.render('/api/prompts/'), fast)
+
+
+@override_settings(PROMPT_USAGE_QUEUE=SYNC_USAGE_QUEUE, PROMPT_RESPONSE_CACHE_TIMEOUT=0)
+class FullTextSearchTests(TestCase):
+    """search/ - 전문 검색 인덱스 (관련도 순, 공개/본인 프롬프트만)"""
+
+    def setUp(self):
+        self.user = User.objects.create_user('owner', password='password')
+        other = User.objects.create_user('other', password='password')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        # 검색 인덱스는 커밋 뒤에 반영된다
+        with self.captureOnCommitCallbacks(execute=True):
+            self.in_content = Prompt.objects.create(
+                user=self.user, title='deployment notes', content='Explain this kubernetes manifest line by line.',
+            )
+            self.in_title = Prompt.objects.create(
+                user=self.user, title='kubernetes helper', content='Answer questions about cluster setup.',
+            )
+            self.in_tags = Prompt.objects.create(user=other, title='ops prompt', content='Review the config.', is_public=True)
+            self.in_tags.tags.add('kubernetes')
+            self.private = Prompt.objects.create(user=other, title='kubernetes secret', content='kubernetes kubernetes')
+
+    def search(self, query, client=None):
+        response = (client or self.client).get('/api/prompts/search/', {'q': query})
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_ranking_and_visibility(self):
+        ids = [item['id'] for item in self.search('kubernetes')['results']]
+        # 제목 > 태그 > 내용, 다른 사용자의 비공개 프롬프트는 제외
+        self.assertEqual(ids, [self.in_title.pk, self.in_tags.pk, self.in_content.pk])
+        self.assertEqual([item['id'] for item in self.search('kubernetes', client=APIClient())['results']], [self.in_tags.pk])
+        self.assertEqual(self.search('')['results'], [])
+        self.assertIsNone(self.search('')['next'])
+
+    def test_index_follows_title_content_and_tags(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.in_content.content = 'Summarize the meeting.'
+            self.in_content.save()
+            self.in_tags.tags.clear()
+        self.assertEqual([item['id'] for item in self.search('kubernetes')['results']], [self.in_title.pk])
+
+    def test_create_with_tags_indexes_once(self):
+        # post_save 와 태그 set() 의 post_clear/post_add 가 모두 요청해도 커밋 뒤 한 번만 색인
+        with mock.patch('prompts.search.index_prompts') as index_prompts, \
+                mock.patch('prompts.vector_index.index_prompts') as index_vectors:
+            with self.captureOnCommitCallbacks(execute=True):
+                prompt = Prompt.objects.create(user=self.user, title='helm chart', content='Review this chart.')
+                prompt.tags.set(['kubernetes', 'helm'], clear=True)
+                prompt.tags.add('ops')
+        index_prompts.assert_called_once_with([prompt.pk], using='default')
+        index_vectors.assert_called_once_with([prompt.pk], using='default')
+
+    def test_non_text_save_skips_reindex(self):
+        with mock.patch('prompts.search.index_prompts') as index_prompts:
+            response = self.client.post(f'/api/prompts/{self.in_title.pk}/toggle_favorite/')
+        self.assertEqual(response.status_code, 200)
+        index_prompts.assert_not_called()
+
+
+# 응답 캐시가 켜져 있으면 반복 요청이 캐시에서 나가므로 끈다
+@override_settings(PROMPT_USAGE_QUEUE=SYNC_USAGE_QUEUE, PROMPT_RESPONSE_CACHE_TIMEOUT=0)
+class PromptQueryCountTests(QueryCountTestMixin, TestCase):
+    """목록형 엔드포인트 쿼리 수가 행 수와 무관한지 (N+1 방지)"""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user('owner', password='password')
+        self.other = User.objects.create_user('other', password='password')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def grow(self, n):
+        make_prompts(self.user, n, is_favorite=True)
+        make_prompts(self.other, n, is_public=True)
+
+    def test_list(self):
+        self.assertConstantQueries(lambda: self.client.get('/api/prompts/'), self.grow)
+
+    def test_list_page_number(self):
+        self.assertConstantQueries(lambda: self.client.get('/api/prompts/?page=1'), self.grow)
+
+    @override_settings(PROMPT_FAST_SERIALIZATION=False)
+    def test_list_model_serializer(self):
+        self.assertConstantQueries(lambda: self.client.get('/api/prompts/'), self.grow)
+
+    def test_list_tag_filter(self):
+        self.assertConstantQueries(
+            lambda: self.client.get('/api/prompts/?tags=python,missing&tags_match=any'), self.grow,
+        )
+
+    def test_favorites(self):
+        self.assertConstantQueries(lambda: self.client.get('/api/prompts/favorites/'), self.grow)
+
+    def test_search(self):
+        self.assertConstantQueries(lambda: self.client.get('/api/prompts/search/?q=python'), self.grow)
+
+    def test_frecent(self):
+        def grow(n):
+            frecency.apply_events((self.user.pk, prompt.pk, timezone.now()) for prompt in make_prompts(self.user, n))
+
+        self.assertConstantQueries(lambda: self.client.get('/api/prompts/frecent/'), grow)
+
+    def test_export(self):
+        self.assertConstantQueries(lambda: self.client.get('/api/prompts/export/'), self.grow)
+
+    def test_categories(self):
+        self.assertConstantQueries(lambda: self.client.get('/api/categories/'), self.grow)
+
+    def test_category_admin(self):
+        admin = User.objects.create_superuser('admin', password='password')
+        self.client.force_login(admin)
+        self.assertConstantQueries(lambda: self.client.get('/admin/prompts/category/'), self.grow)
+
+    def test_detects_n_plus_one(self):
+        def per_row_tags():
+            return [list(prompt.tags.names()) for prompt in Prompt.objects.all()]
+
+        with self.assertRaisesMessage(AssertionError, 'Query count grows with rows'):
+            assert_constant_queries(per_row_tags, self.grow)
+
+
+@override_settings(PROMPT_USAGE_QUEUE=SYNC_USAGE_QUEUE, PROMPT_RESPONSE_CACHE_TIMEOUT=0)
+class QueryTimingMiddlewareTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('owner', password='password')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    @override_settings(REQUEST_TIMING_HEADER=True)
+    def test_server_timing_header(self):
+        make_prompts(self.user, 1)
+        response = self.client.get('/api/prompts/')
+        self.assertRegex(response['Server-Timing'], r'^db;dur=[\d.]+;desc="\d+ queries", app;dur=[\d.]+$')
+
+    @override_settings(REQUEST_TIMING_HEADER=False)
+    def test_server_timing_header_disabled(self):
+        response = self.client.get('/api/prompts/')
+        self.assertFalse(response.has_header('Server-Timing'))
+
+    @override_settings(SLOW_REQUEST_MS=0, SLOW_REQUEST_QUERIES=1)
+    def test_slow_request_logged_with_view_name(self):
+        with self.assertLogs('config.middleware', 'WARNING') as logs:
+            self.client.get('/api/prompts/')
+        self.assertIn('prompt-list', logs.output[0])
+
+
+@override_settings(
+    PROMPT_USAGE_QUEUE=SYNC_USAGE_QUEUE, PROMPT_RESPONSE_CACHE_TIMEOUT=0, ASYNC_PARALLEL_QUERIES=False,
+)
+class AsyncPromptViewTests(TestCase):
+    """/api/async/ 조회 응답이 동기 엔드포인트와 같은지"""
+
+    def setUp(self):
+        self.user = User.objects.create_user('owner', password='password')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        make_prompts(self.user, 25)
+
+    def test_matches_sync_endpoints(self):
+        for path in ['prompts/', 'prompts/?tags=python&ordering=-use_count', 'prompts/search/?q=python']:
+            sync = self.client.get(f'/api/{path}')
+            response = self.client.get(f'/api/async/{path}')
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(
+                response.content.replace(b'/api/async/', b'/api/'), sync.content, path,
+            )
+
+    def test_permissions(self):
+        self.assertEqual(self.client.post('/api/async/prompts/').status_code, 405)
+        self.assertEqual(APIClient().get('/api/async/prompts/').status_code, 200)
+
+
+@override_settings(PROMPT_USAGE_QUEUE={
+    **SYNC_USAGE_QUEUE, 'BACKEND': 'prompts.usage_queue.MemoryUsageQueue', 'SINGLE_WRITER': True,
+})
+class SingleWriterUsageQueueTests(TestCase):
+    """단일 writer 큐가 사용 이력과 use_count/last_used 를 함께 기록하는지"""
+
+    def setUp(self):
+        self.user = User.objects.create_user('owner', password='password')
+        self.prompt = make_prompts(self.user, 1)[0]
+
+    # 워커 스레드 대신 flush_usage_queue() 로 이 테스트 트랜잭션에서 기록
+    @mock.patch.object(MemoryUsageQueue, '_ensure_worker')
+    def test_writer_applies_counters(self, ensure_worker):
+        record_usage(self.prompt, self.user)
+        record_usage(self.prompt, self.user, variables_used={'language': 'Python'})
+        self.assertEqual(usage_counters.pending, 0)
+        self.assertEqual(PromptUsage.objects.count(), 0)
+
+        flush_usage_queue()
+        self.prompt.refresh_from_db()
+        self.assertEqual(PromptUsage.objects.filter(prompt=self.prompt).count(), 2)
+        self.assertEqual(self.prompt.use_count, 2)
+        self.assertEqual(self.prompt.last_used, PromptUsage.objects.latest('used_at').used_at)
+
+    @mock.patch.object(MemoryUsageQueue, '_ensure_worker')
+    def test_full_queue_waits_bounded_time(self, ensure_worker):
+        # 워커가 멈춰 큐가 비지 않아도 요청 스레드가 무한히 막히지 않는다
+        usage_queue = MemoryUsageQueue({
+            **SYNC_USAGE_QUEUE, 'MAX_SIZE': 1, 'SINGLE_WRITER': True, 'SINGLE_WRITER_TIMEOUT': 0.05,
+        })
+        events = [UsageEvent(self.prompt.pk, self.user.pk, timezone.now(), None) for _ in range(3)]
+        started = time.monotonic()
+        with self.assertLogs('prompts.usage_queue', 'WARNING'):
+            usage_queue.put_many(events)
+        self.assertLess(time.monotonic() - started, 5)
+
+        self.prompt.refresh_from_db()
+        self.assertEqual(PromptUsage.objects.count(), 2)
+        self.assertEqual(self.prompt.use_count, 2)
+        usage_queue.flush()
+        self.prompt.refresh_from_db()
+        self.assertEqual(self.prompt.use_count, 3)
+
+    @mock.patch.object(MemoryUsageQueue, '_ensure_worker')
+    def test_locked_write_is_retried_once(self, ensure_worker):
+        # SQLite 동시성 모드에서 흔한 database is locked - 배치를 버리지 않고, 다시 쓸 때 횟수도 한 번만 더한다
+        write = usage_queue_module.write_usage_events
+        failures = [OperationalError('database is locked')]
+
+        def locked(events, **kwargs):
+            if failures:
+                raise failures.pop()
+            return write(events, **kwargs)
+
+        record_usage(self.prompt, self.user)
+        record_usage(self.prompt, self.user)
+        with mock.patch('prompts.usage_queue.write_usage_events', side_effect=locked):
+            with self.assertRaises(OperationalError):
+                flush_usage_queue()
+            self.assertEqual(flush_usage_queue(), 2)
+        self.prompt.refresh_from_db()
+        self.assertEqual(PromptUsage.objects.filter(prompt=self.prompt).count(), 2)
+        self.assertEqual(self.prompt.use_count, 2)
+
+
+CSV_PROMPT = 'Write a Python function that parses a CSV file and returns a list of dictionaries keyed by the header row.'
+CSV_PROMPT_REWORDED = 'Write a python function that parses a CSV file and returns a list of dicts keyed by the header row.'
+TRANSLATE_PROMPT = 'Translate the following English paragraph into Korean, keeping a formal and polite tone.'
+
+
+@override_settings(PROMPT_USAGE_QUEUE=SYNC_USAGE_QUEUE, PROMPT_SIMILARITY_THRESHOLD=0.8)
+class SimilarPromptTests(TestCase):
+    """MinHash/LSH 유사 프롬프트 탐지 (similar/, import skip_near_duplicates)"""
+
+    def setUp(self):
+        self.user = User.objects.create_user('owner', password='password')
+        self.other = User.objects.create_user('other', password='password')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.original = Prompt.objects.create(user=self.user, title='csv parser', content=CSV_PROMPT)
+        self.copy = Prompt.objects.create(user=self.user, title='csv parser 2', content=CSV_PROMPT_REWORDED)
+        self.unrelated = Prompt.objects.create(user=self.user, title='translate', content=TRANSLATE_PROMPT)
+        # 다른 사용자의 비공개 프롬프트는 보이지 않는다
+        Prompt.objects.create(user=self.other, title='private copy', content=CSV_PROMPT)
+
+    def similar(self, prompt, **params):
+        return self.client.get(f'/api/prompts/{prompt.pk}/similar/', params)
+
+    def test_similar_prompts(self):
+        response = self.similar(self.original)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([item['id'] for item in response.json()], [self.copy.pk])
+        self.assertGreaterEqual(response.json()[0]['similarity'], 0.8)
+        self.assertEqual(self.similar(self.unrelated).json(), [])
+        self.assertEqual(self.similar(self.original, threshold='2').status_code, 400)
+
+    def test_signature_follows_content(self):
+        self.copy.content = TRANSLATE_PROMPT + ' Keep it short.'
+        self.copy.save()
+        self.assertEqual(self.similar(self.original).json(), [])
+        self.assertEqual([item['id'] for item in self.similar(self.unrelated).json()], [self.copy.pk])
+
+    def test_batched_signatures_match_single(self):
+        texts = [CSV_PROMPT, TRANSLATE_PROMPT, 'short', '']
+        with mock.patch.object(similarity, 'CHUNK_SHINGLES', 50):
+            batched = similarity.compute_signatures(texts)
+        for text, signature in zip(texts, batched):
+            self.assertTrue((similarity.compute_signatures([text])[0] == signature).all())
+
+    def test_import_skips_near_duplicates(self):
+        rows = [
+            {'title': 'csv again', 'content': CSV_PROMPT + ' '},
+            {'title': 'email', 'content': 'Draft a short email to a customer apologising for the delayed shipment.'},
+            {'title': 'email 2', 'content': 'Draft a short email to a customer apologizing for the delayed shipment.'},
+            {'title': 'sql', 'content': 'Explain what this SQL query does and suggest an index that would speed it up.'},
+        ]
+        response = self.client.post(
+            '/api/prompts/import_prompts/', {'prompts': rows, 'skip_near_duplicates': True}, format='json',
+        )
+        result = response.json()
+        self.assertEqual((result['imported'], result['skipped']), (2, 2))
+        self.assertEqual(result['near_duplicates'], [
+            {'title': 'csv again', 'similar_to': 'csv parser', 'similar_to_id': self.original.pk},
+            {'title': 'email 2', 'similar_to': 'email', 'similar_to_id': None},
+        ])
+
+        response = self.client.post('/api/prompts/import_prompts/', {'prompts': rows}, format='json')
+        self.assertNotIn('near_duplicates', response.json())
+
+
+@override_settings(PROMPT_USAGE_QUEUE=SYNC_USAGE_QUEUE)
+class VectorSearchTests(TestCase):
+    """search/?mode=semantic - 메모리 맵 벡터 인덱스"""
+
+    def setUp(self):
+        self.user = User.objects.create_user('owner', password='password')
+        other = User.objects.create_user('other', password='password')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.review = Prompt.objects.create(
+                user=self.user, title='code review', content='Review this pull request for bugs, naming and style issues.',
+            )
+            self.review.tags.add('review')
+            self.translate = Prompt.objects.create(
+                user=self.user, title='번역하기', content='다음 문장을 자연스러운 영어로 번역해 주세요.',
+            )
+            self.private = Prompt.objects.create(
+                user=other, title='code review checklist', content='Checklist for reviewing code in a pull request.',
+            )
+
+    def search(self, query, client=None):
+        response = (client or self.client).get('/api/prompts/search/', {'q': query, 'mode': 'semantic'})
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_semantic_search(self):
+        results = self.search('reviewing pull requests')
+        self.assertEqual(results[0]['id'], self.review.pk)
+        self.assertNotIn(self.private.pk, [item['id'] for item in results])
+        # 해시 충돌로 무관한 프롬프트도 낮은 점수로 나올 수 있다
+        self.assertTrue(all(item['score'] < results[0]['score'] / 2 for item in results[1:]))
+        # 조사가 붙은 한국어도 글자 n-gram 으로 찾는다
+        self.assertEqual(self.search('번역')[0]['id'], self.translate.pk)
+        self.assertEqual(self.search('pull request', client=APIClient()), [])
+
+    def test_incremental_update_and_delete(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.translate.content = 'Review the SQL migration in this pull request.'
+            self.translate.save()
+        self.assertEqual({item['id'] for item in self.search('pull request review')[:2]}, {self.review.pk, self.translate.pk})
+
+        prompt_id = self.review.pk
+        with self.captureOnCommitCallbacks(execute=True):
+            self.review.delete()
+        self.assertFalse(vector_index.get_vector_index().matrix()[prompt_id].any())
+
+    def test_replica_queryset_uses_primary_index(self):
+        # 읽기 복제본 queryset 이어도 쓰기 DB 의 인덱스 파일에서 찾는다
+        queryset = Prompt.objects.filter(user=self.user)
+        replica = mock.Mock(db='replica1', order_by=queryset.order_by)
+        with mock.patch('prompts.vector_index._index_path', wraps=vector_index._index_path) as index_path:
+            results = vector_index.search_prompts(replica, 'reviewing pull requests')
+        self.assertEqual(results[0][0], self.review.pk)
+        self.assertNotIn(mock.call('replica1'), index_path.call_args_list)
+
+    def test_unrelated_save_skips_vector_update(self):
+        with mock.patch('prompts.vector_index.index_prompts') as index_prompts:
+            with self.captureOnCommitCallbacks(execute=True):
+                response = self.client.post(f'/api/prompts/{self.review.pk}/toggle_favorite/')
+                self.assertEqual(response.status_code, 200)
+                self.review.refresh_from_db()
+                self.review.save()
+            index_prompts.assert_not_called()
+
+            with self.captureOnCommitCallbacks(execute=True):
+                self.review.title = 'code review guide'
+                self.review.save()
+            index_prompts.assert_called_once_with([self.review.pk], using='default')
+
+    def test_rebuild(self):
+        self.assertEqual(vector_index.rebuild_index(), 3)
+        self.assertEqual(self.search('reviewing pull requests')[0]['id'], self.review.pk)
+
+
+class AutocompleteTests(TestCase):
+    """autocomplete/ - 메모리 prefix 인덱스"""
+
+    def setUp(self):
+        cache.clear()
+        autocomplete.index_cache.clear()
+        self.user = User.objects.create_user('owner', password='password')
+        other = User.objects.create_user('other', password='password')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        Category.objects.create(name='Coding')
+        review = Prompt.objects.create(user=self.user, title='Code Review', content='...', use_count=3)
+        review.tags.add('code-quality')
+        Prompt.objects.create(user=self.user, title='Unit test writer', content='...', use_count=5, is_public=True)
+        Prompt.objects.create(user=other, title='code golf', content='...', is_public=True)
+        Prompt.objects.create(user=other, title='codex secret', content='...')
+
+    def complete(self, query, client=None, **params):
+        response = (client or self.client).get('/api/prompts/autocomplete/', {'q': query, **params})
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_prefix_matches(self):
+        self.assertEqual(self.complete('CO'), {
+            'titles': ['Code Review', 'code golf'],
+            'tags': ['code-quality'],
+            'categories': ['Coding'],
+        })
+        # 중간 단어와 여러 단어 prefix
+        self.assertEqual(self.complete('test')['titles'], ['Unit test writer'])
+        self.assertEqual(self.complete('unit  te')['titles'], ['Unit test writer'])
+        # 익명은 공개 프롬프트만
+        self.assertEqual(self.complete('co', client=APIClient())['titles'], ['code golf'])
+        self.assertEqual(self.complete('co', limit=1)['titles'], ['Code Review'])
+        self.assertEqual(self.complete('')['titles'], [])
+        self.assertEqual(self.client.get('/api/prompts/autocomplete/', {'q': 'co', 'limit': 'x'}).status_code, 400)
+
+    def test_hot_path_does_not_query(self):
+        self.complete('co')
+        with self.assertNumQueries(0):
+            self.complete('cod')
+            self.complete('unit')
+
+    def test_index_follows_changes(self):
+        self.complete('co')
+        prompt = Prompt.objects.create(user=self.user, title='Commit message', content='...', use_count=10)
+        self.assertEqual(self.complete('co')['titles'][0], 'Commit message')
+
+        prompt.tags.add('git')
+        self.assertEqual(self.complete('gi')['tags'], ['git'])
+        Category.objects.filter(name='Coding').delete()
+        self.assertEqual(self.complete('co')['categories'], [])
+
+        prompt.delete()
+        self.assertNotIn('Commit message', self.complete('co')['titles'])
+
+    def test_counter_flush_keeps_index(self):
+        self.complete('co')
+        golf = Prompt.objects.get(title='code golf')
+        with mock.patch('prompts.autocomplete.build_indexes', wraps=autocomplete.build_indexes) as build:
+            # 사용 횟수 반영과 즐겨찾기는 자동완성 항목을 바꾸지 않는다
+            with self.captureOnCommitCallbacks(execute=True):
+                usage_queue_module.apply_usage_counters({golf.pk: (5, timezone.now())})
+                self.client.post(f'/api/prompts/{golf.pk}/toggle_favorite/')
+            self.complete('co')
+            build.assert_not_called()
+
+            golf.title = 'code kata'
+            golf.save()
+            self.assertIn('code kata', self.complete('co')['titles'])
+            # 다른 사용자의 공개 프롬프트 - 공개 인덱스만 다시 만든다
+            self.assertEqual([call.args[0] for call in build.call_args_list], [response_cache.PUBLIC])
+
+
+@override_settings(PROMPT_USAGE_QUEUE=SYNC_USAGE_QUEUE, PROMPT_RESPONSE_CACHE_TIMEOUT=0)
+class FrecencyTests(TestCase):
+    """frecent/ 와 ordering=-frecency - 사용자별 빈도 + 최근성 점수"""
+
+    def setUp(self):
+        self.user = User.objects.create_user('owner', password='password')
+        self.other = User.objects.create_user('other', password='password')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.old_favourite, self.recent, self.unused = (
+            Prompt.objects.create(user=self.user, title=title, content='Write {{language}} code')
+            for title in ('old favourite', 'recent', 'unused')
+        )
+        self.public = Prompt.objects.create(user=self.other, title='public', content='Summarize {{text}}', is_public=True)
+
+    def use(self, prompt, user, days_ago, times=1):
+        used_at = timezone.now() - timedelta(days=days_ago)
+        frecency.apply_events([(user.pk, prompt.pk, used_at)] * times)
+
+    def ids(self, path):
+        return self.ids_for(self.client, path)
+
+    def ids_for(self, client, path):
+        response = client.get(path)
+        self.assertEqual(response.status_code, 200)
+        return [item['id'] for item in response.json()['results']]
+
+    def test_frecency_balances_frequency_and_recency(self):
+        # 반감기 14일: 70일 전 20회 (약 0.6) < 어제 1회 (약 0.95) < 오늘 3회 < 70일 전 120회 (약 3.75)
+        self.use(self.old_favourite, self.user, days_ago=70, times=20)
+        self.use(self.recent, self.user, days_ago=0, times=3)
+        self.use(self.public, self.user, days_ago=1)
+        # 다른 사용자의 사용은 영향 없음
+        self.use(self.unused, self.other, days_ago=0, times=100)
+        self.assertEqual(self.ids('/api/prompts/frecent/'), [self.recent.pk, self.public.pk, self.old_favourite.pk])
+        self.assertEqual(self.ids('/api/prompts/frecent/?ordering=frecency'), self.ids('/api/prompts/frecent/'))
+
+        self.use(self.old_favourite, self.user, days_ago=70, times=100)
+        self.assertEqual(self.ids('/api/prompts/frecent/')[0], self.old_favourite.pk)
+
+    def test_ordering_and_cursor(self):
+        self.use(self.recent, self.user, days_ago=0)
+        self.use(self.old_favourite, self.user, days_ago=30)
+        # 쓴 적 없는 프롬프트는 뒤에 (id 내림차순)
+        self.assertEqual(
+            self.ids('/api/prompts/?ordering=-frecency'),
+            [self.recent.pk, self.old_favourite.pk, self.public.pk, self.unused.pk],
+        )
+
+        with mock.patch('prompts.pagination.PromptCursorPagination.page_size', 1):
+            ids, path = [], '/api/prompts/?ordering=-frecency'
+            while path:
+                page = self.client.get(path).json()
+                ids += [item['id'] for item in page['results']]
+                path = page['next']
+        self.assertEqual(ids, self.ids('/api/prompts/?ordering=-frecency'))
+
+        # 익명 사용자는 점수가 없으므로 id 순
+        self.assertEqual(self.ids_for(APIClient(), '/api/prompts/?ordering=-frecency'), [self.public.pk])
+
+    def test_mark_used_updates_score_and_rebuild_matches(self):
+        self.client.post(f'/api/prompts/{self.recent.pk}/mark_used/')
+        self.client.post(f'/api/prompts/{self.recent.pk}/mark_used/')
+        flush_usage_counters()
+        row = PromptFrecency.objects.get(user=self.user, prompt=self.recent)
+        self.assertEqual(row.use_count, 2)
+
+        self.assertEqual(frecency.rebuild_scores(), 1)
+        rebuilt = PromptFrecency.objects.get(user=self.user, prompt=self.recent)
+        self.assertEqual(rebuilt.use_count, 2)
+        self.assertAlmostEqual(rebuilt.score, row.score)
+
+
+class UsageArchiveTests(TestCase):
+    """archive_usage - 보관 기간이 지난 사용 이력의 월별 아카이브와 다시 읽기"""
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.enterContext(override_settings(PROMPT_USAGE_ARCHIVE_DIR=directory.name))
+        self.archive = usage_archive.get_archive()
+
+        self.user = User.objects.create_user('owner', password='password')
+        self.prompt = Prompt.objects.create(user=self.user, title='archived', content='Write {{language}} code')
+        now = timezone.now()
+        times = [
+            datetime(2025, 1, 31, 23, 30, tzinfo=dt_timezone.utc),
+            datetime(2025, 2, 1, 0, 30, tzinfo=dt_timezone.utc),
+            datetime(2025, 2, 14, tzinfo=dt_timezone.utc),
+            now - timedelta(days=1),
+        ]
+        PromptUsage.objects.bulk_create([
+            PromptUsage(prompt=self.prompt, user=self.user, used_at=used_at, variables_used={'language': f'v{i}'})
+            for i, used_at in enumerate(times)
+        ])
+
+    def usages(self):
+        return sorted(usage_archive.iter_usages(('id', 'used_at', 'variables_used')))
+
+    def test_archive_moves_old_rows_by_month(self):
+        before = self.usages()
+        call_command('archive_usage', days=30, batch_size=2, stdout=StringIO())
+
+        self.assertEqual(PromptUsage.objects.count(), 1)
+        self.assertEqual(sorted(self.archive.manifest()['months']), ['2025-01', '2025-02'])
+        self.assertTrue(os.path.exists(self.archive.path('2025-02')))
+        self.assertEqual(self.usages(), before)
+        # 기간으로 읽기
+        since = datetime(2025, 2, 1, tzinfo=dt_timezone.utc)
+        self.assertEqual(len(list(usage_archive.iter_usages(('id',), since=since))), 3)
+
+    def test_rebuilds_include_archived_rows(self):
+        from analytics.models import UserUsageSummary
+        from analytics.rollups import rebuild_rollups
+
+        frecency.rebuild_scores()
+        score = PromptFrecency.objects.get().score
+        call_command('archive_usage', days=30, stdout=StringIO())
+
+        frecency.rebuild_scores()
+        self.assertAlmostEqual(PromptFrecency.objects.get().score, score)
+        rebuild_rollups()
+        self.assertEqual(UserUsageSummary.objects.get(user=self.user).total_uses, 4)
+
+    def test_interrupted_runs(self):
+        call_command('archive_usage', days=30, stdout=StringIO())
+        path = self.archive.path('2025-02')
+        size = os.path.getsize(path)
+        # 쓰다가 중단된 배치의 잔여물은 다음 실행이 잘라낸다
+        with open(path, 'ab') as fp:
+            fp.write(b'\x1f\x8b partial')
+        # manifest 갱신 후 삭제 전에 중단되어 다시 옮긴 행은 한 번만 읽는다
+        usage = PromptUsage.objects.create(
+            prompt=self.prompt, user=self.user, used_at=datetime(2025, 2, 20, tzinfo=dt_timezone.utc),
+        )
+        with mock.patch('prompts.usage_archive.transaction.atomic', side_effect=RuntimeError):
+            with self.assertRaises(RuntimeError):
+                call_command('archive_usage', days=30, stdout=StringIO())
+        self.assertGreater(os.path.getsize(path), size)
+        call_command('archive_usage', days=30, stdout=StringIO())
+
+        self.assertEqual(self.archive.manifest()['months']['2025-02']['rows'], 4)
+        ids = [row[0] for row in usage_archive.iter_usages(('id',))]
+        self.assertEqual(len(ids), 5)
+        self.assertIn(usage.pk, ids)
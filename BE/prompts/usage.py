@@ -0,0 +1,147 @@
+"""
+프롬프트 사용 기록
+
+사용 이력(PromptUsage)은 usage_queue 를 거쳐 일괄 적재하고, 인기 프롬프트에서 경합이 심한
+use_count / last_used 는 프로세스 메모리에 모아 두었다가 주기적으로
+F() 기반 UPDATE 로 한 번에 반영한다 (write-behind).
+
+- 증가분만 더하므로 여러 프로세스가 동시에 반영해도 누락이 없다.
+- 요청이 없어도 데몬 스레드가 PROMPT_USAGE_FLUSH_INTERVAL 초마다 반영하므로
+  API 의 use_count 는 최대 그만큼 늦을 수 있다.
+- 반영에 실패하면 요청으로 예외를 올리지 않고 로그만 남기며, 증가분은 다음 반영 때 다시 시도한다.
+- 테스트/종료 시에는 flush_usage_counters() 로 즉시 반영한다.
+- 단일 writer 큐(SINGLE_WRITER)를 쓰면 버퍼 대신 큐 워커가 사용 이력과 함께 반영한다.
+"""
+import atexit
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.utils import timezone
+
+from .usage_queue import UsageEvent, apply_usage_counters, get_usage_queue
+
+logger = logging.getLogger(__name__)
+
+
+class UsageCounterBuffer:
+    """프롬프트별 사용 횟수 증가분과 마지막 사용 시각을 모아 두는 버퍼"""
+
+    def __init__(self):
+        self._pending = {}  # prompt_id -> [증가분, 마지막 사용 시각]
+        self._lock = threading.Lock()
+        self._last_flush = time.monotonic()
+        self._flusher = None
+        self._flusher_lock = threading.Lock()
+
+    @property
+    def flush_interval(self):
+        return settings.PROMPT_USAGE_FLUSH_INTERVAL
+
+    @property
+    def flush_threshold(self):
+        return settings.PROMPT_USAGE_FLUSH_THRESHOLD
+
+    @property
+    def pending(self):
+        """반영 대기 중인 프롬프트 수"""
+        return len(self._pending)
+
+    def add(self, prompt_id, count=1, used_at=None):
+        """증가분 기록 - 주기가 지났거나 버퍼가 가득 차면 바로 반영"""
+        used_at = used_at or timezone.now()
+        with self._lock:
+            entry = self._pending.get(prompt_id)
+            if entry is None:
+                self._pending[prompt_id] = [count, used_at]
+            else:
+                entry[0] += count
+                entry[1] = max(entry[1], used_at)
+            due = (
+                time.monotonic() - self._last_flush >= self.flush_interval
+                or len(self._pending) >= self.flush_threshold
+            )
+        self._ensure_flusher()
+        if due:
+            self._flush_logged()
+
+    def flush(self):
+        """모아 둔 증가분을 DB 에 반영하고 반영한 프롬프트 수를 반환"""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            self._last_flush = time.monotonic()
+
+        if not pending:
+            return 0
+
+        try:
+            apply_usage_counters(pending)
+        except Exception:
+            # 실패한 증가분은 버리지 않고 다음 반영 때 다시 시도
+            with self._lock:
+                for prompt_id, (count, used_at) in pending.items():
+                    entry = self._pending.setdefault(prompt_id, [0, used_at])
+                    entry[0] += count
+                    entry[1] = max(entry[1], used_at)
+            raise
+        return len(pending)
+
+    def _flush_logged(self):
+        """요청/백그라운드 반영 - 실패해도 예외를 올리지 않는다 (증가분은 버퍼에 남는다)"""
+        try:
+            return self.flush()
+        except Exception:
+            logger.exception('Failed to flush prompt usage counters')
+            return 0
+
+    def _ensure_flusher(self):
+        if self._flusher is not None and self._flusher.is_alive():
+            return
+        with self._flusher_lock:
+            if self._flusher is None or not self._flusher.is_alive():
+                self._flusher = threading.Thread(
+                    target=self._run, name='prompt-usage-counter-flusher', daemon=True
+                )
+                self._flusher.start()
+
+    def _run(self):
+        while True:
+            time.sleep(min(self.flush_interval, 1))
+            if self._pending and time.monotonic() - self._last_flush >= self.flush_interval:
+                self._flush_logged()
+
+
+usage_counters = UsageCounterBuffer()
+
+
+def flush_usage_counters():
+    """버퍼에 남은 사용 횟수를 즉시 반영 (테스트, 종료 시)"""
+    return usage_counters.flush()
+
+
+@atexit.register
+def _flush_on_exit():
+    try:
+        flush_usage_counters()
+    except Exception:
+        logger.exception('Failed to flush prompt usage counters on exit')
+
+
+def record_usage(prompt, user, variables_used=None):
+    """프롬프트 1회 사용 기록"""
+    record_usages(prompt, user, [variables_used])
+
+
+def record_usages(prompt, user, variable_sets):
+    """같은 프롬프트의 여러 번 사용을 한 번에 기록 - 사용 이력은 큐를 거쳐 일괄 적재"""
+    used_at = timezone.now()
+    events = [
+        UsageEvent(prompt.pk, user.pk, used_at, variables_used)
+        for variables_used in variable_sets
+    ]
+    if events:
+        usage_queue = get_usage_queue()
+        usage_queue.put_many(events)
+        if not usage_queue.applies_counters:
+            usage_counters.add(prompt.pk, count=len(events), used_at=used_at)
@@ -0,0 +1,215 @@
+"""
+PromptUsage 보관 기간과 월별 압축 아카이브
+
+PROMPT_USAGE_RETENTION_DAYS 보다 오래된 사용 이력을 월(UTC)별 NDJSON gzip 파일
+PROMPT_USAGE_ARCHIVE_DIR/YYYY/YYYY-MM.ndjson.gz 로 옮기고 테이블에서 지운다 (archive_usage 명령).
+테이블(과 인덱스)은 보관 기간만큼만 남고, 지난 이력은 iter_usages 로 계속 읽을 수 있다.
+
+- 배치(used_at, id 순)마다 해당 월 파일 끝에 gzip 멤버를 하나 덧붙이고 fsync 한 뒤,
+  다시 읽어 id 가 모두 들어갔는지 확인하고 manifest.json 을 갱신한 다음 행을 지운다
+- manifest 의 size 뒤에 남은 바이트는 중단된 실행의 잔여물이므로 다음 실행이 잘라낸다
+- manifest 갱신 후 삭제 전에 중단되면 같은 행이 다시 덧붙을 수 있어 읽을 때 id 로 거른다
+- archived_before: 끝까지 마친 실행의 기준 시각. iter_usages 는 이 시각 전은 아카이브에서,
+  이후는 테이블에서 읽는다 (중단된 실행이 옮긴 행은 다시 실행해 마칠 때까지 보이지 않는다)
+"""
+import gzip
+import json
+import os
+from collections import defaultdict
+from datetime import datetime, timezone as dt_timezone
+
+import orjson
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.utils.dateparse import parse_datetime
+
+from .models import Prompt, PromptUsage
+from .vector_index import _FileLock
+
+FIELDS = ('id', 'prompt_id', 'user_id', 'used_at', 'variables_used')
+MANIFEST = 'manifest.json'
+
+
+class ArchiveError(Exception):
+    pass
+
+
+def _month(used_at):
+    return used_at.astimezone(dt_timezone.utc).strftime('%Y-%m')
+
+
+def _month_range(month):
+    """'YYYY-MM' -> (시작, 다음 달 시작) UTC"""
+    year, number = map(int, month.split('-'))
+    start = datetime(year, number, 1, tzinfo=dt_timezone.utc)
+    end = datetime(year + number // 12, number % 12 + 1, 1, tzinfo=dt_timezone.utc)
+    return start, end
+
+
+class UsageArchive:
+    """월별 아카이브 디렉터리"""
+
+    def __init__(self, directory=None):
+        self.directory = str(directory or settings.PROMPT_USAGE_ARCHIVE_DIR)
+        self.manifest_path = os.path.join(self.directory, MANIFEST)
+
+    def path(self, month):
+        return os.path.join(self.directory, month[:4], f'{month}.ndjson.gz')
+
+    def manifest(self):
+        try:
+            with open(self.manifest_path, 'rb') as fp:
+                return json.load(fp)
+        except FileNotFoundError:
+            return {'archived_before': None, 'months': {}}
+
+    def archived_before(self):
+        value = self.manifest()['archived_before']
+        return parse_datetime(value) if value else None
+
+    def _write_manifest(self, manifest):
+        tmp_path = f'{self.manifest_path}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as fp:
+            json.dump(manifest, fp, indent=2, sort_keys=True)
+            fp.flush()
+            os.fsync(fp.fileno())
+        os.replace(tmp_path, self.manifest_path)
+
+    def _recover(self, manifest):
+        """manifest 에 기록되지 않은 파일 끝부분(중단된 실행의 잔여물)을 잘라낸다"""
+        for dirpath, _, filenames in os.walk(self.directory):
+            for filename in filenames:
+                if not filename.endswith('.ndjson.gz'):
+                    continue
+                month = filename[:-len('.ndjson.gz')]
+                size = manifest['months'].get(month, {}).get('size', 0)
+                path = os.path.join(dirpath, filename)
+                if os.path.getsize(path) > size:
+                    os.truncate(path, size)
+
+    def _append(self, month, rows):
+        """rows 를 month 파일 끝에 gzip 멤버로 덧붙이고 다시 읽어 확인 - 새 파일 크기 반환"""
+        path = self.path(month)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        payload = b''.join(orjson.dumps(row) + b'\n' for row in rows)
+        with open(path, 'ab') as fp:
+            offset = fp.tell()
+            with gzip.GzipFile(fileobj=fp, mode='wb', mtime=0) as gz:
+                gz.write(payload)
+            fp.flush()
+            os.fsync(fp.fileno())
+            size = fp.tell()
+
+        with open(path, 'rb') as fp:
+            fp.seek(offset)
+            with gzip.GzipFile(fileobj=fp, mode='rb') as gz:
+                written = [orjson.loads(line)['id'] for line in gz]
+        if written != [row['id'] for row in rows]:
+            raise ArchiveError(f'{path}: 덧붙인 행을 다시 읽은 결과가 다릅니다')
+        return size
+
+    def archive(self, before, batch_size=5000, using=None):
+        """
+        used_at < before 인 PromptUsage 를 아카이브로 옮긴다 - {월: 옮긴 행 수} 반환
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        archived = defaultdict(int)
+        with _FileLock(os.path.join(self.directory, '.lock')):
+            manifest = self.manifest()
+            if not manifest['months'] and not os.path.exists(self.manifest_path):
+                if any(name.endswith('.ndjson.gz') for _, _, names in os.walk(self.directory) for name in names):
+                    raise ArchiveError(f'{self.manifest_path} 가 없는데 아카이브 파일이 있습니다')
+            self._recover(manifest)
+
+            usages = PromptUsage.objects.using(using).filter(used_at__lt=before).order_by('used_at', 'id')
+            while True:
+                rows = list(usages.values(*FIELDS)[:batch_size])
+                if not rows:
+                    break
+                by_month = defaultdict(list)
+                for row in rows:
+                    by_month[_month(row['used_at'])].append(row)
+
+                for month, month_rows in sorted(by_month.items()):
+                    entry = manifest['months'].setdefault(month, {'size': 0, 'rows': 0})
+                    entry['size'] = self._append(month, month_rows)
+                    entry['rows'] += len(month_rows)
+                    archived[month] += len(month_rows)
+                self._write_manifest(manifest)
+
+                with transaction.atomic(using=using):
+                    PromptUsage.objects.using(using).filter(id__in=[row['id'] for row in rows]).delete()
+
+            # 이전 기준 시각보다 앞당기지 않는다 (더 짧은 보관 기간으로 이미 옮긴 경우)
+            previous = manifest['archived_before']
+            if previous is None or parse_datetime(previous) < before:
+                manifest['archived_before'] = before.isoformat()
+            self._write_manifest(manifest)
+        return dict(archived)
+
+    def iter_rows(self, since=None, until=None):
+        """
+        아카이브한 행 (dict, 월 순서) - since <= used_at < until
+
+        같은 월 안에서 id 가 중복된 행은 한 번만 돌려준다.
+        """
+        for month in sorted(self.manifest()['months']):
+            start, end = _month_range(month)
+            if (since and end <= since) or (until and start >= until):
+                continue
+            path = self.path(month)
+            if not os.path.exists(path):
+                continue
+            seen = set()
+            with gzip.open(path, 'rb') as gz:
+                for line in gz:
+                    row = orjson.loads(line)
+                    if row['id'] in seen:
+                        continue
+                    seen.add(row['id'])
+                    row['used_at'] = parse_datetime(row['used_at'])
+                    if (since and row['used_at'] < since) or (until and row['used_at'] >= until):
+                        continue
+                    yield row
+
+
+def get_archive():
+    return UsageArchive()
+
+
+def hot_usages(using=None):
+    """아카이브하지 않은 (archived_before 이후) PromptUsage"""
+    usages = PromptUsage.objects.using(using).order_by()
+    archived_before = get_archive().archived_before()
+    if archived_before is not None:
+        usages = usages.filter(used_at__gte=archived_before)
+    return usages
+
+
+def iter_archived(fields, since=None, using=None):
+    """
+    아카이브한 사용 이력을 fields 순서의 튜플로 (archived_before 전, used_at >= since)
+
+    테이블과 같게 지금 남아 있는 프롬프트/사용자의 이력만 돌려준다.
+    """
+    archive = get_archive()
+    archived_before = archive.archived_before()
+    if archived_before is None or (since and since >= archived_before):
+        return
+    prompt_ids = user_ids = None
+    for row in archive.iter_rows(since=since, until=archived_before):
+        if prompt_ids is None:
+            prompt_ids = set(Prompt.objects.using(using).values_list('id', flat=True))
+            user_ids = set(User.objects.using(using).values_list('id', flat=True))
+        if row['prompt_id'] in prompt_ids and row['user_id'] in user_ids:
+            yield tuple(row[field] for field in fields)
+
+
+def iter_usages(fields, since=None, using=None, chunk_size=2000):
+    """아카이브와 테이블을 합친 사용 이력 (fields 순서의 튜플, used_at >= since)"""
+    yield from iter_archived(fields, since=since, using=using)
+    usages = hot_usages(using=using)
+    if since is not None:
+        usages = usages.filter(used_at__gte=since)
+    yield from usages.values_list(*fields).iterator(chunk_size=chunk_size)
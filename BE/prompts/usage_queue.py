@@ -0,0 +1,300 @@
+"""
+PromptUsage 비동기 적재 파이프라인
+
+요청 안에서는 사용 이벤트를 큐에 넣기만 하고, 별도 워커가 모아서
+PromptUsage 로 bulk_create 한다. 백엔드는 PROMPT_USAGE_QUEUE['BACKEND'] 로 교체할 수 있다.
+
+- SyncUsageQueue: 큐 없이 바로 기록 (기존 동작)
+- MemoryUsageQueue: 프로세스 내 고정 크기 큐 + 데몬 스레드 워커 (명시적으로 설정한 경우만)
+- DatabaseUsageQueue: 인덱스 없는 대기 테이블(PendingUsage) + process_usage_events 명령 워커 (기본값)
+
+전달 보장
+- DatabaseUsageQueue 는 at-least-once 이다. 이벤트는 요청 트랜잭션과 함께 커밋되고,
+  워커는 PromptUsage 기록과 대기 행 삭제를 한 트랜잭션으로 처리한다. 워커가 중간에
+  죽으면 트랜잭션이 롤백되어 같은 이벤트를 다시 처리한다. 트랜잭션 밖의 부수 효과
+  (usage_recorded 수신자가 외부 시스템에 쓰는 경우 등)는 중복될 수 있다.
+- MemoryUsageQueue 는 큐가 가득 차면 PUT_TIMEOUT 초 동안 요청을 막고(backpressure),
+  그래도 자리가 없으면 요청 스레드에서 직접 기록한다. 워커의 쓰기가 실패하면(database is locked 등)
+  배치를 버리지 않고 다음 배치 앞에 다시 넣어 백오프(RETRY_DELAY ~ MAX_RETRY_DELAY 초)하며 재시도한다.
+  정상 종료 시 남은 이벤트를 기록하지만, 프로세스가 강제 종료되면 큐에 남은 이벤트는 유실된다 (at-most-once).
+- 삭제된 프롬프트/사용자의 이벤트는 기록하지 않고 버린다.
+
+단일 writer (MemoryUsageQueue + SINGLE_WRITER, SQLite 동시성 모드 기본값)
+- 워커 스레드 하나만 PromptUsage 와 use_count/last_used 를 기록한다. 사용 횟수는
+  UsageCounterBuffer 를 거치지 않고 같은 배치 트랜잭션에서 더한다.
+- 큐가 가득 차면 요청 스레드가 직접 쓰지 않고 자리가 날 때까지 기다린다. SINGLE_WRITER_TIMEOUT 초가
+  지나도 자리가 없으면(워커가 멈춘 경우 등) 경고를 남기고 워커와 같은 쓰기 락을 잡고 직접 기록한다.
+"""
+import atexit
+import logging
+import queue
+import threading
+import time
+from collections import namedtuple
+from functools import lru_cache
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.signals import setting_changed
+from django.db import transaction
+from django.db.models import DateTimeField, F, Value
+from django.db.models.functions import Coalesce, Greatest
+from django.dispatch import receiver
+from django.utils.module_loading import import_string
+
+from .models import Prompt, PromptUsage, PendingUsage
+from .signals import usage_counters_flushed, usage_recorded
+
+logger = logging.getLogger(__name__)
+
+
+# MemoryUsageQueue 워커가 쓰기에 실패했을 때 재시도 간격(초) - 실패할 때마다 두 배, 최대 MAX_RETRY_DELAY
+RETRY_DELAY = 0.5
+MAX_RETRY_DELAY = 30
+
+UsageEvent = namedtuple('UsageEvent', ['prompt_id', 'user_id', 'used_at', 'variables_used'])
+
+
+def apply_usage_counters(pending):
+    """{prompt_id: (증가분, 마지막 사용 시각)} 을 use_count/last_used 에 더하고 usage_counters_flushed 를 보낸다"""
+    if not pending:
+        return
+    with transaction.atomic():
+        # 교착을 피하도록 id 순서로 갱신
+        for prompt_id in sorted(pending):
+            count, used_at = pending[prompt_id]
+            used_at = Value(used_at, output_field=DateTimeField())
+            Prompt.objects.filter(pk=prompt_id).update(
+                use_count=F('use_count') + count,
+                last_used=Greatest(Coalesce('last_used', used_at), used_at),
+            )
+    usage_counters_flushed.send(sender=Prompt, prompt_ids=list(pending))
+
+
+def _counter_increments(usages):
+    pending = {}
+    for usage in usages:
+        count, used_at = pending.get(usage.prompt_id, (0, usage.used_at))
+        pending[usage.prompt_id] = (count + 1, max(used_at, usage.used_at))
+    return pending
+
+
+def write_usage_events(events, apply_counters=False):
+    """
+    이벤트를 PromptUsage 로 일괄 기록하고 usage_recorded 를 보낸다
+
+    기록과 수신자 처리는 한 트랜잭션으로 묶인다. apply_counters 면 use_count/last_used 도
+    같은 트랜잭션에서 더한다. 기록한 행 수를 반환한다.
+    """
+    if not events:
+        return 0
+
+    prompt_ids = set(Prompt.objects.filter(
+        id__in={event.prompt_id for event in events}
+    ).values_list('id', flat=True))
+    user_ids = set(User.objects.filter(
+        id__in={event.user_id for event in events}
+    ).values_list('id', flat=True))
+
+    usages = [
+        PromptUsage(
+            prompt_id=event.prompt_id,
+            user_id=event.user_id,
+            used_at=event.used_at,
+            variables_used=event.variables_used,
+        )
+        for event in events
+        if event.prompt_id in prompt_ids and event.user_id in user_ids
+    ]
+    if len(usages) < len(events):
+        logger.info('Dropped %d usage events for deleted prompts or users', len(events) - len(usages))
+
+    with transaction.atomic():
+        PromptUsage.objects.bulk_create(usages, batch_size=settings.PROMPT_USAGE_QUEUE['BATCH_SIZE'])
+        if apply_counters:
+            apply_usage_counters(_counter_increments(usages))
+        usage_recorded.send(sender=PromptUsage, usages=usages)
+    return len(usages)
+
+
+class BaseUsageQueue:
+    """사용 이벤트 큐 기본 클래스"""
+    # True 면 큐가 use_count/last_used 도 반영한다 (record_usages 가 UsageCounterBuffer 를 건너뜀)
+    applies_counters = False
+
+    def __init__(self, options):
+        self.batch_size = options['BATCH_SIZE']
+
+    def put(self, event):
+        self.put_many([event])
+
+    def put_many(self, events):
+        raise NotImplementedError
+
+    def drain(self, max_events=None):
+        """큐에 쌓인 이벤트를 기록하고 기록한 이벤트 수를 반환"""
+        return 0
+
+    def flush(self):
+        """남은 이벤트를 모두 기록 (테스트, 종료 시)"""
+        total = 0
+        while True:
+            written = self.drain()
+            if not written:
+                return total
+            total += written
+
+
+class SyncUsageQueue(BaseUsageQueue):
+    """큐 없이 요청 안에서 바로 기록"""
+
+    def put_many(self, events):
+        for start in range(0, len(events), self.batch_size):
+            write_usage_events(events[start:start + self.batch_size])
+
+
+class MemoryUsageQueue(BaseUsageQueue):
+    """프로세스 내 고정 크기 큐 - 데몬 스레드가 배치 단위로 기록"""
+
+    def __init__(self, options):
+        super().__init__(options)
+        self.put_timeout = options['PUT_TIMEOUT']
+        self.flush_interval = options['FLUSH_INTERVAL']
+        self._queue = queue.Queue(maxsize=options['MAX_SIZE'])
+        self.single_writer = options.get('SINGLE_WRITER', False)
+        self.single_writer_timeout = options.get('SINGLE_WRITER_TIMEOUT', 30)
+        self.applies_counters = self.single_writer
+        self._worker = None
+        self._worker_lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        # 쓰기에 실패해 다시 기록할 이벤트 (큐보다 먼저 꺼낸다)
+        self._retry = []
+        self._retry_lock = threading.Lock()
+
+    def put_many(self, events):
+        self._ensure_worker()
+        # 단일 writer 면 요청 스레드는 DB 쓰기 락을 두고 경쟁하지 않고 큐 자리를 (더 오래) 기다린다
+        timeout = self.single_writer_timeout if self.single_writer else self.put_timeout
+        for index, event in enumerate(events):
+            try:
+                self._queue.put(event, timeout=timeout)
+            except queue.Full:
+                # 워커가 따라가지 못하면 남은 이벤트는 요청 스레드에서 직접 기록 (쓰기 락은 워커와 공유)
+                logger.warning(
+                    'Usage queue is full after %.1fs; writing %d events synchronously', timeout, len(events) - index,
+                )
+                self._write(list(events[index:]))
+                return
+
+    def drain(self, max_events=None):
+        events = self._take(max_events or self.batch_size, timeout=None)
+        if events:
+            self._write(events, requeue=True)
+        return len(events)
+
+    def _take(self, max_events, timeout):
+        """최대 max_events 개를 꺼낸다 (재시도할 이벤트 먼저) - timeout 이 있으면 첫 이벤트를 기다린다"""
+        with self._retry_lock:
+            events, self._retry = self._retry[:max_events], self._retry[max_events:]
+        if events:
+            timeout = None
+        try:
+            if timeout is not None:
+                events.append(self._queue.get(timeout=timeout))
+            while len(events) < max_events:
+                events.append(self._queue.get_nowait())
+        except queue.Empty:
+            pass
+        return events
+
+    def _write(self, events, requeue=False):
+        """events 를 배치로 기록 - requeue 면 실패한 배치부터 남은 이벤트를 재시도 목록에 되돌리고 예외를 올린다"""
+        with self._write_lock:
+            for start in range(0, len(events), self.batch_size):
+                try:
+                    write_usage_events(events[start:start + self.batch_size], apply_counters=self.applies_counters)
+                except Exception:
+                    if requeue:
+                        with self._retry_lock:
+                            self._retry[:0] = events[start:]
+                    raise
+
+    def _ensure_worker(self):
+        if self._worker is not None and self._worker.is_alive():
+            return
+        with self._worker_lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(
+                    target=self._run, name='prompt-usage-writer', daemon=True
+                )
+                self._worker.start()
+
+    def _run(self):
+        delay = 0
+        while True:
+            events = self._take(self.batch_size, timeout=self.flush_interval)
+            if not events:
+                continue
+            try:
+                self._write(events, requeue=True)
+                delay = 0
+            except Exception:
+                delay = min(max(delay * 2, RETRY_DELAY), MAX_RETRY_DELAY)
+                logger.exception('Failed to write %d usage events; retrying in %.1fs', len(events), delay)
+                time.sleep(delay)
+
+
+class DatabaseUsageQueue(BaseUsageQueue):
+    """DB 대기 테이블 큐 - process_usage_events 명령이 비운다"""
+
+    def put_many(self, events):
+        PendingUsage.objects.bulk_create(
+            [PendingUsage(**event._asdict()) for event in events],
+            batch_size=self.batch_size,
+        )
+
+    def drain(self, max_events=None):
+        with transaction.atomic():
+            # 여러 워커가 동시에 돌아도 같은 행을 잡지 않도록 (지원하는 DB 에서만)
+            pending = list(
+                PendingUsage.objects.select_for_update(skip_locked=True)
+                .order_by('id')[:max_events or self.batch_size]
+            )
+            if not pending:
+                return 0
+            write_usage_events([
+                UsageEvent(row.prompt_id, row.user_id, row.used_at, row.variables_used)
+                for row in pending
+            ])
+            PendingUsage.objects.filter(id__in=[row.id for row in pending]).delete()
+        return len(pending)
+
+
+@lru_cache(maxsize=None)
+def get_usage_queue():
+    options = settings.PROMPT_USAGE_QUEUE
+    return import_string(options['BACKEND'])(options)
+
+
+@receiver(setting_changed)
+def reset_usage_queue(setting, **kwargs):
+    if setting == 'PROMPT_USAGE_QUEUE':
+        get_usage_queue.cache_clear()
+
+
+def enqueue_usage(events):
+    get_usage_queue().put_many(events)
+
+
+def flush_usage_queue():
+    """현재 프로세스의 큐에 남은 이벤트를 모두 기록"""
+    return get_usage_queue().flush()
+
+
+@atexit.register
+def _flush_on_exit():
+    if get_usage_queue.cache_info().currsize:
+        try:
+            flush_usage_queue()
+        except Exception:
+            logger.exception('Failed to flush usage queue on exit')
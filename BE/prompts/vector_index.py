@@ -0,0 +1,347 @@
+"""
+로컬 벡터 유사도 검색 (네트워크 없음)
+
+제목/내용/태그를 hashing trick 으로 PROMPT_VECTOR_DIM 차원 벡터로 만든다.
+- 특징: 단어, 연속한 두 단어, 단어의 글자 2/3-gram (x0.5, 조사/어미가 붙는 한국어 대응). 제목 x2, 태그 x1.5
+- 가중치: log(1 + tf) x idf. idf 는 재구축 때 버킷별 문서 빈도로 계산해 두고 증분 갱신에도 쓴다
+- L2 정규화하므로 내적이 코사인 유사도다
+
+벡터는 메모리 맵 파일(float32, 행 번호 = 프롬프트 id)에 두므로 모든 워커가 OS 페이지
+캐시를 복사 없이 공유한다. 검색은 호출자가 볼 수 있는 프롬프트 id 만 묶음 단위로 모아
+내적하고 top-k 를 고른다.
+
+- 프롬프트 저장/태그 변경/삭제는 커밋 뒤에 해당 행만 다시 쓴다 (파일 잠금, 필요하면 파일을 늘린다)
+- rebuild_vector_index 는 새 파일에 만든 뒤 교체한다. 다른 워커는 파일이 바뀐 것을 보고 다시 연다
+- 인덱스 디렉터리는 DB 별칭/이름마다 따로 둔다. 메모리 SQLite(테스트 DB)는 프로세스 임시 디렉터리
+"""
+import atexit
+import hashlib
+import os
+import re
+import shutil
+import tempfile
+import threading
+import zlib
+from itertools import islice
+
+import numpy as np
+from django.conf import settings
+from django.db import connections, router
+
+from .search import build_documents, tokenize
+
+try:
+    import fcntl
+except ImportError:  # Windows - 프로세스 간 잠금 없음
+    fcntl = None
+
+TITLE_WEIGHT = 2.0
+CONTENT_WEIGHT = 1.0
+TAGS_WEIGHT = 1.5
+CHAR_NGRAMS = (2, 3)
+CHAR_NGRAM_WEIGHT = 0.5
+
+# 한 번에 모아 내적할 행 수
+SEARCH_BATCH = 65536
+
+_indexes = {}
+_indexes_lock = threading.Lock()
+_temp_dir = None
+
+
+class HashingVectorizer:
+    """(제목, 내용, 태그) -> log(1 + tf) 해시 버킷 벡터 (idf 적용 전)"""
+
+    def __init__(self, dim):
+        self.dim = dim
+        self._buckets = {}
+
+    def _bucket(self, feature):
+        bucket = self._buckets.get(feature)
+        if bucket is None:
+            bucket = zlib.crc32(feature.encode('utf-8')) % self.dim
+            if len(self._buckets) < 1_000_000:
+                self._buckets[feature] = bucket
+        return bucket
+
+    def features(self, text):
+        """(단어/두 단어 특징 목록, 글자 n-gram 특징 목록)"""
+        tokens = tokenize(text)
+        words = list(tokens)
+        words.extend(f'{first} {second}' for first, second in zip(tokens, tokens[1:]))
+        grams = []
+        for token in tokens:
+            padded = f'<{token}>'
+            for n in CHAR_NGRAMS:
+                grams.extend('#' + padded[i:i + n] for i in range(len(padded) - n + 1))
+        return words, grams
+
+    def transform(self, documents):
+        """documents: [(제목, 내용, 태그 문자열)] -> (n, dim) float32"""
+        rows, cols, weights = [], [], []
+        for row, fields in enumerate(documents):
+            for text, weight in zip(fields, (TITLE_WEIGHT, CONTENT_WEIGHT, TAGS_WEIGHT)):
+                words, grams = self.features(text)
+                for features, feature_weight in ((words, weight), (grams, weight * CHAR_NGRAM_WEIGHT)):
+                    rows.extend([row] * len(features))
+                    cols.extend(self._bucket(feature) for feature in features)
+                    weights.extend([feature_weight] * len(features))
+        counts = np.bincount(
+            np.asarray(rows, dtype=np.int64) * self.dim + np.asarray(cols, dtype=np.int64),
+            weights=np.asarray(weights, dtype=np.float64),
+            minlength=len(documents) * self.dim,
+        )
+        return np.log1p(counts).astype(np.float32).reshape(len(documents), self.dim)
+
+
+def normalize_rows(vectors):
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1
+    vectors /= norms
+    return vectors
+
+
+class VectorIndex:
+    """프롬프트 id 를 행 번호로 쓰는 float32 메모리 맵 행렬 + idf"""
+
+    def __init__(self, path, dim):
+        self.path = path
+        self.dim = dim
+        self.vectorizer = HashingVectorizer(dim)
+        self.vectors_path = os.path.join(path, 'vectors.f32')
+        self.idf_path = os.path.join(path, 'idf.npy')
+        self._lock = threading.Lock()
+        self._matrix = None
+        self._stamp = None
+        self._idf = None
+        self._idf_stamp = None
+        os.makedirs(path, exist_ok=True)
+
+    # -- 파일 ---------------------------------------------------------------
+
+    def _file_stamp(self, path):
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return None
+        return stat.st_ino, stat.st_size
+
+    def matrix(self):
+        """현재 파일의 메모리 맵 (다른 프로세스가 늘리거나 교체했으면 다시 연다, 없으면 None)"""
+        with self._lock:
+            stamp = self._file_stamp(self.vectors_path)
+            if stamp is None:
+                self._matrix = self._stamp = None
+            elif stamp != self._stamp:
+                rows = stamp[1] // (self.dim * 4)
+                self._matrix = np.memmap(self.vectors_path, dtype=np.float32, mode='r', shape=(rows, self.dim)) if rows else None
+                self._stamp = stamp
+            return self._matrix
+
+    def idf(self):
+        with self._lock:
+            stamp = self._file_stamp(self.idf_path)
+            if self._idf is None or stamp != self._idf_stamp:
+                self._idf = np.load(self.idf_path) if stamp else np.ones(self.dim, dtype=np.float32)
+                self._idf_stamp = stamp
+            return self._idf
+
+    def _write_lock(self):
+        return _FileLock(os.path.join(self.path, 'write.lock'))
+
+    # -- 쓰기 ---------------------------------------------------------------
+
+    def vectorize(self, documents, idf=None):
+        vectors = self.vectorizer.transform(documents)
+        vectors *= self.idf() if idf is None else idf
+        return normalize_rows(vectors)
+
+    def update(self, prompt_ids, vectors):
+        """행 prompt_ids 에 vectors 를 쓴다 (파일이 작으면 늘린다)"""
+        prompt_ids = np.asarray(prompt_ids, dtype=np.int64)
+        if not len(prompt_ids):
+            return
+        with self._write_lock():
+            rows = self._ensure_rows(int(prompt_ids.max()) + 1)
+            matrix = np.memmap(self.vectors_path, dtype=np.float32, mode='r+', shape=(rows, self.dim))
+            matrix[prompt_ids] = vectors
+            matrix.flush()
+            del matrix
+
+    def remove(self, prompt_ids):
+        current = self.matrix()
+        if current is None:
+            return
+        prompt_ids = np.asarray([prompt_id for prompt_id in prompt_ids if prompt_id < len(current)], dtype=np.int64)
+        if len(prompt_ids):
+            self.update(prompt_ids, np.zeros((len(prompt_ids), self.dim), dtype=np.float32))
+
+    def _ensure_rows(self, needed):
+        size = os.path.getsize(self.vectors_path) if os.path.exists(self.vectors_path) else 0
+        rows = size // (self.dim * 4)
+        if rows < needed:
+            # 자주 늘리지 않도록 두 배씩 (새 영역은 0 = 벡터 없음)
+            rows = max(needed, rows * 2, 1024)
+            with open(self.vectors_path, 'ab') as fp:
+                fp.truncate(rows * self.dim * 4)
+        return rows
+
+    def rebuild(self, batches, max_id):
+        """
+        batches: [(프롬프트 id 목록, 문서 목록)] 을 새 파일에 색인한 뒤 교체
+
+        1단계에서 log tf 벡터를 쓰며 버킷별 문서 빈도를 세고, 2단계에서 idf 를 곱해 정규화한다.
+        """
+        rows = max(max_id + 1, 1024)
+        fd, tmp_path = tempfile.mkstemp(dir=self.path, suffix='.f32.tmp')
+        os.close(fd)
+        # mkstemp 는 0600 - 다른 사용자로 도는 워커도 읽을 수 있게
+        os.chmod(tmp_path, 0o644)
+        try:
+            with open(tmp_path, 'wb') as fp:
+                fp.truncate(rows * self.dim * 4)
+            matrix = np.memmap(tmp_path, dtype=np.float32, mode='r+', shape=(rows, self.dim))
+            df = np.zeros(self.dim, dtype=np.int64)
+            ids = []
+            for prompt_ids, documents in batches:
+                vectors = self.vectorizer.transform(documents)
+                df += (vectors > 0).sum(axis=0)
+                matrix[prompt_ids] = vectors
+                ids.extend(prompt_ids)
+            idf = (np.log((1 + len(ids)) / (1 + df)) + 1).astype(np.float32)
+            ids = np.asarray(sorted(ids), dtype=np.int64)
+            for start in range(0, len(ids), SEARCH_BATCH):
+                chunk = ids[start:start + SEARCH_BATCH]
+                matrix[chunk] = normalize_rows(matrix[chunk] * idf)
+            matrix.flush()
+            del matrix
+
+            with self._write_lock():
+                idf_tmp = os.path.join(self.path, 'idf.tmp.npy')
+                np.save(idf_tmp, idf)
+                os.replace(idf_tmp, self.idf_path)
+                os.replace(tmp_path, self.vectors_path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        return len(ids)
+
+    # -- 검색 ---------------------------------------------------------------
+
+    def search(self, query_vector, id_batches, limit):
+        """id_batches 의 id 중 query_vector 와 내적이 큰 순서로 [(id, 점수)] (점수 > 0)"""
+        matrix = self.matrix()
+        if matrix is None or not query_vector.any():
+            return []
+        best_ids = np.empty(0, dtype=np.int64)
+        best_scores = np.empty(0, dtype=np.float32)
+        for ids in id_batches:
+            ids = ids[ids < len(matrix)]
+            if not len(ids):
+                continue
+            scores = matrix[ids] @ query_vector
+            best_ids = np.concatenate([best_ids, ids])
+            best_scores = np.concatenate([best_scores, scores])
+            if len(best_ids) > limit:
+                top = np.argpartition(-best_scores, limit)[:limit]
+                best_ids, best_scores = best_ids[top], best_scores[top]
+        order = np.lexsort((-best_ids, -best_scores))
+        return [(int(best_ids[i]), float(best_scores[i])) for i in order if best_scores[i] > 0][:limit]
+
+
+class _FileLock:
+    """프로세스 간 쓰기 잠금 (fcntl 이 없으면 아무것도 하지 않음)"""
+
+    def __init__(self, path):
+        self.path = path
+        self._fp = None
+
+    def __enter__(self):
+        self._fp = open(self.path, 'a')
+        if fcntl is not None:
+            fcntl.flock(self._fp, fcntl.LOCK_EX)
+        return self
+
+    def __exit__(self, *exc_info):
+        if fcntl is not None:
+            fcntl.flock(self._fp, fcntl.LOCK_UN)
+        self._fp.close()
+
+
+def _index_path(alias):
+    global _temp_dir
+    connection = connections[alias]
+    if getattr(connection, 'is_in_memory_db', lambda: False)():
+        # 프로세스와 함께 사라지는 DB - 인덱스도 임시 디렉터리에
+        if _temp_dir is None:
+            _temp_dir = tempfile.mkdtemp(prefix='prompt-vectors-')
+            atexit.register(shutil.rmtree, _temp_dir, True)
+        base = _temp_dir
+    else:
+        base = settings.PROMPT_VECTOR_INDEX_DIR
+    name = hashlib.md5(str(connection.settings_dict['NAME']).encode('utf-8'), usedforsecurity=False).hexdigest()[:8]
+    alias = re.sub(r'[^\w-]', '_', alias)
+    return os.path.join(base, f'{alias}-{name}-d{settings.PROMPT_VECTOR_DIM}')
+
+
+def get_vector_index(using=None):
+    from .models import Prompt
+
+    alias = using or router.db_for_write(Prompt)
+    path = _index_path(alias)
+    with _indexes_lock:
+        if path not in _indexes:
+            _indexes[path] = VectorIndex(path, settings.PROMPT_VECTOR_DIM)
+        return _indexes[path]
+
+
+def index_prompts(prompt_ids, using=None):
+    """프롬프트 벡터 갱신 (없는 id 는 무시)"""
+    documents = build_documents(prompt_ids, using=using)
+    if documents:
+        index = get_vector_index(using)
+        index.update([doc[0] for doc in documents], index.vectorize([doc[1:] for doc in documents]))
+
+
+def remove_prompts(prompt_ids, using=None):
+    get_vector_index(using).remove(list(prompt_ids))
+
+
+def rebuild_index(using=None, batch_size=1000):
+    """전체 벡터 인덱스 재구축 - 색인한 프롬프트 수 반환"""
+    from .models import Prompt
+
+    def batches():
+        last_id = 0
+        while True:
+            ids = list(
+                Prompt.objects.using(using)
+                .filter(id__gt=last_id)
+                .order_by('id')
+                .values_list('id', flat=True)[:batch_size]
+            )
+            if not ids:
+                return
+            documents = build_documents(ids, using=using)
+            yield [doc[0] for doc in documents], [doc[1:] for doc in documents]
+            last_id = ids[-1]
+
+    max_id = Prompt.objects.using(using).order_by('-id').values_list('id', flat=True).first() or 0
+    return get_vector_index(using).rebuild(batches(), max_id)
+
+
+def search_prompts(queryset, query, limit=20):
+    """queryset 범위 안에서 query 와 벡터가 가까운 [(프롬프트 id, 점수)]"""
+    # 인덱스 파일은 쓰기 DB 기준 - 읽기 복제본의 queryset 이어도 같은 파일을 본다
+    index = get_vector_index()
+    query_vector = index.vectorize([('', query, '')])[0]
+
+    def id_batches():
+        ids = queryset.order_by().values_list('id', flat=True).iterator(chunk_size=SEARCH_BATCH)
+        while True:
+            batch = np.fromiter(islice(ids, SEARCH_BATCH), dtype=np.int64)
+            if not len(batch):
+                return
+            yield batch
+
+    return index.search(query_vector, id_batches(), limit)
@@ -1,39 +1,62 @@
+import json
+from itertools import islice
+
 from rest_framework import viewsets, status, filters
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticatedOrReadOnly, IsAuthenticated
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import BrowsableAPIRenderer
+from rest_framework.settings import api_settings
 from django_filters.rest_framework import DjangoFilterBackend
+from django.conf import settings
 from django.utils import timezone
-from django.db.models import Count, Q
-from django.http import JsonResponse
+from django.db import transaction
+from django.db.models import Q
+from django.http import StreamingHttpResponse
+from config.db_router import ReplicaReadMixin
 from .models import Prompt, Category, PromptUsage
 from .serializers import (
     PromptListSerializer,
     PromptDetailSerializer,
     PromptApplyVariablesSerializer,
+    PromptBatchApplyVariablesSerializer,
     CategorySerializer,
     PromptUsageSerializer
 )
-from .filters import PromptFilter
-
-
-class CategoryViewSet(viewsets.ModelViewSet):
+from . import autocomplete, exporter, frecency, similarity, vector_index
+from .filters import PromptFilter, PromptOrderingFilter
+from .importer import PromptImporter
+from .pagination import PromptCursorPagination
+from .fast_serialization import FastListMixin
+from .renderers import ORJSONRenderer
+from .response_cache import CachedResponseMixin
+from .parsers import NDJSONParser
+from .search import search_prompts
+from .templating import get_compiled_template
+from .usage import record_usage, record_usages
+
+
+class CategoryViewSet(ReplicaReadMixin, viewsets.ModelViewSet):
     """카테고리 CRUD"""
-    queryset = Category.objects.annotate(
-        prompt_count=Count('prompts')
-    ).all()
+    replica_actions = {'list', 'retrieve'}
+    queryset = Category.objects.all()
     serializer_class = CategorySerializer
     permission_classes = [IsAuthenticatedOrReadOnly]
 
 
-class PromptViewSet(viewsets.ModelViewSet):
-    """프롬프트 CRUD + 변수 적용"""
+class PromptViewSet(ReplicaReadMixin, CachedResponseMixin, FastListMixin, viewsets.ModelViewSet):
+    """프롬프트 CRUD + 변수 적용 (목록/상세는 응답 캐시 + ETag, 조회는 replica)"""
+    replica_actions = {'list', 'retrieve', 'search', 'favorites', 'frecent', 'export', 'similar'}
     permission_classes = [IsAuthenticatedOrReadOnly]
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    filter_backends = [DjangoFilterBackend, filters.SearchFilter, PromptOrderingFilter]
     filterset_class = PromptFilter
     search_fields = ['title', 'content', 'tags__name']
-    ordering_fields = ['created_at', 'updated_at', 'use_count', 'last_used']
+    # frecency: 요청 사용자의 사용 빈도 + 최근성 점수 (ordering=-frecency, 로그인 사용자만 의미 있음)
+    ordering_fields = ['created_at', 'updated_at', 'use_count', 'last_used', 'frecency']
     ordering = ['-created_at']
+    pagination_class = PromptCursorPagination
+    renderer_classes = [ORJSONRenderer, BrowsableAPIRenderer]
 
     def get_queryset(self):
         queryset = Prompt.objects.select_related('user', 'category').prefetch_related('tags')
@@ -54,7 +77,13 @@ class PromptViewSet(viewsets.ModelViewSet):
         return PromptDetailSerializer
 
     def perform_create(self, serializer):
-        serializer.save(user=self.request.user)
+        # 프롬프트와 태그를 한 트랜잭션으로 저장 - 검색/벡터 인덱스는 커밋 뒤 프롬프트마다 한 번 반영
+        with transaction.atomic():
+            serializer.save(user=self.request.user)
+
+    def perform_update(self, serializer):
+        with transaction.atomic():
+            serializer.save()
 
     @action(detail=True, methods=['post'], permission_classes=[IsAuthenticated])
     def apply_variables(self, request, pk=None):
@@ -86,17 +115,8 @@ class PromptViewSet(viewsets.ModelViewSet):
         variable_values = serializer.validated_data['variable_values']
         result = prompt.apply_variables(variable_values)
 
-        # 사용 이력 기록
-        PromptUsage.objects.create(
-            prompt=prompt,
-            user=request.user,
-            variables_used=variable_values
-        )
-
-        # 사용 횟수 증가
-        prompt.use_count += 1
-        prompt.last_used = timezone.now()
-        prompt.save(update_fields=['use_count', 'last_used'])
+        # 사용 이력 기록 + 사용 횟수 증가
+        record_usage(prompt, request.user, variables_used=variable_values)
 
         return Response({
             "original": prompt.content,
@@ -104,6 +124,66 @@ class PromptViewSet(viewsets.ModelViewSet):
             "result": result
         })
 
+    @action(
+        detail=True,
+        methods=['post'],
+        permission_classes=[IsAuthenticated],
+        parser_classes=[JSONParser, NDJSONParser],
+        url_path='apply_variables/batch',
+    )
+    def apply_variables_batch(self, request, pk=None):
+        """
+        변수 세트 여러 개를 한 번에 적용 (결과는 NDJSON 스트림)
+
+        POST /api/prompts/{id}/apply_variables/batch/
+        [{"language": "Python"}, {"language": "Go"}]
+
+        또는 Content-Type: application/x-ndjson 으로 한 줄에 하나씩 전송
+        """
+        prompt = self.get_object()
+
+        if not prompt.is_template:
+            return Response(
+                {"error": "This prompt is not a template"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        data = request.data
+        if isinstance(data, dict):
+            variable_sets = data.get('variable_values')
+        elif isinstance(data, list):
+            variable_sets = data
+        else:
+            # NDJSON 스트림은 제한보다 하나만 더 읽는다 - 넘치면 나머지를 읽지 않고 개수 검사에서 400
+            variable_sets = list(islice(data, settings.PROMPT_BATCH_RENDER_MAX + 1))
+
+        serializer = PromptBatchApplyVariablesSerializer(
+            data={'variable_values': variable_sets},
+            context={'prompt': prompt}
+        )
+        serializer.is_valid(raise_exception=True)
+        variable_sets = serializer.validated_data['variable_values']
+
+        # 사용 이력은 한 번의 bulk_create, 사용 횟수는 한 번의 증가분으로 기록
+        record_usages(prompt, request.user, variable_sets)
+
+        template = get_compiled_template(prompt)
+
+        def render_lines(chunk_size=500):
+            lines = []
+            for index, variable_values in enumerate(variable_sets):
+                lines.append(json.dumps(
+                    {"index": index, "result": template.render(variable_values)},
+                    ensure_ascii=False,
+                ))
+                if len(lines) >= chunk_size:
+                    yield '\n'.join(lines) + '\n'
+                    lines = []
+            if lines:
+                yield '\n'.join(lines) + '\n'
+
+        return StreamingHttpResponse(render_lines(), content_type='application/x-ndjson')
+
     @action(detail=True, methods=['post'], permission_classes=[IsAuthenticated])
     def toggle_favorite(self, request, pk=None):
         """즐겨찾기 토글"""
@@ -127,84 +207,158 @@ class PromptViewSet(viewsets.ModelViewSet):
         """프롬프트 사용 기록 (변수 없는 일반 프롬프트용)"""
         prompt = self.get_object()
 
-        # 사용 이력 기록
-        PromptUsage.objects.create(
-            prompt=prompt,
-            user=request.user
-        )
-
-        # 사용 횟수 증가
-        prompt.use_count += 1
-        prompt.last_used = timezone.now()
-        prompt.save(update_fields=['use_count', 'last_used'])
+        # 사용 이력 기록 + 사용 횟수 증가
+        record_usage(prompt, request.user)
 
         return Response({"status": "recorded"})
 
     @action(detail=False, methods=['get'], permission_classes=[IsAuthenticated])
     def favorites(self, request):
-        """내 즐겨찾기 목록"""
-        favorites = self.get_queryset().filter(
+        """내 즐겨찾기 목록 (커서 페이지네이션)"""
+        favorites = self.filter_queryset(self.get_queryset()).filter(
             user=request.user,
             is_favorite=True
         )
-        serializer = self.get_serializer(favorites, many=True)
-        return Response(serializer.data)
+        return self.list_response(favorites)
+
+    @action(detail=False, methods=['get'], permission_classes=[IsAuthenticated])
+    def frecent(self, request):
+        """
+        내가 자주, 최근에 쓴 프롬프트 (frecency 순, 커서 페이지네이션)
+
+        GET /api/prompts/frecent/
+        """
+        return self.list_response(frecency.frecent_prompts(self.filter_queryset(self.get_queryset()), request.user))
 
     @action(detail=False, methods=['get'])
     def search(self, request):
         """
-        통합 검색 - 제목, 내용, 태그에서 검색
+        통합 검색 - 제목, 내용, 태그 전문 검색 (관련도 순, 페이지네이션)
 
         GET /api/prompts/search/?q=python
+        GET /api/prompts/search/?q=코드 리뷰&mode=semantic&limit=20
+            로컬 벡터 유사도 순 상위 limit 개 (최대 100, 페이지네이션 없음)
         """
         query = request.query_params.get('q', '')
 
+        if request.query_params.get('mode') == 'semantic':
+            return self._semantic_search(request, query) if query else Response([])
+
         if not query:
-            return Response([])
+            # 검색 결과와 같은 페이지네이션 형식의 빈 응답
+            return self.list_response(self.get_queryset().none())
+
+        results = search_prompts(self.get_queryset(), query)
+        return self.list_response(results)
+
+    @action(detail=False, methods=['get'])
+    def autocomplete(self, request):
+        """
+        검색창 자동완성 - 단어가 q 로 시작하는 제목, 태그, 카테고리 (각각 최대 limit 개, 최대 20)
+
+        GET /api/prompts/autocomplete/?q=코드&limit=10
+        메모리 prefix 인덱스에서 찾으므로 인덱스를 다시 만들 때만 DB 를 조회한다.
+        """
+        try:
+            limit = min(max(int(request.query_params.get('limit', 10)), 1), autocomplete.MAX_LIMIT)
+        except ValueError:
+            return Response(
+                {"error": "limit must be an integer"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        return Response(autocomplete.autocomplete(request.query_params.get('q', ''), request.user, limit=limit))
 
-        results = self.get_queryset().filter(
-            Q(title__icontains=query) |
-            Q(content__icontains=query) |
-            Q(tags__name__icontains=query)
-        ).distinct()
+    def _semantic_search(self, request, query):
+        try:
+            limit = min(max(int(request.query_params.get('limit', 20)), 1), 100)
+        except ValueError:
+            return Response(
+                {"error": "limit must be an integer"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
 
-        serializer = self.get_serializer(results, many=True)
-        return Response(serializer.data)
+        matches = vector_index.search_prompts(self.get_queryset(), query, limit=limit)
+        prompts = self.get_queryset().in_bulk([prompt_id for prompt_id, _ in matches])
+        data = []
+        for prompt_id, score in matches:
+            if prompt_id not in prompts:
+                continue
+            item = PromptListSerializer(prompts[prompt_id], context=self.get_serializer_context()).data
+            item['score'] = round(score, 4)
+            data.append(item)
+        return Response(data)
+
+    @action(detail=True, methods=['get'])
+    def similar(self, request, pk=None):
+        """
+        내용이 거의 같은 프롬프트 (MinHash 로 추정한 유사도 순, 최대 20개)
+
+        GET /api/prompts/{id}/similar/?threshold=0.8
+        """
+        prompt = self.get_object()
+        try:
+            threshold = float(request.query_params.get('threshold', settings.PROMPT_SIMILARITY_THRESHOLD))
+        except ValueError:
+            threshold = None
+        if threshold is None or not 0 < threshold <= 1:
+            return Response(
+                {"error": "threshold must be a number between 0 and 1"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        matches = similarity.similar_prompts(prompt, self.get_queryset(), threshold)
+        prompts = self.get_queryset().in_bulk([prompt_id for prompt_id, _ in matches])
+        data = []
+        for prompt_id, score in matches:
+            if prompt_id not in prompts:
+                continue
+            item = PromptListSerializer(prompts[prompt_id], context=self.get_serializer_context()).data
+            item['similarity'] = round(score, 3)
+            data.append(item)
+        return Response(data)
 
     @action(detail=False, methods=['get'], permission_classes=[IsAuthenticated])
     def export(self, request):
         """
-        내 프롬프트를 JSON으로 export
+        내 프롬프트를 JSON/NDJSON 스트림으로 export
 
         GET /api/prompts/export/
+        GET /api/prompts/export/?output=ndjson&compress=gzip
         """
+        output = request.query_params.get('output', 'json')
+        if output not in ('json', 'ndjson'):
+            return Response(
+                {"error": "output must be 'json' or 'ndjson'"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        compress = request.query_params.get('compress') == 'gzip'
+
         prompts = self.get_queryset().filter(user=request.user)
+        now = timezone.now()
 
-        export_data = []
-        for prompt in prompts:
-            export_data.append({
-                'title': prompt.title,
-                'content': prompt.content,
-                'category': prompt.category.name if prompt.category else None,
-                'tags': list(prompt.tags.names()),
-                'is_template': prompt.is_template,
-                'variables': prompt.variables,
-                'color_label': prompt.color_label,
-                'is_favorite': prompt.is_favorite,
-                'is_public': prompt.is_public,
-            })
-
-        response = JsonResponse({
-            'version': '1.0',
-            'exported_at': timezone.now().isoformat(),
-            'count': len(export_data),
-            'prompts': export_data
-        }, json_dumps_params={'ensure_ascii': False, 'indent': 2})
-
-        response['Content-Disposition'] = f'attachment; filename="prompts_export_{timezone.now().strftime("%Y%m%d")}.json"'
+        if output == 'ndjson':
+            chunks = exporter.iter_ndjson(prompts)
+            content_type = 'application/x-ndjson'
+        else:
+            chunks = exporter.iter_json(prompts, now.isoformat(), prompts.count())
+            content_type = 'application/json'
+
+        filename = f'prompts_export_{now.strftime("%Y%m%d")}.{output}'
+        if compress:
+            chunks = exporter.gzip_stream(chunks)
+            content_type = 'application/gzip'
+            filename += '.gz'
+
+        response = StreamingHttpResponse(chunks, content_type=content_type)
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
         return response
 
-    @action(detail=False, methods=['post'], permission_classes=[IsAuthenticated])
+    @action(
+        detail=False,
+        methods=['post'],
+        permission_classes=[IsAuthenticated],
+        parser_classes=[*api_settings.DEFAULT_PARSER_CLASSES, NDJSONParser],
+    )
     def import_prompts(self, request):
         """
         JSON 파일에서 프롬프트 일괄 import
@@ -219,72 +373,25 @@ class PromptViewSet(viewsets.ModelViewSet):
                     "tags": ["python", "coding"]
                 }
             ],
-            "overwrite": false
+            "overwrite": false,
+            "skip_near_duplicates": false
         }
+
+        skip_near_duplicates 면 내용이 내 프롬프트나 앞선 행과 거의 같은 행도 건너뛴다.
+        큰 파일은 Content-Type: application/x-ndjson 으로 한 줄에 프롬프트 하나씩
+        스트리밍 업로드할 수 있다 (?overwrite=true, ?skip_near_duplicates=true).
         """
         data = request.data
-        prompts_data = data.get('prompts', [])
-        overwrite = data.get('overwrite', False)
-
-        imported = 0
-        skipped = 0
-        errors = []
-
-        for prompt_data in prompts_data:
-            try:
-                # 카테고리 찾기 or 생성
-                category = None
-                category_name = prompt_data.get('category')
-                if category_name:
-                    category, _ = Category.objects.get_or_create(name=category_name)
-
-                # 중복 체크
-                existing = Prompt.objects.filter(
-                    user=request.user,
-                    title=prompt_data['title']
-                ).first()
-
-                if existing and not overwrite:
-                    skipped += 1
-                    continue
-
-                if existing and overwrite:
-                    # 업데이트
-                    for key, value in prompt_data.items():
-                        if key not in ['tags', 'category']:
-                            setattr(existing, key, value)
-                    existing.category = category
-                    existing.save()
-
-                    if 'tags' in prompt_data:
-                        existing.tags.set(*prompt_data['tags'])
-
-                    imported += 1
-                else:
-                    # 새로 생성
-                    tags = prompt_data.pop('tags', [])
-                    prompt_data.pop('category', None)
-
-                    prompt = Prompt.objects.create(
-                        user=request.user,
-                        category=category,
-                        **prompt_data
-                    )
-
-                    if tags:
-                        prompt.tags.set(*tags)
-
-                    imported += 1
-
-            except Exception as e:
-                errors.append({
-                    'title': prompt_data.get('title', 'Unknown'),
-                    'error': str(e)
-                })
-
-        return Response({
-            'status': 'completed',
-            'imported': imported,
-            'skipped': skipped,
-            'errors': errors
-        })
+        if isinstance(data, dict):
+            prompts_data = data.get('prompts', [])
+            overwrite = data.get('overwrite', False)
+            skip_near_duplicates = data.get('skip_near_duplicates', False)
+        else:
+            prompts_data = data
+            overwrite = request.query_params.get('overwrite', '').lower() in ('1', 'true')
+            skip_near_duplicates = request.query_params.get('skip_near_duplicates', '').lower() in ('1', 'true')
+
+        importer = PromptImporter(
+            request.user, overwrite=overwrite, skip_near_duplicates=skip_near_duplicates,
+        ).run(prompts_data)
+        return Response(importer.result())
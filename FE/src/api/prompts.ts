@@ -1,5 +1,5 @@
 import apiClient from './client';
-import type { PaginatedResponse } from '@/types/api';
+import type { CursorPaginatedResponse, PaginatedResponse } from '@/types/api';
 import type { Prompt, PromptFormData } from '@/types/prompt';
 
 export const promptsAPI = {
@@ -15,9 +15,10 @@ export const promptsAPI = {
     color_label?: string;
     ordering?: string;
   }) {
+    // page 를 보내면 count 가 있는 페이지 번호 방식으로 응답한다 (없으면 커서 방식)
     const response = await apiClient.get<PaginatedResponse<Prompt>>(
       '/api/prompts/',
-      { params }
+      { params: { ...params, page: params?.page ?? 1 } }
     );
     return response.data;
   },
@@ -74,8 +75,11 @@ export const promptsAPI = {
   },
 
   // 즐겨찾기 목록
-  async getFavorites() {
-    const response = await apiClient.get<Prompt[]>('/api/prompts/favorites/');
+  async getFavorites(params?: { cursor?: string; ordering?: string }) {
+    const response = await apiClient.get<CursorPaginatedResponse<Prompt>>(
+      '/api/prompts/favorites/',
+      { params }
+    );
     return response.data;
   },
 
@@ -12,6 +12,12 @@ export interface PaginatedResponse<T> {
   results: T[];
 }
 
+// 커서 페이지네이션 (무한 스크롤 - 다음 페이지만 제공)
+export interface CursorPaginatedResponse<T> {
+  next: string | null;
+  results: T[];
+}
+
 export interface ApiError {
   message: string;
   errors?: Record<string, string[]>;